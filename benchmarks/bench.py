@@ -0,0 +1,254 @@
+"""Benchmark plugin overhead and checker throughput on synthetic projects.
+
+Usage::
+
+    python -m benchmarks.bench --modules 1000 --output baseline.json
+    python -m benchmarks.bench --modules 1000 --compare baseline.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import pathlib
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import typing
+
+from pytest_checkers.discovery import tool_version
+from pytest_checkers.profiling import wait
+
+if typing.TYPE_CHECKING:
+    from collections.abc import Sequence
+
+type Result = dict[str, typing.Any]
+
+TOOLS = ("black", "flake8", "isort", "mypy", "pyright", "ruff", "ty")
+MODES: dict[str, list[str]] = {
+    "serial": ["--checkers-jobs", "1"],
+    "parallel": [],
+    "cached": ["--checkers-cache"],
+    "explicit-files": ["--checkers-explicit-files"],
+    "inprocess": ["--checkers-executor", "inprocess"],
+    "pool": ["--checkers-executor", "pool"],
+    "daemon": ["--checkers-daemon", "--checkers-daemon-stop"],
+}
+# populated by a first, unmeasured, run on a project without planted errors, only green results being cached
+WARM_MODES = frozenset({"cached"})
+PACKAGE_SIZE = 100
+PYPROJECT = """\
+[tool.pytest.ini_options]
+pythonpath = ["."]
+
+[tool.black]
+line-length = 120
+
+[tool.isort]
+profile = "black"
+known_first_party = ["pkg_*"]
+
+[tool.flake8]
+max-line-length = 120
+
+[tool.ruff]
+line-length = 120
+"""
+MODULE = '''\
+"""Module {index}."""
+
+from __future__ import annotations
+
+import dataclasses
+{imports}
+
+@dataclasses.dataclass
+class Record{index}:
+    """Record {index}."""
+
+    name: str
+    value: int = {index}
+
+    def scaled(self, factor: int) -> int:
+        """Scale the value."""
+        return self.value * factor
+
+
+def build_{index}(name: str) -> Record{index}:
+    """Build a record."""
+    return Record{index}(name)
+'''
+# one planted error per tool family, cycling over the modules
+ERRORS = (
+    "import os\n",
+    'wrong_{index}: int = "not an int"\n',
+    "badly_formatted_{index} = [ 1,2 ,3 ]\n",
+)
+TEST_MODULE = '''\
+"""Synthetic tests."""
+
+from pkg_0.mod_0 import build_0
+
+
+def test_build() -> None:
+    """Test build."""
+    assert build_0("x").scaled(2) == 0
+'''
+
+
+def generate(root: pathlib.Path, modules: int, error_every: int = 10) -> dict[str, int]:
+    """Write a synthetic project, one planted error every `error_every` modules, return the planted errors."""
+    root.mkdir(parents=True, exist_ok=True)
+    (root / "pyproject.toml").write_text(PYPROJECT, encoding="utf-8")
+    (root / "tests").mkdir(exist_ok=True)
+    (root / "tests" / "test_synthetic.py").write_text(TEST_MODULE, encoding="utf-8")
+    planted = {"unused-import": 0, "type": 0, "format": 0}
+    for index in range(modules):
+        package = root / f"pkg_{index // PACKAGE_SIZE}"
+        if not package.exists():
+            package.mkdir()
+            (package / "__init__.py").write_text("", encoding="utf-8")
+        imports = "\nfrom pkg_0.mod_0 import build_0  # noqa: F401\n" if index else ""
+        source = MODULE.format(index=index, imports=imports)
+        if error_every and index % error_every == error_every - 1:
+            kind = (index // error_every) % len(ERRORS)
+            source += "\n" + ERRORS[kind].format(index=index)
+            planted[list(planted)[kind]] += 1
+        (package / f"mod_{index}.py").write_text(source, encoding="utf-8")
+    return planted
+
+
+def measure(cmd: Sequence[str], cwd: pathlib.Path) -> Result:
+    """Run a command, return its wall time, CPU time, peak RSS of the child and exit code."""
+    started = time.perf_counter()
+    with subprocess.Popen(  # noqa: S603
+        cmd,
+        cwd=cwd,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    ) as process:
+        returncode, rusage = wait(process)
+    result: Result = {"wall": time.perf_counter() - started, "returncode": returncode}
+    if rusage is not None:
+        result["cpu"] = rusage.ru_utime + rusage.ru_stime
+        result["max_rss"] = rusage.ru_maxrss if sys.platform == "darwin" else rusage.ru_maxrss * 1024
+    return result
+
+
+def median(results: list[Result]) -> Result:
+    """Median of repeated measures."""
+    merged: Result = {}
+    for key in results[0]:
+        merged[key] = statistics.median(result[key] for result in results)
+    return merged
+
+
+def pytest_cmd(*args: str) -> list[str]:
+    """Pytest command, without user plugins that could skew the measures."""
+    return [sys.executable, "-m", "pytest", "-q", "-p", "no:randomly", "-p", "no:xdist", *args]
+
+
+def bench_startup(root: pathlib.Path, repeat: int) -> Result:
+    """Collection-only session time with and without the plugin, the difference being its overhead."""
+    without = median([measure(pytest_cmd("--co", "-p", "no:checkers"), root) for _ in range(repeat)])
+    with_ = median([measure(pytest_cmd("--co", "--checkers"), root) for _ in range(repeat)])
+    return {"without": without, "with": with_, "overhead": with_["wall"] - without["wall"]}
+
+
+def cache_misses(tools_profile: Result) -> list[str]:
+    """Tools whose profiled run did not replay a cached result."""
+    return sorted(tool for tool, profile in tools_profile.items() if profile.get("source") != "cache")
+
+
+def bench_mode(root: pathlib.Path, tools: list[str], mode: str, repeat: int) -> Result:
+    """End-to-end session time of a mode, with the per-tool profile of its last run."""
+    profile = root / f".profile-{mode}.json"
+    cmd = pytest_cmd(*(f"--{tool}" for tool in tools), *MODES[mode], "--checkers-profile-json", str(profile))
+    if mode in WARM_MODES:
+        subprocess.run(cmd, cwd=root, capture_output=True, check=False)  # noqa: S603
+    results = [measure(cmd, root) for _ in range(repeat)]
+    tools_profile: Result = json.loads(profile.read_text(encoding="utf-8")) if profile.exists() else {}
+    if mode not in WARM_MODES:
+        return {**median(results), "tools": tools_profile}
+    misses = cache_misses(tools_profile)
+    if misses:
+        sys.stderr.write(f"{mode}: no cache hit for {', '.join(misses)}\n")
+    return {**median(results), "tools": tools_profile, "cache_misses": misses}
+
+
+def run(args: argparse.Namespace) -> Result:
+    """Run the benchmarks."""
+    tools = [tool for tool in args.tools if tool_version(tool)]
+    with tempfile.TemporaryDirectory(prefix="checkers-bench-") as tmp:
+        root = pathlib.Path(tmp) / "planted"
+        planted = generate(root, args.modules, args.error_every)
+        clean = pathlib.Path(tmp) / "clean"
+        if WARM_MODES.intersection(args.modes):
+            generate(clean, args.modules, error_every=0)
+        result: Result = {
+            "meta": {
+                "python": sys.version,
+                "platform": platform.platform(),
+                "cpus": os.process_cpu_count(),
+                "modules": args.modules,
+                "planted": planted,
+                "versions": {tool: tool_version(tool) for tool in ["pytest-checkers", "pytest", *tools]},
+            },
+            "startup": bench_startup(root, args.repeat),
+            "modes": {
+                mode: bench_mode(clean if mode in WARM_MODES else root, tools, mode, args.repeat) for mode in args.modes
+            },
+        }
+    return result
+
+
+def compare(current: Result, baseline: Result, threshold: float) -> list[str]:
+    """Wall times slower than the baseline by more than `threshold`, as a ratio."""
+    pairs = [("startup", current["startup"]["with"]["wall"], baseline["startup"]["with"]["wall"])]
+    for mode, measures in current["modes"].items():
+        if mode not in baseline["modes"]:
+            continue
+        pairs.append((mode, measures["wall"], baseline["modes"][mode]["wall"]))
+        for tool, profile in measures["tools"].items():
+            previous = baseline["modes"][mode]["tools"].get(tool)
+            if previous:
+                pairs.append((f"{mode} {tool}", profile["wall"], previous["wall"]))
+    return [
+        f"{name}: {value:.2f}s, baseline {reference:.2f}s (+{value / reference - 1:.0%})"
+        for name, value, reference in pairs
+        if reference and value > reference * (1 + threshold)
+    ]
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description=(__doc__ or "").partition("\n")[0])
+    parser.add_argument("--modules", type=int, default=100, help="synthetic modules, 100 to 50000 (default: 100)")
+    parser.add_argument("--error-every", type=int, default=10, help="plant an error every N modules (default: 10)")
+    parser.add_argument("--tools", nargs="+", choices=TOOLS, default=list(TOOLS), help="tools to run")
+    parser.add_argument("--modes", nargs="+", choices=list(MODES), default=list(MODES), help="modes to run")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per measure, the median is kept (default: 3)")
+    parser.add_argument("--output", type=pathlib.Path, help="write the results as JSON")
+    parser.add_argument("--compare", type=pathlib.Path, help="baseline JSON to compare the results with")
+    parser.add_argument("--threshold", type=float, default=0.1, help="tolerated slowdown ratio (default: 0.1)")
+    args = parser.parse_args(argv)
+    result = run(args)
+    text = json.dumps(result, indent=2) + "\n"
+    if args.output:
+        args.output.write_text(text, encoding="utf-8")
+    else:
+        sys.stdout.write(text)
+    if args.compare:
+        regressions = compare(result, json.loads(args.compare.read_text(encoding="utf-8")), args.threshold)
+        for regression in regressions:
+            sys.stderr.write(f"regression {regression}\n")
+        return int(bool(regressions))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,8 +5,6 @@ from __future__ import annotations
 import importlib.metadata
 import typing
 
-__version__ = importlib.metadata.version(__name__)
-
 Group = typing.Literal["checkers"]
 Tool = typing.Literal["black", "flake8", "isort", "mypy", "pyright", "ruff", "ty"]
 EscTable = typing.Literal[
@@ -43,3 +41,12 @@ HELPS: dict[Tool | Group, str] = {
     "ty": "Enable `ty check`",
     "pyright": "Enable `pyright`",
 }
+
+
+def __getattr__(name: str) -> str:
+    """Resolve `__version__` on first access."""
+    if name != "__version__":
+        msg = f"module {__name__!r} has no attribute {name!r}"
+        raise AttributeError(msg)
+    version = globals()["__version__"] = importlib.metadata.version(__name__)
+    return version
@@ -0,0 +1,52 @@
+"""Budget."""
+
+from __future__ import annotations
+
+import threading
+
+
+class CpuBudget:
+    """CPUs shared by the checkers of a process, each run taking a share of what the running ones left.
+
+    A run gets the free CPUs divided by the runs still to start, so that
+    checkers starting together split the budget and the last ones to start
+    get what the finished ones gave back.
+    """
+
+    def __init__(self, total: int, expected: int = 1) -> None:
+        """Init."""
+        self.total = max(total, 1)
+        self.expected = expected
+        self.started = 0
+        self.in_use = 0
+        self._lock = threading.Lock()
+
+    def acquire(self, cap: int | None = None) -> int:
+        """Take the share of a run starting now, at least one CPU and at most `cap`."""
+        with self._lock:
+            waiting = max(self.expected - self.started, 1)
+            share = max((self.total - self.in_use) // waiting, 1)
+            if cap is not None:
+                share = min(share, max(cap, 1))
+            self.started += 1
+            self.in_use += share
+            return share
+
+    def release(self, share: int) -> None:
+        """Give back the share of a finished run."""
+        with self._lock:
+            self.in_use -= share
+
+    def reset(self, expected: int) -> None:
+        """Expect a new round of runs, in watch mode."""
+        with self._lock:
+            self.expected = expected
+            self.started = 0
+
+
+def split(total: int, workers: int, *, concurrent_tests: bool) -> int:
+    """Count the CPUs left to the checkers of a process, xdist workers splitting the budget, tests taking one."""
+    share = total // workers if workers > 1 else total
+    if concurrent_tests:
+        share -= 1
+    return max(share, 1)
@@ -0,0 +1,153 @@
+"""Cache."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import sys
+import threading
+import typing
+
+from pytest_checkers.discovery import tool_version
+from pytest_checkers.index import (
+    FileIndex,
+    file_digest,
+)
+
+if typing.TYPE_CHECKING:
+    import pathlib
+
+    import pytest
+
+    from pytest_checkers.checkers import CheckersPlugin
+    from pytest_checkers.stores import Store
+
+CONFIG_FILES = (
+    "pyproject.toml",
+    "setup.cfg",
+    "tox.ini",
+    ".flake8",
+    "mypy.ini",
+    ".mypy.ini",
+    "pyrightconfig.json",
+    "ruff.toml",
+    ".ruff.toml",
+    ".isort.cfg",
+)
+MANIFEST_KEY = "checkers/manifest"
+RESULTS_KEY = "checkers/results"
+
+
+class JsonCache(typing.Protocol):
+    """Read side of pytest's cache, typed."""
+
+    def get(self, key: str, default: object, /) -> object:
+        """Value stored under the key, `default` when missing or unreadable."""
+        ...
+
+
+def load(cache: JsonCache, key: str) -> dict[str, typing.Any]:
+    """JSON object stored under the key in pytest's cache, empty when missing or not an object."""
+    value = cache.get(key, None)
+    return typing.cast("dict[str, typing.Any]", value) if isinstance(value, dict) else {}
+
+
+class ResultCache:
+    """Persistent checkers results, keyed by tool, flags, configs and sources, optionally shared through a store."""
+
+    def __init__(self, config: pytest.Config, index: FileIndex | None = None, store: Store | None = None) -> None:
+        """Init."""
+        self.config = config
+        self.root = config.rootpath
+        self.index = index or FileIndex(self.root)
+        self.shared = store
+        self._lock = threading.Lock()
+        self._digests: dict[str, str] | None = None
+
+    def digests(self) -> dict[str, str]:
+        """Content hashes of the source files, re-hashing only files whose stat changed."""
+        with self._lock:
+            if self._digests is None:
+                manifest = load(self.config.cache, MANIFEST_KEY)
+                updated: dict[str, list[typing.Any]] = {}
+                for rel, stat in self.index.stats().items():
+                    key = list(stat)
+                    entry = manifest.get(rel)
+                    entry = typing.cast("list[object]", entry) if isinstance(entry, list) else []
+                    if entry[:3] != key or len(entry) != len(key) + 1:
+                        try:
+                            entry = [*key, self.index.digest(rel)]
+                        except OSError:
+                            continue
+                    updated[rel] = entry
+                if updated != manifest:
+                    self.config.cache.set(MANIFEST_KEY, updated)
+                self._digests = {rel: entry[3] for rel, entry in updated.items()}
+            return self._digests
+
+    def config_digests(self, root: pathlib.Path | None = None) -> dict[str, str]:
+        """Content hashes of the tools configuration files, of the project or of a sub-project."""
+        root = root or self.root
+        return {name: file_digest(root / name) for name in CONFIG_FILES if (root / name).is_file()}
+
+    def key(self, plugin: CheckersPlugin) -> str:
+        """Cache key of a checker run."""
+        sources = self.digests()
+        if plugin.scope is not None:
+            sources = {rel: digest for rel, digest in sources.items() if rel in plugin.scope}
+        payload = {
+            "tool": plugin.tool,
+            "package": plugin.package,
+            "version": tool_version(plugin.runner),
+            "python": sys.version,
+            "flags": plugin.run_flags,
+            "color": plugin.color,
+            "shard": [plugin.shard, plugin.shards],
+            "selected": plugin.selected_files,
+            "configs": self.config_digests(),
+            "package_configs": self.config_digests(plugin.target) if plugin.package is not None else {},
+            "sources": sources,
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+    def replay(self, plugin: CheckersPlugin, key: str) -> bool:
+        """Restore the stored result, if it matches the key, from the local cache then from the store."""
+        entry = load(self.config.cache, f"{RESULTS_KEY}/{plugin.slot}")
+        if entry.get("key") != key:
+            fetched = self.fetch(key)
+            if fetched is None:
+                return False
+            entry = fetched
+            self.config.cache.set(f"{RESULTS_KEY}/{plugin.slot}", entry)
+        plugin.cmd_output = entry["output"]
+        plugin.cmd_returncode = entry["returncode"]
+        return True
+
+    def fetch(self, key: str) -> dict[str, typing.Any] | None:
+        """Entry shared under the key by another run, if any."""
+        if self.shared is None:
+            return None
+        data = self.shared.get(key)
+        if data is None:
+            return None
+        try:
+            entry = json.loads(data)
+        except ValueError:
+            return None
+        if not isinstance(entry, dict):
+            return None
+        result = typing.cast("dict[str, typing.Any]", entry)
+        return result if result.get("key") == key else None
+
+    def store(self, plugin: CheckersPlugin, key: str) -> None:
+        """Store a green result under the key."""
+        if plugin.is_error:
+            return
+        entry = {
+            "key": key,
+            "output": plugin.cmd_output,
+            "returncode": plugin.cmd_returncode,
+        }
+        self.config.cache.set(f"{RESULTS_KEY}/{plugin.slot}", entry)
+        if self.shared is not None:
+            self.shared.put(key, json.dumps(entry).encode())
@@ -0,0 +1,116 @@
+"""Capture."""
+
+from __future__ import annotations
+
+import codecs
+import collections
+import locale
+import tempfile
+import typing
+
+if typing.TYPE_CHECKING:
+    from collections.abc import Iterator
+
+DEFAULT_SPOOL_SIZE = 1024 * 1024
+CHUNK_SIZE = 64 * 1024
+
+
+class OutputCapture:
+    """Tool output, held in memory up to a size and spooled to a temporary file past it."""
+
+    def __init__(self, markers: tuple[str, ...] = (), spool_size: int = DEFAULT_SPOOL_SIZE) -> None:
+        """Init."""
+        self.encoding = locale.getpreferredencoding(do_setlocale=False)
+        self.spool = tempfile.SpooledTemporaryFile(max_size=spool_size)  # noqa: SIM115
+        self.markers = {marker: marker.encode(self.encoding) for marker in markers}
+        self.found: set[str] = set()
+        self.size = 0
+        self._overlap = b""
+        self._overlap_size = max((len(marker) for marker in self.markers.values()), default=1) - 1
+
+    @classmethod
+    def from_text(cls, text: str, markers: tuple[str, ...] = (), spool_size: int = DEFAULT_SPOOL_SIZE) -> OutputCapture:
+        """Capture from a string."""
+        capture = cls(markers, spool_size)
+        capture.write(text.encode(capture.encoding))
+        return capture
+
+    @property
+    def matched(self) -> bool:
+        """Return whether any marker was found."""
+        return bool(self.found)
+
+    def write(self, data: bytes) -> None:
+        """Append data, looking for markers across chunk boundaries."""
+        if not data:
+            return
+        self.spool.write(data)
+        self.size += len(data)
+        if len(self.found) < len(self.markers):
+            window = self._overlap + data
+            for marker, encoded in self.markers.items():
+                if marker not in self.found and encoded in window:
+                    self.found.add(marker)
+            start = len(window) - self._overlap_size
+            self._overlap = window[start:]
+
+    def drain(self, stream: typing.IO[bytes]) -> None:
+        """Read a stream incrementally until EOF."""
+        while chunk := stream.read(CHUNK_SIZE):
+            self.write(chunk)
+
+    def extend(self, other: OutputCapture) -> None:
+        """Append another capture."""
+        for chunk in other.iter_bytes():
+            self.write(chunk)
+
+    def iter_bytes(self) -> Iterator[bytes]:
+        """Stream the captured bytes."""
+        self.spool.seek(0)
+        while chunk := self.spool.read(CHUNK_SIZE):
+            yield chunk
+        self.spool.seek(0, 2)
+
+    def iter_chunks(self) -> Iterator[str]:
+        """Stream the captured text."""
+        decoder = codecs.getincrementaldecoder(self.encoding)(errors="replace")
+        for chunk in self.iter_bytes():
+            if text := decoder.decode(chunk):
+                yield text
+        if text := decoder.decode(b"", final=True):
+            yield text
+
+    def iter_lines(self) -> Iterator[str]:
+        """Stream the captured lines, with line endings."""
+        remainder = ""
+        for chunk in self.iter_chunks():
+            *lines, remainder = (remainder + chunk).split("\n")
+            for line in lines:
+                yield line + "\n"
+        if remainder:
+            yield remainder
+
+    def iter_text(self, head: int = 0, tail: int = 0) -> Iterator[str]:
+        """Stream the captured text, keeping only the first `head` and last `tail` lines when set."""
+        if not head and not tail:
+            yield from self.iter_chunks()
+            return
+        last: collections.deque[str] = collections.deque(maxlen=tail)
+        total = 0
+        for total, line in enumerate(self.iter_lines(), start=1):
+            if total <= head:
+                yield line
+            else:
+                last.append(line)
+        skipped = total - head - len(last)
+        if skipped > 0:
+            yield f"... {skipped} lines truncated ...\n"
+        yield from last
+
+    def read(self) -> str:
+        """Read the whole captured text."""
+        return "".join(self.iter_text())
+
+    def close(self) -> None:
+        """Release the spool."""
+        self.spool.close()
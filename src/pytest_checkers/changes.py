@@ -0,0 +1,106 @@
+"""Changes."""
+
+from __future__ import annotations
+
+import pathlib
+import subprocess
+import threading
+import typing
+
+from pytest_checkers.cache import (
+    CONFIG_FILES,
+    load,
+)
+from pytest_checkers.index import (
+    SOURCE_SUFFIXES,
+    FileIndex,
+    file_digest,
+)
+
+if typing.TYPE_CHECKING:
+    import pytest
+
+CHANGED_KEY = "checkers/changed"
+
+
+class ChangeDetector:
+    """Work out the sources changed since the last passing run, or since a git base."""
+
+    def __init__(self, config: pytest.Config, base: str | None = None, index: FileIndex | None = None) -> None:
+        """Init."""
+        self.config = config
+        self.root = config.rootpath
+        self.base = base
+        self.index = index or FileIndex(self.root)
+        self._lock = threading.Lock()
+        self._snapshot: dict[str, list[int]] | None = None
+        self._configs: dict[str, str] | None = None
+        self._git_checked = False
+        self._git_changed: list[str] | None = None
+        self._git_removed: list[str] = []
+        # relative to the root, sub-project ones added in monorepo mode
+        self.config_files: list[str] = list(CONFIG_FILES)
+
+    def snapshot(self) -> tuple[dict[str, list[int]], dict[str, str]]:
+        """Stat of every source and hashes of the config files, taken once per session."""
+        with self._lock:
+            if self._snapshot is None or self._configs is None:
+                self._snapshot = {rel: list(stat) for rel, stat in self.index.stats().items()}
+                self._configs = {
+                    name: file_digest(self.root / name) for name in self.config_files if (self.root / name).is_file()
+                }
+            return self._snapshot, self._configs
+
+    def git_changed(self) -> list[str] | None:
+        """Get sources changed against the git base, `None` when a config file changed or git is unavailable."""
+        with self._lock:
+            if not self._git_checked:
+                self._git_checked = True
+                cmds = [
+                    ["git", "diff", "--name-only", "--relative", typing.cast("str", self.base), "--"],
+                    ["git", "ls-files", "--others", "--exclude-standard"],
+                ]
+                names: set[str] = set()
+                for cmd in cmds:
+                    try:
+                        result = subprocess.run(  # noqa: S603
+                            cmd,
+                            cwd=self.root,
+                            capture_output=True,
+                            text=True,
+                            check=True,
+                        )
+                    except (OSError, subprocess.CalledProcessError):
+                        return None
+                    names.update(result.stdout.splitlines())
+                if any(pathlib.PurePosixPath(name).name in CONFIG_FILES for name in names):
+                    return None
+                sources = {name for name in names if pathlib.PurePosixPath(name).suffix in SOURCE_SUFFIXES}
+                self._git_changed = sorted(name for name in sources if (self.root / name).is_file())
+                self._git_removed = sorted(sources.difference(self._git_changed))
+            return self._git_changed
+
+    def changed(self, tool: str) -> list[str] | None:
+        """Get sources to check for a tool, `None` meaning the full tree."""
+        if self.base is not None:
+            return self.git_changed()
+        snapshot, configs = self.snapshot()
+        previous = load(self.config.cache, f"{CHANGED_KEY}/{tool}")
+        if previous.get("configs") != configs:
+            return None
+        files = previous.get("files", {})
+        return sorted(rel for rel, key in snapshot.items() if files.get(rel) != key)
+
+    def removed(self, tool: str) -> list[str]:
+        """Get sources deleted since the last passing run of a tool, or since the git base."""
+        if self.base is not None:
+            self.git_changed()
+            return self._git_removed
+        snapshot, _ = self.snapshot()
+        previous = load(self.config.cache, f"{CHANGED_KEY}/{tool}")
+        return sorted(set(previous.get("files", {})).difference(snapshot))
+
+    def record(self, tool: str) -> None:
+        """Record the session snapshot as the last passing run of a tool."""
+        snapshot, configs = self.snapshot()
+        self.config.cache.set(f"{CHANGED_KEY}/{tool}", {"configs": configs, "files": snapshot})
@@ -2,10 +2,18 @@
 
 from __future__ import annotations
 
-import importlib.util
+import argparse
+import concurrent.futures
+import copy
+import json
 import os
+import pathlib
+import shutil
+import signal
 import subprocess
 import sys
+import threading
+import time
 import typing
 
 import pytest
@@ -14,8 +22,11 @@ from pytest_checkers import (
     GROUP_NAME,
     HELPS,
 )
+from pytest_checkers.discovery import is_installed
+from pytest_checkers.index import FileIndex
 
 if typing.TYPE_CHECKING:
+    from collections.abc import Iterable
 
     from _pytest._code.code import (
         TerminalRepr,
@@ -27,20 +38,79 @@ if typing.TYPE_CHECKING:
         EscTable,
         Tool,
     )
+    from pytest_checkers.budget import CpuBudget
+    from pytest_checkers.cache import ResultCache
+    from pytest_checkers.changes import ChangeDetector
+    from pytest_checkers.consolidate import RuffCommand
+    from pytest_checkers.daemon import Daemon
+    from pytest_checkers.diagnostics import Diagnostic
+    from pytest_checkers.executors import Executor
+    from pytest_checkers.history import History
+    from pytest_checkers.node import NodeRuntime
+    from pytest_checkers.packages import Package
+    from pytest_checkers.profiling import RunProfile
+    from pytest_checkers.scheduler import CheckersScheduler
+
+
+scheduler_key: pytest.StashKey[CheckersScheduler] = pytest.StashKey()
+failed_key: pytest.StashKey[bool] = pytest.StashKey()
+deselected_key: pytest.StashKey[bool] = pytest.StashKey()
+LIMIT_PROPERTY = "checkers_limit"
+executor_key: pytest.StashKey[Executor] = pytest.StashKey()
+history_key: pytest.StashKey[History] = pytest.StashKey()
 
 
 class PluginItem(pytest.Item):
     """PluginItem."""
 
+    shard: int | None = None
+    file: str | None = None
+    package: str | None = None
+
     def runtest(self) -> None:
         """Run test."""
         plugin = self.config.pluginmanager.get_plugin(self.name)
         if not isinstance(plugin, CheckersPlugin):  # pragma: no cover
             pytest.exit(f"Internal Error: {self.name} plugin not found during runtest")
-        plugin.run_tool()
+        plugin.shard = self.shard
+        if self.package is None:
+            plugin.run_tool()
+        else:
+            run = plugin.package_runs[self.package]
+            # xdist spreads the packages over the workers, each checking its own
+            (run if hasattr(self.config, "workerinput") else plugin).run_tool()
+            plugin = run
+        if self.file is not None:
+            self.check_file(plugin, self.file)
+            return
+        if hasattr(self.config, "workerinput"):
+            self.user_properties.append((GROUP_NAME, plugin.shard_report()))
+        if plugin.breach is not None:
+            self.user_properties.append((LIMIT_PROPERTY, plugin.breach))
+            self.fail(f"{self.name} {plugin.breach}")
         if plugin.is_error:
-            fail_msg = f"{self.name} failed with output:\n{plugin.cmd_output}"
-            raise pytest.fail(fail_msg)
+            self.fail(f"{self.name} failed with output...")
+
+    def check_file(self, plugin: CheckersPlugin, file: str) -> None:
+        """Fail on the diagnostics of a single file of the batched run."""
+        if plugin.diagnostics is None:
+            if plugin.is_error:
+                self.fail(f"{self.name} failed with output...")
+            return
+        if diagnostics := plugin.diagnostics_for(file):
+            self.fail("\n".join(diagnostic.render() for diagnostic in diagnostics))
+        if not plugin.is_error:
+            return
+        # a failure no source file accounts for, e.g. a broken config, fails every file
+        if diagnostics := plugin.unattributed_diagnostics():
+            self.fail("\n".join(diagnostic.render() for diagnostic in diagnostics))
+        if not plugin.diagnostics:
+            self.fail(f"{self.name} failed with output...")
+
+    def fail(self, fail_msg: str) -> typing.NoReturn:
+        """Fail the item, flagging the session for `--checkers-first`."""
+        self.session.stash[failed_key] = True
+        raise pytest.fail(fail_msg)
 
     def repr_failure(
         self,
@@ -48,11 +118,17 @@ class PluginItem(pytest.Item):
         style: TracebackStyle | None = None,
     ) -> str | TerminalRepr:
         """Repr failure."""
-        _ = excinfo, style
+        _ = style
+        if self.file is not None and isinstance(excinfo.value, pytest.fail.Exception):
+            return excinfo.value.msg or ""
         return f"{self.name} failed with output..."
 
     def reportinfo(self) -> tuple[os.PathLike[str] | str, int | None, str]:
         """Report info."""
+        if self.file is not None:
+            return self.path, 0, f"tool::{self.name}::{self.file}"
+        if self.package is not None:
+            return self.path, 0, f"tool::{self.name}::{self.package}"
         return self.path, 0, f"tool::{self.name}"
 
 
@@ -62,45 +138,588 @@ class CheckersPlugin:
     tool: Tool
     header_markup: EscTable
     finish_msg: str = ""
+    file_local: bool = False
+    error_markers: tuple[str, ...] = ()
+    cache_flag: str | None = None
+    cache_env: str | None = None
+    path_env: str | None = None
+    jobs_flag: str | None = None
+    jobs_env: str | None = None
 
     def __init__(self, config: pytest.Config) -> None:
         """Init."""
+        from pytest_checkers.capture import (  # noqa: PLC0415
+            DEFAULT_SPOOL_SIZE,
+            OutputCapture,
+        )
+        from pytest_checkers.limits import Limits  # noqa: PLC0415
+
         self.config = config
-        self.cmd_output = ""
+        self.spool_size = DEFAULT_SPOOL_SIZE
+        self.output_head = 0
+        self.output_tail = 0
+        self.output = OutputCapture(self.error_markers, self.spool_size)
         self.cmd_returncode = 0
+        self.future: concurrent.futures.Future[None] | None = None
+        self.cache: ResultCache | None = None
+        self.changes: ChangeDetector | None = None
+        self.daemon: Daemon | None = None
+        self.executor: Executor | None = None
+        self.index = FileIndex(config.rootpath)
+        self.explicit_files = False
+        self.limits = Limits()
+        self.breach: str | None = None
+        self.shards = 1
+        self.shard: int | None = None
+        self.shard_results: dict[int, tuple[str, int]] = {}
+        self.structured = False
+        self.diagnostics: list[Diagnostic] | None = None
+        self.shard_diagnostics: dict[int, list[Diagnostic]] = {}
+        self.granular = False
+        self.selected_files: list[str] | None = None
+        self._files_diagnostics: dict[str, list[Diagnostic]] | None = None
+        self._run_lock = threading.Lock()
+        self._executed = False
+        self.profiling = False
+        self.profile: RunProfile | None = None
+        self.shard_profiles: dict[int, RunProfile] = {}
+        self.color = True
+        self._env_vars: dict[str, str] | None = None
+        self.ruff: RuffCommand | None = None
+        self.tool_cache: pathlib.Path | None = None
+        # tests changing the working directory must not move the tools running alongside them
+        self.cwd = config.rootpath
+        self.package: str | None = None
+        self.scope: frozenset[str] | None = None
+        self.package_runs: dict[str, CheckersPlugin] = {}
+        self.package_graph: dict[str, set[str]] = {}
+        self.package_jobs = 1
+        self.selected_packages: list[str] | None = None
+        self.cpu_budget: CpuBudget | None = None
+        self.history: History | None = None
+
+    @property
+    def cmd_output(self) -> str:
+        """Whole tool output, prefer streaming from `output`."""
+        return self.output.read()
+
+    @cmd_output.setter
+    def cmd_output(self, value: str) -> None:
+        from pytest_checkers.capture import OutputCapture  # noqa: PLC0415
+
+        self.output.close()
+        self.output = OutputCapture.from_text(value, self.error_markers, self.spool_size)
+
+    @property
+    def nodeid(self) -> str:
+        """Node ID of the checker item."""
+        return f"{GROUP_NAME}::{self.tool}"
 
     @property
     def cmd_flags(self) -> list[str]:
         """Command flags."""
         return []
 
+    @property
+    def structured_flags(self) -> list[str]:
+        """Command flags for machine-readable output."""
+        return self.cmd_flags
+
+    @property
+    def run_flags(self) -> list[str]:
+        """Command flags of the current mode."""
+        if self.ruff is not None:
+            return self.ruff.structured_flags if self.structured else self.ruff.cmd_flags
+        return self.structured_flags if self.structured else self.cmd_flags
+
+    @property
+    def cache_flags(self) -> list[str]:
+        """Command flags pinning the incremental cache of the tool run, kept out of the result cache key."""
+        cache_flag = self.cache_flag if self.ruff is None else RuffPlugin.cache_flag
+        if self.tool_cache is None or cache_flag is None:
+            return []
+        return [cache_flag, str(self.tool_cache)]
+
+    def parallel_flags(self, share: int | None) -> list[str]:
+        """Command flags bounding the tool internal parallelism to its CPU share."""
+        jobs_flag = self.jobs_flag if self.ruff is None else RuffPlugin.jobs_flag
+        if share is None or jobs_flag is None:
+            return []
+        return [jobs_flag, str(share)]
+
+    def parallel_env(self, share: int | None) -> dict[str, str]:
+        """Environment bounding the tool internal parallelism to its CPU share."""
+        jobs_env = self.jobs_env if self.ruff is None else RuffPlugin.jobs_env
+        if share is None or jobs_env is None:
+            return self.env_vars
+        return {**self.env_vars, jobs_env: str(share)}
+
+    @property
+    def runner(self) -> Tool:
+        """Tool actually run, ruff when it stands for this one."""
+        return "ruff" if self.ruff is not None else self.tool
+
+    @property
+    def command(self) -> list[str]:
+        """Command running the tool, before its flags and paths."""
+        return [sys.executable, "-m", self.runner]
+
+    @property
+    def file_flags(self) -> list[str]:
+        """Command flags when checking explicit files."""
+        return []
+
+    def package_flags(self, directory: pathlib.Path) -> list[str]:
+        """Command flags pointing the tool at the configuration of a sub-project."""
+        _ = directory
+        return []
+
+    @property
+    def slot(self) -> str:
+        """Name of the run among the stored results."""
+        if self.package is None:
+            return self.tool
+        from pytest_checkers.packages import slug  # noqa: PLC0415
+
+        return f"{self.tool}-{slug(self.package)}"
+
+    @property
+    def root_package(self) -> bool:
+        """Whether the run is the root project of a monorepo."""
+        if self.package is None:
+            return False
+        from pytest_checkers.packages import ROOT  # noqa: PLC0415
+
+        return self.package == ROOT
+
+    @property
+    def target(self) -> pathlib.Path:
+        """Directory to check, the sub-project one in monorepo mode."""
+        if self.package is None or self.root_package:
+            return self.config.rootpath
+        return self.config.rootpath / self.package
+
+    @property
+    def paths(self) -> list[str]:
+        """Paths to check, only the changed sources for file-local tools in changed mode."""
+        if self.selected_files is not None:
+            paths = [str(self.config.rootpath / rel) for rel in self.selected_files]
+        else:
+            paths = [str(self.target)]
+        if self.changes is not None and self.file_local and self.selected_files is None:
+            changed = self.changes.changed(self.tool)
+            if changed is not None:
+                paths = [str(self.config.rootpath / rel) for rel in changed]
+        whole_tree = paths == [str(self.target)]
+        # the root project owns its sources only, not the sub-projects below it
+        explicit = self.shard is not None or (self.explicit_files and self.file_local) or self.root_package
+        if whole_tree and explicit:
+            paths = [str(path) for path in self.index.paths()]
+        if self.shard is None:
+            return paths
+        from pytest_checkers.scheduler import balanced_shards  # noqa: PLC0415
+
+        return balanced_shards(paths, self.shards)[self.shard]
+
     @property
     def env_vars(self) -> dict[str, str]:
-        """Environment variables."""
-        env_vars = os.environ.copy()
-        env_vars["FORCE_COLOR"] = "1"
-        env_vars["MYPY_FORCE_COLOR"] = "1"
-        return env_vars
+        """Environment variables, shared by the checkers of a session."""
+        if self._env_vars is None:
+            self._env_vars = child_env(color=self.color)
+        return self._env_vars
+
+    @env_vars.setter
+    def env_vars(self, value: dict[str, str]) -> None:
+        self._env_vars = value
 
     @property
     def is_error(self) -> bool:
         """Tool-specific error logic."""
-        return self.cmd_returncode != 0
+        return self.cmd_returncode != 0 or self.breach is not None
+
+    @property
+    def background(self) -> bool:
+        """Return whether the tool can run in a scheduler thread."""
+        return self.executor is None or self.executor.threadsafe or not self.executor.supports(self.runner)
 
     def run_tool(self) -> None:
-        """Run tool."""
-        project_root = self.config.rootpath
-        cmd = [sys.executable, "-m", self.tool, *self.cmd_flags, str(project_root)]
-        result = subprocess.run(cmd, capture_output=True, text=True, check=False, env=self.env_vars)  # noqa: S603
-        self.cmd_output = result.stdout + result.stderr
-        self.cmd_returncode = result.returncode
+        """Run tool, or collect its result when already scheduled."""
+        if self.future is not None:
+            self.future.result()
+            return
+        if not self.granular and not self.package_runs:
+            self.execute()
+            return
+        with self._run_lock:
+            if not self._executed:
+                self.execute()
+                self._executed = True
+
+    def execute(self) -> None:
+        """Execute tool, replaying the cached result when the tree is unchanged."""
+        if self.package_runs:
+            self.execute_packages()
+            return
+        started = time.perf_counter()
+        if self.profiling:
+            from pytest_checkers.profiling import RunProfile  # noqa: PLC0415
+
+            self.profile = RunProfile()
+        if self.cache is None:
+            self.execute_subprocess()
+        else:
+            key = self.cache.key(self)
+            if self.cache.replay(self, key):
+                if self.profile is not None:
+                    self.profile.source = "cache"
+            else:
+                self.execute_subprocess()
+                self.cache.store(self, key)
+        if self.profile is not None:
+            self.profile.wall = time.perf_counter() - started
+            self.profile.output_bytes = self.output.size
+        complete = self.shard is None and self.selected_files is None
+        if self.changes is not None and self.file_local and complete and not self.is_error:
+            self.changes.record(self.tool)
+        if self.structured:
+            self.parse_diagnostics()
+
+    def reset(self) -> None:
+        """Forget the last run, to check again in watch mode."""
+        self.future = None
+        self._executed = False
+        self.cmd_output = ""
+        self.cmd_returncode = 0
+        self.breach = None
+        self.diagnostics = None
+        self._files_diagnostics = None
+        self.profile = None
+        self.selected_files = None
+
+    def execute_packages(self) -> None:
+        """Check the affected sub-projects concurrently, dependencies first, and gather their results."""
+        started = time.perf_counter()
+        runs = [
+            run
+            for name, run in self.package_runs.items()
+            if self.selected_packages is None or name in self.selected_packages
+        ]
+        affected = self.affected_packages()
+        for run in runs:
+            if affected is not None and run.package not in affected:
+                run.cmd_output = "Unchanged since the last passing run.\n"
+                run.cmd_returncode = 0
+                run.breach = None
+                run.diagnostics = [] if run.structured else None
+        todo = [run for run in runs if affected is None or run.package in affected]
+        with concurrent.futures.ThreadPoolExecutor(self.package_jobs, thread_name_prefix="checkers-package") as pool:
+            for future in [pool.submit(run.execute) for run in todo]:
+                future.result()
+        self.breach = next((run.breach for run in runs if run.breach is not None), None)
+        self.cmd_output = "".join(run.cmd_output for run in runs)
+        self.cmd_returncode = max((run.cmd_returncode for run in runs), default=0)
+        if self.structured:
+            from pytest_checkers.diagnostics import merge  # noqa: PLC0415
+
+            groups = [run.diagnostics for run in runs]
+            self.diagnostics = None if None in groups else merge(*typing.cast("list[list[Diagnostic]]", groups))
+        if self.profiling:
+            from pytest_checkers import profiling  # noqa: PLC0415
+
+            self.profile = profiling.combine([run.profile for run in todo if run.profile is not None])
+            self.profile.wall = time.perf_counter() - started
+        if self.changes is not None and self.selected_packages is None and not self.is_error:
+            self.changes.record(self.tool)
+
+    def affected_packages(self) -> set[str] | None:
+        """Sub-projects with changed sources and their dependents, `None` meaning all of them."""
+        if self.changes is None:
+            return None
+        changed = self.changes.changed(self.tool)
+        if changed is None or self.changes.removed(self.tool):
+            return None
+        from pytest_checkers.packages import dependents  # noqa: PLC0415
+
+        owners = {name for name, run in self.package_runs.items() if not run.index.stats().keys().isdisjoint(changed)}
+        return dependents(self.package_graph, owners)
+
+    def for_package(self, package: Package, scope: frozenset[str], search_path: list[str]) -> CheckersPlugin:
+        """Copy of the checker running on a single sub-project, its dependencies on the tool search path."""
+        from pytest_checkers.capture import OutputCapture  # noqa: PLC0415
+        from pytest_checkers.packages import slug  # noqa: PLC0415
+
+        run = copy.copy(self)
+        run.package = package.path
+        run.scope = scope
+        run.index = self.index.subset(package.files)
+        run.output = OutputCapture(self.error_markers, self.spool_size)
+        run.shard_results = {}
+        run.shard_diagnostics = {}
+        run.shard_profiles = {}
+        run.package_runs = {}
+        run.changes = None
+        run.daemon = None
+        run.future = None
+        run.granular = False
+        run._run_lock = threading.Lock()  # noqa: SLF001
+        if self.tool_cache is not None:
+            run.tool_cache = self.tool_cache / slug(package.path)
+            if self.cache_env is not None:
+                run.env_vars = {**self.env_vars, self.cache_env: str(run.tool_cache)}
+        if self.path_env is not None and search_path:
+            run.env_vars = {**run.env_vars, self.path_env: os.pathsep.join(search_path)}
+        return run
+
+    def parse_diagnostics(self) -> None:
+        """Parse the machine-readable output, keeping the raw output when it cannot be parsed."""
+        from pytest_checkers.diagnostics import (  # noqa: PLC0415
+            merge,
+            parsers,
+        )
+
+        try:
+            parser = parsers[self.tool if self.ruff is None else self.ruff.parser]
+            self.diagnostics = merge(parser(self.cmd_output, self.config.rootpath))
+        except (ValueError, KeyError, TypeError):
+            self.diagnostics = None
+        self._files_diagnostics = None
+
+    def diagnostics_for(self, file: str) -> list[Diagnostic]:
+        """Diagnostics of a single file, relative to the project root."""
+        if self._files_diagnostics is None:
+            files_diagnostics: dict[str, list[Diagnostic]] = {}
+            for diagnostic in self.diagnostics or []:
+                files_diagnostics.setdefault(diagnostic.path, []).append(diagnostic)
+            self._files_diagnostics = files_diagnostics
+        return self._files_diagnostics.get(file, [])
+
+    def unattributed_diagnostics(self) -> list[Diagnostic]:
+        """Diagnostics of no source file of the tree, e.g. on a config file."""
+        files = self.index.stats()
+        return [diagnostic for diagnostic in self.diagnostics or [] if diagnostic.path not in files]
+
+    def execute_subprocess(self) -> None:
+        """Execute tool subprocess, within its share of the CPU budget, timing it for the history."""
+        started = time.perf_counter()
+        if self.cpu_budget is None:
+            paths = self.run_subprocess(None)
+        else:
+            share = self.cpu_budget.acquire(len(self.limits.cpus) if self.limits.cpus else None)
+            try:
+                paths = self.run_subprocess(share)
+            finally:
+                self.cpu_budget.release(share)
+        if self.history is not None and paths and self.breach is None:
+            self.history.record(self.slot, self.planned_files(paths), time.perf_counter() - started)
+
+    def run_subprocess(self, share: int | None) -> list[str]:
+        """Run the tool through the daemon, the executor or a subprocess, with a CPU share if budgeted.
+
+        Return the paths checked.
+        """
+        self.breach = None
+        paths = self.paths
+        if not paths:
+            self.cmd_output = "No files to check.\n"
+            self.cmd_returncode = 0
+            return paths
+        whole_tree = paths == [str(self.target)]
+        file_flags = self.file_flags if self.ruff is None else list(self.ruff.file_flags)
+        flags = self.run_flags if whole_tree else [*self.run_flags, *file_flags]
+        flags += self.cache_flags
+        flags += self.parallel_flags(share)
+        if self.package is not None and not self.root_package and self.ruff is None:
+            flags += self.package_flags(self.target)
+        if self.profile is not None:
+            self.profile.files = self.planned_files(paths)
+        if self.daemon is not None:
+            reply = self.daemon.run(flags, paths)
+            if reply is not None:
+                self.cmd_output, self.cmd_returncode = reply
+                if self.profile is not None:
+                    self.profile.source = "daemon"
+                return paths
+        if self.executor is not None and self.executor.supports(self.runner):
+            self.cmd_output, self.cmd_returncode = self.executor.run(self, [*flags, *paths])
+            if self.profile is not None:
+                self.profile.source = self.executor.name
+            return paths
+        self.spawn([*self.command, *flags, *paths], self.parallel_env(share))
+        return paths
+
+    def spawn(self, cmd: list[str], env: dict[str, str] | None = None) -> None:
+        """Run the tool in a subprocess within its resource limits, streaming its output."""
+        from pytest_checkers.capture import OutputCapture  # noqa: PLC0415
+
+        stdout = OutputCapture(self.error_markers, self.spool_size)
+        stderr = OutputCapture(self.error_markers, self.spool_size)
+        timed_out = threading.Event()
+        with subprocess.Popen(  # noqa: S603
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            env=self.env_vars if env is None else env,
+            cwd=self.cwd,
+            # own process group, so that a timeout also kills the tool children holding the pipes
+            start_new_session=self.limits.timeout is not None and os.name == "posix",
+        ) as process:
+            unapplied = self.limits.apply(process.pid)
+            if unapplied is not None:
+                # rather than running it unbounded
+                process.kill()
+            timer = None
+            if self.limits.timeout is not None:
+                timer = threading.Timer(self.limits.timeout, self.kill, args=(process, timed_out))
+                timer.daemon = True
+                timer.start()
+            reader = threading.Thread(target=stderr.drain, args=(process.stderr,), daemon=True)
+            reader.start()
+            stdout.drain(typing.cast("typing.IO[bytes]", process.stdout))
+            reader.join()
+            if timer is not None:
+                timer.cancel()
+            if self.profile is None:
+                self.cmd_returncode = process.wait()
+            else:
+                from pytest_checkers.profiling import wait  # noqa: PLC0415
+
+                self.cmd_returncode, rusage = wait(process)
+                if rusage is not None:
+                    self.profile.add_rusage(rusage)
+        stdout.extend(stderr)
+        stderr.close()
+        self.output.close()
+        self.output = stdout
+        if unapplied is not None:
+            self.breach = unapplied
+        elif timed_out.is_set() or self.limits.max_rss is not None:
+            self.breach = self.limits.breach(self.cmd_output, self.cmd_returncode, timed_out=timed_out.is_set())
+        if self.breach is not None:
+            self.output.write(f"\n{self.tool} {self.breach}\n".encode(self.output.encoding))
+
+    @staticmethod
+    def kill(process: subprocess.Popen[bytes], timed_out: threading.Event) -> None:
+        """Kill a timed out tool with its children."""
+        timed_out.set()
+        if os.name == "posix":
+            try:
+                os.killpg(process.pid, signal.SIGKILL)
+            except OSError:
+                pass
+            else:
+                return
+        process.kill()
+
+    def count_files(self) -> int:
+        """Count the sources below the project root."""
+        return len(self.index.stats())
+
+    def planned_files(self, paths: list[str] | None = None) -> int:
+        """Count the sources a run over the paths checks, the next run by default."""
+        paths = self.paths if paths is None else paths
+        return self.count_files() if paths == [str(self.target)] else len(paths)
+
+    def expected_duration(self) -> float | None:
+        """Seconds the next run is expected to take from the history, `None` when never timed."""
+        if self.package_runs:
+            runs = [
+                run.expected_duration()
+                for name, run in self.package_runs.items()
+                if self.selected_packages is None or name in self.selected_packages
+            ]
+            if None in runs:
+                return None
+            seconds = typing.cast("list[float]", runs)
+            return max([*seconds, sum(seconds) / self.package_jobs], default=0.0)
+        if self.history is None:
+            return None
+        return self.history.estimate(self.slot, self.planned_files())
+
+    def shard_report(self) -> dict[str, typing.Any]:
+        """Report the result of the current shard, sent from xdist workers to the controller."""
+        report: dict[str, typing.Any] = {
+            "tool": self.tool,
+            "package": self.package,
+            "shard": self.shard or 0,
+            "shards": self.shards,
+            "output": self.cmd_output,
+            "returncode": self.cmd_returncode,
+            "breach": self.breach,
+        }
+        if self.diagnostics is not None:
+            from pytest_checkers.diagnostics import to_dict  # noqa: PLC0415
+
+            report["diagnostics"] = [to_dict(diagnostic) for diagnostic in self.diagnostics]
+        if self.profile is not None:
+            from pytest_checkers import profiling  # noqa: PLC0415
+
+            report["profile"] = profiling.to_dict(self.profile)
+        return report
+
+    def pytest_runtest_logreport(self, report: pytest.TestReport) -> None:
+        """Merge the shard results reported by xdist workers."""
+        if hasattr(self.config, "workerinput"):
+            return
+        for name, value in report.user_properties:
+            shard = typing.cast("dict[str, typing.Any]", value)
+            if name != GROUP_NAME or shard["tool"] != self.tool:
+                continue
+            if shard.get("package") in self.package_runs:
+                # one package per item, each run in full on a single worker
+                self.package_runs[shard["package"]].pytest_runtest_logreport(report)
+                continue
+            if shard.get("package") != self.package:
+                continue
+            self.shard_results[shard["shard"]] = shard["output"], shard["returncode"]
+            self.breach = self.breach or shard.get("breach")
+            self.cmd_output = "".join(output for _, (output, _) in sorted(self.shard_results.items()))
+            self.cmd_returncode = max(returncode for _, returncode in self.shard_results.values())
+            if "diagnostics" in shard:
+                self.merge_shard_diagnostics(shard["shard"], shard["diagnostics"])
+            if "profile" in shard:
+                self.merge_shard_profile(shard["shard"], shard["profile"])
+            complete = len(self.shard_results) == shard["shards"]
+            if self.changes is not None and self.file_local and complete and not self.is_error:
+                self.changes.record(self.tool)
+
+    def merge_shard_diagnostics(self, shard: int, diagnostics: list[dict[str, typing.Any]]) -> None:
+        """Merge the diagnostics of a shard."""
+        from pytest_checkers.diagnostics import (  # noqa: PLC0415
+            from_dict,
+            merge,
+        )
+
+        self.shard_diagnostics[shard] = [from_dict(diagnostic) for diagnostic in diagnostics]
+        self.diagnostics = merge(*self.shard_diagnostics.values())
+
+    def merge_shard_profile(self, shard: int, profile: dict[str, typing.Any]) -> None:
+        """Merge the profile of a shard."""
+        from pytest_checkers import profiling  # noqa: PLC0415
+
+        self.shard_profiles[shard] = profiling.from_dict(profile)
+        self.profile = profiling.combine(self.shard_profiles.values())
 
     def pytest_terminal_summary(self, terminalreporter: TerminalReporter) -> None:
         """Pytest terminal summary."""
         # circumventing mypy quirk - https://github.com/python/mypy/issues/10023
+        if self.package_runs:
+            for name, run in self.package_runs.items():
+                if self.selected_packages is None or name in self.selected_packages:
+                    run.pytest_terminal_summary(terminalreporter)
+            return
         header_markup_kwarg = {typing.cast("str", self.header_markup): True}
-        terminalreporter.write_sep(title=f"tests {self.tool}", sep="=", **header_markup_kwarg)
-        terminalreporter.write(self.cmd_output + self.finish_msg)
+        title = f"tests {self.tool}" if self.package is None else f"tests {self.tool} {self.package}"
+        if self.ruff is not None:
+            title += " (ruff)"
+        terminalreporter.write_sep(title=title, sep="=", **header_markup_kwarg)
+        if self.diagnostics is not None:
+            for diagnostic in self.diagnostics:
+                terminalreporter.write_line(diagnostic.render())
+            terminalreporter.write_line(f"Found {len(self.diagnostics)} diagnostics.")
+            return
+        for chunk in self.output.iter_text(self.output_head, self.output_tail):
+            terminalreporter.write(chunk)
+        terminalreporter.write(self.finish_msg)
 
     def pytest_collection_modifyitems(
         self,
@@ -110,12 +729,61 @@ class CheckersPlugin:
     ) -> None:
         """Pytest collection modify item."""
         _ = config
-        item = PluginItem.from_parent(  # pyright: ignore[reportUnknownMemberType]
-            session,
-            name=self.tool,
-        )
-        item._nodeid = f"{GROUP_NAME}::{self.tool}"  # pyright: ignore[reportPrivateUsage]  # noqa: SLF001
-        items.append(item)
+        if self.package_runs:
+            for name in self.package_runs:
+                item = PluginItem.from_parent(  # pyright: ignore[reportUnknownMemberType]
+                    session,
+                    name=self.tool,
+                )
+                item.package = name
+                item.extra_keyword_matches.add(name)
+                item._nodeid = f"{self.nodeid}::{name}"  # pyright: ignore[reportPrivateUsage]  # noqa: SLF001
+                items.append(item)
+            return
+        if self.granular:
+            for rel in self.index.stats():
+                item = PluginItem.from_parent(  # pyright: ignore[reportUnknownMemberType]
+                    session,
+                    name=self.tool,
+                )
+                item.file = rel
+                item.extra_keyword_matches.add(item.file)
+                item._nodeid = f"{self.nodeid}::{item.file}"  # pyright: ignore[reportPrivateUsage]  # noqa: SLF001
+                items.append(item)
+            return
+        if self.shards == 1:
+            item = PluginItem.from_parent(  # pyright: ignore[reportUnknownMemberType]
+                session,
+                name=self.tool,
+            )
+            item._nodeid = self.nodeid  # pyright: ignore[reportPrivateUsage]  # noqa: SLF001
+            items.append(item)
+            return
+        for shard in range(self.shards):
+            item = PluginItem.from_parent(  # pyright: ignore[reportUnknownMemberType]
+                session,
+                name=self.tool,
+            )
+            item.shard = shard
+            item._nodeid = f"{self.nodeid}[{shard}]"  # pyright: ignore[reportPrivateUsage]  # noqa: SLF001
+            items.append(item)
+
+    def pytest_collection_finish(self, session: pytest.Session) -> None:
+        """Batch the files of the selected items in granular mode, or the selected sub-projects."""
+        if self.package_runs:
+            self.selected_packages = [
+                item.package
+                for item in session.items
+                if isinstance(item, PluginItem) and item.name == self.tool and item.package is not None
+            ]
+            if len(self.selected_packages) == len(self.package_runs):
+                self.selected_packages = None
+        if self.granular:
+            self.selected_files = [
+                item.file
+                for item in session.items
+                if isinstance(item, PluginItem) and item.name == self.tool and item.file is not None
+            ]
 
 
 class PyrightPlugin(CheckersPlugin):
@@ -123,6 +791,39 @@ class PyrightPlugin(CheckersPlugin):
 
     tool = "pyright"
     header_markup = "yellow"
+    jobs_flag = "--threads"
+
+    def __init__(self, config: pytest.Config) -> None:
+        """Init."""
+        super().__init__(config)
+        self.runtime: NodeRuntime | None = None
+        self.offline = False
+
+    @property
+    def command(self) -> list[str]:
+        """Command running the tool, node itself once resolved rather than the PyPI wrapper."""
+        return super().command if self.runtime is None else self.runtime.command()
+
+    def run_subprocess(self, share: int | None) -> list[str]:
+        """Run the tool, failing offline rather than letting the wrapper download node or pyright."""
+        if self.offline and self.runtime is None:
+            self.breach = None
+            self.cmd_output = "pyright: no local node runtime or pyright package found, not downloading offline.\n"
+            self.cmd_returncode = 1
+            return []
+        return super().run_subprocess(share)
+
+    @property
+    def structured_flags(self) -> list[str]:
+        """Command flags for machine-readable output."""
+        return ["--outputjson"]
+
+    def package_flags(self, directory: pathlib.Path) -> list[str]:
+        """Command flags pointing the tool at the configuration of a sub-project."""
+        from pytest_checkers.settings import config_file  # noqa: PLC0415
+
+        path = config_file(directory, (("pyrightconfig.json", None),), "pyright")
+        return [] if path is None else ["--project", str(path)]
 
 
 class TyPlugin(CheckersPlugin):
@@ -130,18 +831,46 @@ class TyPlugin(CheckersPlugin):
 
     tool = "ty"
     header_markup = "yellow"
+    jobs_env = "TY_MAX_PARALLELISM"
 
     @property
     def cmd_flags(self) -> list[str]:
         """Command flags."""
         return ["check"]
 
+    @property
+    def structured_flags(self) -> list[str]:
+        """Command flags for machine-readable output."""
+        return ["check", "--output-format", "gitlab"]
+
+    def package_flags(self, directory: pathlib.Path) -> list[str]:
+        """Command flags pointing the tool at the configuration of a sub-project."""
+        from pytest_checkers.settings import config_file  # noqa: PLC0415
+
+        path = config_file(directory, (("ty.toml", None),), "ty")
+        return [] if path is None else ["--project", str(directory)]
+
 
 class MypyPlugin(CheckersPlugin):
     """Mypy plugin."""
 
     tool = "mypy"
     header_markup = "blue"
+    cache_flag = "--cache-dir"
+    path_env = "MYPYPATH"
+
+    @property
+    def structured_flags(self) -> list[str]:
+        """Command flags for machine-readable output."""
+        return ["-O", "json"]
+
+    def package_flags(self, directory: pathlib.Path) -> list[str]:
+        """Command flags pointing the tool at the configuration of a sub-project."""
+        from pytest_checkers.settings import config_file  # noqa: PLC0415
+
+        files = (("mypy.ini", "mypy"), (".mypy.ini", "mypy"))
+        path = config_file(directory, files, "mypy") or config_file(directory, (("setup.cfg", "mypy"),), "mypy")
+        return [] if path is None else ["--config-file", str(path)]
 
 
 class RuffPlugin(CheckersPlugin):
@@ -149,11 +878,24 @@ class RuffPlugin(CheckersPlugin):
 
     tool = "ruff"
     header_markup = "purple"
+    file_local = True
+    cache_flag = "--cache-dir"
+    jobs_env = "RAYON_NUM_THREADS"
 
     @property
     def cmd_flags(self) -> list[str]:
-        """Command flags."""
-        return ["check"]
+        """Command flags, one line per violation in plain mode."""
+        return ["check"] if self.color else ["check", "--output-format", "concise"]
+
+    @property
+    def file_flags(self) -> list[str]:
+        """Command flags when checking explicit files."""
+        return ["--force-exclude"]
+
+    @property
+    def structured_flags(self) -> list[str]:
+        """Command flags for machine-readable output."""
+        return ["check", "--output-format", "json"]
 
 
 class Flake8Plugin(CheckersPlugin):
@@ -161,12 +903,30 @@ class Flake8Plugin(CheckersPlugin):
 
     tool = "flake8"
     header_markup = "purple"
+    file_local = True
     finish_msg = "All done.\n"
+    jobs_flag = "--jobs"
 
     @property
     def cmd_flags(self) -> list[str]:
         """Command flags."""
-        return ["--color=always"]
+        return ["--color=always"] if self.color else ["--color=never"]
+
+    @property
+    def structured_flags(self) -> list[str]:
+        """Command flags for machine-readable output."""
+        from pytest_checkers.diagnostics import FLAKE8_FORMAT  # noqa: PLC0415
+
+        return [f"--format={FLAKE8_FORMAT}"]
+
+    def package_flags(self, directory: pathlib.Path) -> list[str]:
+        """Command flags pointing the tool at the configuration of a sub-project."""
+        from pytest_checkers.consolidate import FLAKE8_FILES  # noqa: PLC0415
+        from pytest_checkers.settings import config_file  # noqa: PLC0415
+
+        path = config_file(directory, FLAKE8_FILES, "flake8")
+        # flake8 does not read pyproject.toml
+        return [] if path is None or path.name == "pyproject.toml" else ["--config", str(path)]
 
 
 class BlackPlugin(CheckersPlugin):
@@ -174,16 +934,54 @@ class BlackPlugin(CheckersPlugin):
 
     tool = "black"
     header_markup = "cyan"
+    file_local = True
+    error_markers = ("@@", "fail to reformat")
+    cache_env = "BLACK_CACHE_DIR"
+    jobs_flag = "--workers"
 
     @property
     def is_error(self) -> bool:
-        """Tool-specific error logic."""
-        return "@@" in self.cmd_output or "fail to reformat" in self.cmd_output
+        """Tool-specific error logic, ruff failing with a status."""
+        if self.ruff is not None:
+            return super().is_error
+        return self.output.matched or self.breach is not None
+
+    def run_subprocess(self, share: int | None) -> list[str]:
+        """Run the check, black itself confirming a diff of `ruff format`, whose style differs from black in places."""
+        paths = super().run_subprocess(share)
+        # 1 is `ruff format --check` finding files to reformat, not failing
+        if self.ruff is None or self.cmd_returncode != 1 or self.breach is not None or not is_installed("black"):
+            return paths
+        ruff, self.ruff = self.ruff, None
+        try:
+            paths = super().run_subprocess(share)
+        finally:
+            self.ruff = ruff
+        # black exits 0 with a diff, the verdict is carried over to the status ruff is judged by
+        if self.breach is None:
+            self.cmd_returncode = int(self.output.matched)
+        return paths
 
     @property
     def cmd_flags(self) -> list[str]:
         """Command flags."""
-        return ["--diff", "--color"]
+        return ["--diff", "--color"] if self.color else ["--diff"]
+
+    @property
+    def file_flags(self) -> list[str]:
+        """Command flags when checking explicit files, black skips `exclude` for them."""
+        from pytest_checkers.settings import tool_settings  # noqa: PLC0415
+
+        settings = tool_settings(self.target, "black")
+        excludes = [settings[key] for key in ("exclude", "extend-exclude", "extend_exclude") if key in settings]
+        if not excludes or "force-exclude" in settings or "force_exclude" in settings:
+            return []
+        return ["--force-exclude", "|".join(f"(?:{exclude})" for exclude in excludes)]
+
+    @property
+    def structured_flags(self) -> list[str]:
+        """Command flags for machine-readable output."""
+        return ["--diff"]
 
 
 class IsortPlugin(CheckersPlugin):
@@ -191,20 +989,39 @@ class IsortPlugin(CheckersPlugin):
 
     tool = "isort"
     header_markup = "cyan"
+    file_local = True
+    error_markers = ("@@",)
     finish_msg = "All done.\n"
+    jobs_flag = "--jobs"
 
     @property
     def is_error(self) -> bool:
-        """Tool-specific error logic."""
-        return "@@" in self.cmd_output
+        """Tool-specific error logic, ruff failing with a status."""
+        if self.ruff is not None:
+            return super().is_error
+        return self.output.matched or self.breach is not None
 
     @property
     def cmd_flags(self) -> list[str]:
         """Command flags."""
-        if importlib.util.find_spec("colorama") is None:  # pragma: no cover  # tested with tox isortnocolor
+        if not self.color or not is_installed("colorama"):
             return ["--diff"]
         return ["--diff", "--color"]
 
+    @property
+    def file_flags(self) -> list[str]:
+        """Command flags when checking explicit files."""
+        return ["--filter-files"]
+
+    def package_flags(self, directory: pathlib.Path) -> list[str]:
+        """Command flags pointing the tool at the configuration of a sub-project."""
+        return ["--settings-path", str(directory)]
+
+    @property
+    def structured_flags(self) -> list[str]:
+        """Command flags for machine-readable output."""
+        return ["--diff"]
+
 
 tools_map: dict[Tool, type[CheckersPlugin]] = {
     "black": BlackPlugin,
@@ -216,6 +1033,40 @@ tools_map: dict[Tool, type[CheckersPlugin]] = {
     "ty": TyPlugin,
 }
 added_options: list[Tool] = []
+COLOR_VARS = ("FORCE_COLOR", "MYPY_FORCE_COLOR")
+
+
+def child_env(*, color: bool) -> dict[str, str]:
+    """Environment of the tools, forcing their colour on or off."""
+    env = os.environ.copy()
+    for name in COLOR_VARS:
+        if color:
+            env[name] = "1"
+        else:
+            env.pop(name, None)
+    if color:
+        env.pop("NO_COLOR", None)
+    else:
+        env["NO_COLOR"] = "1"
+    return env
+
+
+def _non_negative_int(value: str) -> int:
+    """Parse a non-negative integer option."""
+    number = int(value)
+    if number < 0:
+        msg = f"expected a non-negative integer, got {value!r}"
+        raise argparse.ArgumentTypeError(msg)
+    return number
+
+
+def _non_negative_float(value: str) -> float:
+    """Parse a non-negative number option."""
+    number = float(value)
+    if number < 0:
+        msg = f"expected a non-negative number, got {value!r}"
+        raise argparse.ArgumentTypeError(msg)
+    return number
 
 
 def pytest_addoption(parser: pytest.Parser) -> None:
@@ -224,16 +1075,715 @@ def pytest_addoption(parser: pytest.Parser) -> None:
     for tool, help_ in HELPS.items():
         if tool == GROUP_NAME:
             group.addoption(f"--{tool}", action="store_true", help=help_)
-        elif importlib.util.find_spec(tool):
+        elif is_installed(tool):
             group.addoption(f"--{tool}", action="store_true", help=help_)
             added_options.append(tool)
+    group.addoption(
+        "--checkers-jobs",
+        type=_non_negative_int,
+        default=0,
+        metavar="N",
+        help="Maximum number of checkers running concurrently (default: one per enabled checker)",
+    )
+    group.addoption(
+        "--checkers-executor",
+        choices=("subprocess", "inprocess", "pool"),
+        default="subprocess",
+        help=(
+            "Run black, flake8, isort and mypy through their Python API, in the pytest process (inprocess) "
+            "or in warm worker processes (pool), instead of a new interpreter each (default: subprocess)"
+        ),
+    )
+    group.addoption(
+        "--checkers-via-ruff",
+        action="store_true",
+        help="Run the flake8, isort and black checks through ruff where their configuration maps onto it",
+    )
+    group.addoption(
+        "--checkers-early",
+        action="store_true",
+        help="Start the checkers at session start, overlapping collection, instead of once collection is done",
+    )
+    group.addoption(
+        "--checkers-first",
+        action="store_const",
+        const="first",
+        dest="checkers_order",
+        default="last",
+        help="Run the checker items before the tests and stop the session if one fails",
+    )
+    group.addoption(
+        "--checkers-last",
+        action="store_const",
+        const="last",
+        dest="checkers_order",
+        help="Run the checker items after the tests (default)",
+    )
+    group.addoption(
+        "--checkers-plain",
+        action="store_true",
+        help="No colour and compact tool output, the default when pytest output has no markup",
+    )
+    group.addoption(
+        "--checkers-spool-size",
+        type=_non_negative_int,
+        default=1024 * 1024,
+        metavar="BYTES",
+        help="Spool checker output to a temporary file past this size (default: 1 MiB)",
+    )
+    group.addoption(
+        "--checkers-head",
+        type=_non_negative_int,
+        default=0,
+        metavar="N",
+        help="Show only the first N lines of each checker output",
+    )
+    group.addoption(
+        "--checkers-tail",
+        type=_non_negative_int,
+        default=0,
+        metavar="N",
+        help="Show only the last N lines of each checker output",
+    )
+    group.addoption(
+        "--checkers-structured",
+        action="store_true",
+        help="Request machine-readable output from the tools and report parsed diagnostics",
+    )
+    group.addoption(
+        "--checkers-report",
+        default=None,
+        metavar="PATH",
+        help="Export the parsed diagnostics as JSON, implies --checkers-structured",
+    )
+    group.addoption(
+        "--checkers-granular",
+        action="store_true",
+        help="One item per checked file, backed by a single batched run per tool, implies --checkers-structured",
+    )
+    group.addoption(
+        "--checkers-cpus",
+        type=_non_negative_int,
+        default=0,
+        metavar="N",
+        help="Share N CPUs among the checkers and the xdist workers, bounding each tool's own parallelism",
+    )
+    group.addoption(
+        "--checkers-pyright-offline",
+        action="store_true",
+        help="Never let the pyright PyPI wrapper reach the network, failing when node or pyright is not installed",
+    )
+    group.addoption(
+        "--checkers-scope",
+        action="store_true",
+        help="On runs narrowed by paths, -k, -m or deselection, check the selected test modules and what they import",
+    )
+    group.addoption(
+        "--checkers-packages",
+        action="store_true",
+        help="Check each sub-project with a project file on its own, dependencies first, one item per package",
+    )
+    group.addoption(
+        "--checkers-profile",
+        action="store_true",
+        help="Show wall time, CPU time, peak RSS, output size and files checked of each checker",
+    )
+    group.addoption(
+        "--checkers-profile-json",
+        default=None,
+        metavar="PATH",
+        help="Export the checkers profile as JSON, implies --checkers-profile",
+    )
+    group.addoption(
+        "--checkers-explicit-files",
+        action="store_true",
+        help="Pass the session file index to ruff, flake8, black and isort instead of letting each walk the tree",
+    )
+    group.addoption(
+        "--checkers-cache",
+        action="store_true",
+        help="Replay stored checkers results when sources, configs and tool versions are unchanged",
+    )
+    group.addoption(
+        "--checkers-cache-store",
+        default=None,
+        metavar="LOCATION",
+        help="Share cached results through a directory, a shared path or an HTTP endpoint, implies --checkers-cache",
+    )
+    group.addoption(
+        "--checkers-cache-store-size",
+        type=_non_negative_int,
+        default=512 * 1024**2,
+        metavar="BYTES",
+        help="Evict the least recently used entries of a directory store past this size (default: 512 MiB)",
+    )
+    group.addoption(
+        "--checkers-tool-cache",
+        action="store_true",
+        help="Keep the mypy, ruff and black incremental caches in pytest's cache directory",
+    )
+    group.addoption(
+        "--checkers-tool-cache-dir",
+        default=None,
+        metavar="PATH",
+        help="Keep the mypy, ruff and black incremental caches below a shared path, implies --checkers-tool-cache",
+    )
+    group.addoption(
+        "--checkers-cache-clear",
+        action="store_true",
+        help="Clear the stored checkers results and the managed tool caches at session start",
+    )
+    group.addoption(
+        "--checkers-changed",
+        action="store_true",
+        help="Pass only sources changed since the last passing run to file-local checkers",
+    )
+    group.addoption(
+        "--checkers-changed-base",
+        default=None,
+        metavar="REF",
+        help="With --checkers-changed, diff against a git ref instead of the last passing run",
+    )
+    group.addoption(
+        "--checkers-daemon",
+        action="store_true",
+        help="Check through a long-lived daemon per project root where the tool has one (mypy)",
+    )
+    group.addoption(
+        "--checkers-daemon-timeout",
+        type=_non_negative_int,
+        default=3600,
+        metavar="SECONDS",
+        help="Shut the daemons down after this many idle seconds (default: 3600)",
+    )
+    group.addoption(
+        "--checkers-daemon-stop",
+        action="store_true",
+        help="Stop the daemons at the end of the session",
+    )
+    group.addoption(
+        "--checkers-watch",
+        action="store_true",
+        help="Keep checking after the session, re-running the checkers a change affects, implies --checkers-daemon",
+    )
+    group.addoption(
+        "--checkers-watch-debounce",
+        type=_non_negative_float,
+        default=0.3,
+        metavar="SECONDS",
+        help="Wait for this long without changes before checking again (default: 0.3)",
+    )
 
 
 def pytest_configure(config: pytest.Config) -> None:
     """Get CLI selections."""
+    plugins: list[CheckersPlugin] = []
     for tool in added_options:
         if config.option.checkers:
             setattr(config.option, tool, True)
         if getattr(config.option, tool, False):
             tool_cls = tools_map[tool]
-            config.pluginmanager.register(tool_cls(config), name=tool)
+            plugins.append(tool_cls(config))
+            config.pluginmanager.register(plugins[-1], name=tool)
+    if not plugins:
+        return
+    from pytest_checkers.scheduler import CheckersScheduler  # noqa: PLC0415
+
+    index = FileIndex(config.rootpath)
+    color = _color(config)
+    env_vars = child_env(color=color)
+    for plugin in plugins:
+        plugin.color = color
+        plugin.env_vars = env_vars
+        plugin.spool_size = config.option.checkers_spool_size
+        plugin.output_head = config.option.checkers_head
+        plugin.output_tail = config.option.checkers_tail
+        plugin.granular = config.option.checkers_granular
+        plugin.index = index
+        plugin.explicit_files = config.option.checkers_explicit_files
+        plugin.cwd = config.invocation_params.dir
+        plugin.profiling = bool(config.option.checkers_profile or config.option.checkers_profile_json)
+        plugin.structured = bool(
+            config.option.checkers_structured or config.option.checkers_report or config.option.checkers_granular,
+        )
+    _configure_limits(config, plugins)
+    _configure_ruff(config, plugins)
+    _configure_tool_caches(config, plugins)
+    _configure_executor(config, plugins)
+    if config.pluginmanager.has_plugin("cacheprovider"):
+        _configure_persistence(config, plugins)
+    _configure_packages(config, plugins)
+    _configure_budget(config, plugins)
+    _configure_pyright(config, plugins)
+    workerinput = getattr(config, "workerinput", None)
+    if workerinput is None:
+        config.stash[scheduler_key] = CheckersScheduler(plugins, config.option.checkers_jobs)
+        return
+    # xdist worker: items are spread by xdist, file-local checkers split into one shard per worker
+    for plugin in plugins:
+        if plugin.file_local and not plugin.granular:
+            plugin.shards = workerinput["workercount"]
+
+
+def _color(config: pytest.Config) -> bool:
+    """Colour the tools output as pytest colours its own, the controller deciding for xdist workers."""
+    if config.option.checkers_plain:
+        return False
+    workerinput = getattr(config, "workerinput", None)
+    if workerinput is not None and "checkers_color" in workerinput:
+        return bool(workerinput["checkers_color"])
+    from _pytest.config import create_terminal_writer  # noqa: PLC0415
+
+    return create_terminal_writer(config).hasmarkup
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_configure_node(node: typing.Any) -> None:  # noqa: ANN401  # xdist WorkerController
+    """Pass the colour of the controller terminal to the xdist workers."""
+    node.workerinput["checkers_color"] = _color(node.config)
+
+
+def _configure_limits(config: pytest.Config, plugins: list[CheckersPlugin]) -> None:
+    """Read the resource limits of the checkers from `[tool.pytest-checkers]`."""
+    from pytest_checkers.limits import (  # noqa: PLC0415
+        SETTINGS_TABLE,
+        Limits,
+    )
+    from pytest_checkers.settings import tool_settings  # noqa: PLC0415
+
+    settings = tool_settings(config.rootpath, SETTINGS_TABLE)
+    for plugin in plugins:
+        try:
+            plugin.limits = Limits.from_settings(settings, plugin.tool)
+        except (TypeError, ValueError) as exc:
+            msg = f"invalid [tool.{SETTINGS_TABLE}] limits for {plugin.tool}: {exc}"
+            raise pytest.UsageError(msg) from exc
+
+
+def _configure_ruff(config: pytest.Config, plugins: list[CheckersPlugin]) -> None:
+    """Hand flake8, isort and black over to ruff, each falling back to itself when its config does not map."""
+    if not config.option.checkers_via_ruff or not is_installed("ruff"):
+        return
+    from pytest_checkers.consolidate import commands  # noqa: PLC0415
+
+    for plugin in plugins:
+        if plugin.tool in commands:
+            plugin.ruff = commands[plugin.tool](config.rootpath)
+            if plugin.ruff is not None:
+                plugin.finish_msg = ""
+
+
+def _configure_tool_caches(config: pytest.Config, plugins: list[CheckersPlugin]) -> None:
+    """Pin the tools incremental caches below pytest's cache directory or a shared path, clearing them on demand."""
+    has_cache = config.pluginmanager.has_plugin("cacheprovider")
+    option = config.option.checkers_tool_cache_dir
+    base = pathlib.Path(option) if isinstance(option, str | pathlib.Path) else None
+    if base is None and has_cache and (config.option.checkers_tool_cache or config.option.checkers_cache_clear):
+        base = config.cache.mkdir("checkers-tools")
+    # the controller clears, xdist workers would race each other
+    clear = config.option.checkers_cache_clear and not hasattr(config, "workerinput")
+    if clear and has_cache:
+        from pytest_checkers.cache import RESULTS_KEY  # noqa: PLC0415
+
+        for plugin in plugins:
+            config.cache.set(f"{RESULTS_KEY}/{plugin.tool}", {})
+    if base is None:
+        return
+    for plugin in plugins:
+        directory = base / plugin.tool
+        if clear:
+            shutil.rmtree(directory, ignore_errors=True)
+        if config.option.checkers_tool_cache or option is not None:
+            directory.mkdir(parents=True, exist_ok=True)
+            plugin.tool_cache = directory
+            if plugin.cache_env is not None:
+                # the environment is shared between the checkers
+                plugin.env_vars = {**plugin.env_vars, plugin.cache_env: str(directory)}
+
+
+def _configure_executor(config: pytest.Config, plugins: list[CheckersPlugin]) -> None:
+    """Attach the Python API executor, checkers without one keep their subprocess."""
+    from pytest_checkers.executors import executors  # noqa: PLC0415
+
+    if config.option.checkers_executor not in executors:
+        return
+    executor = executors[config.option.checkers_executor](
+        [plugin.tool for plugin in plugins],
+        config.option.checkers_jobs,
+    )
+    config.stash[executor_key] = executor
+    for plugin in plugins:
+        plugin.executor = executor
+
+
+def _configure_persistence(config: pytest.Config, plugins: list[CheckersPlugin]) -> None:
+    """Attach the features backed by pytest's cache directory."""
+    from pytest_checkers.history import History  # noqa: PLC0415
+
+    history = History(config)
+    config.stash[history_key] = history
+    for plugin in plugins:
+        plugin.history = history
+    if config.option.checkers_cache or config.option.checkers_cache_store:
+        from pytest_checkers.cache import ResultCache  # noqa: PLC0415
+        from pytest_checkers.stores import open_store  # noqa: PLC0415
+
+        store = None
+        if config.option.checkers_cache_store:
+            store = open_store(config.option.checkers_cache_store, config.option.checkers_cache_store_size)
+        cache = ResultCache(config, plugins[0].index, store)
+        for plugin in plugins:
+            plugin.cache = cache
+    if config.option.checkers_changed:
+        from pytest_checkers.changes import ChangeDetector  # noqa: PLC0415
+
+        changes = ChangeDetector(config, config.option.checkers_changed_base, plugins[0].index)
+        for plugin in plugins:
+            plugin.changes = changes
+    if config.option.checkers_daemon or config.option.checkers_watch:
+        from pytest_checkers.daemon import daemons  # noqa: PLC0415
+
+        for plugin in plugins:
+            if plugin.tool in daemons:
+                plugin.daemon = daemons[plugin.tool](plugin, config.option.checkers_daemon_timeout)
+
+
+def _configure_packages(config: pytest.Config, plugins: list[CheckersPlugin]) -> None:
+    """Split the checkers into one run per sub-project, in dependency order."""
+    if not config.option.checkers_packages:
+        return
+    _split_packages(config, plugins)
+    has_cache = config.pluginmanager.has_plugin("cacheprovider")
+    if has_cache and config.option.checkers_cache_clear and not hasattr(config, "workerinput"):
+        from pytest_checkers.cache import RESULTS_KEY  # noqa: PLC0415
+
+        for plugin in plugins:
+            for run in plugin.package_runs.values():
+                config.cache.set(f"{RESULTS_KEY}/{run.slot}", {})
+
+
+def _configure_budget(config: pytest.Config, plugins: list[CheckersPlugin]) -> None:
+    """Share `--checkers-cpus` among the checkers runs of the process."""
+    if not config.option.checkers_cpus:
+        return
+    from pytest_checkers.budget import (  # noqa: PLC0415
+        CpuBudget,
+        split,
+    )
+
+    workerinput = getattr(config, "workerinput", None)
+    workers = workerinput["workercount"] if workerinput is not None else 1
+    # without xdist the tests run alongside the background checkers
+    total = split(config.option.checkers_cpus, workers, concurrent_tests=workerinput is None)
+    budget = CpuBudget(total, _expected_runs(plugins))
+    for plugin in plugins:
+        plugin.cpu_budget = budget
+        for run in plugin.package_runs.values():
+            run.cpu_budget = budget
+
+
+def _configure_pyright(config: pytest.Config, plugins: list[CheckersPlugin]) -> None:
+    """Run pyright on node directly, resolved once instead of by the PyPI wrapper on every call."""
+    pyright = next((plugin for plugin in plugins if isinstance(plugin, PyrightPlugin)), None)
+    if pyright is None:
+        return
+    from pytest_checkers.node import resolve  # noqa: PLC0415
+
+    runtime = resolve(config)
+    runs = [pyright, *pyright.package_runs.values()]
+    for run in typing.cast("list[PyrightPlugin]", runs):
+        run.runtime = runtime
+        run.offline = config.option.checkers_pyright_offline
+
+
+def _expected_runs(plugins: Iterable[CheckersPlugin]) -> int:
+    """Count the tool runs of the checkers, one per package in monorepo mode."""
+    return sum(len(plugin.package_runs) or 1 for plugin in plugins)
+
+
+def _split_packages(config: pytest.Config, plugins: list[CheckersPlugin]) -> None:
+    """Discover the sub-projects of the index and give each checker one run per package."""
+    from pytest_checkers.cache import CONFIG_FILES  # noqa: PLC0415
+    from pytest_checkers.packages import (  # noqa: PLC0415
+        ROOT,
+        closure,
+        dependency_graph,
+        discover,
+        ordered,
+    )
+
+    index = plugins[0].index
+    packages = {package.path: package for package in discover(index)}
+    graph = dependency_graph(list(packages.values()), config.rootpath)
+    jobs = config.option.checkers_jobs or min(len(packages), os.process_cpu_count() or 1) or 1
+    scopes: dict[str, frozenset[str]] = {}
+    search_paths: dict[str, list[str]] = {}
+    for name in packages:
+        dependencies = sorted(closure(graph, [name]))
+        scopes[name] = frozenset(rel for dependency in dependencies for rel in packages[dependency].files)
+        search_paths[name] = [
+            str(packages[dependency].source_root(config.rootpath)) for dependency in dependencies if dependency != name
+        ]
+    for plugin in plugins:
+        plugin.package_graph = graph
+        plugin.package_jobs = jobs
+        plugin.package_runs = {
+            name: plugin.for_package(packages[name], scopes[name], search_paths[name]) for name in ordered(graph)
+        }
+    if plugins[0].changes is not None:
+        plugins[0].changes.config_files += [
+            f"{name}/{config_file}" for name in packages if name != ROOT for config_file in CONFIG_FILES
+        ]
+
+
+def pytest_sessionstart(session: pytest.Session) -> None:
+    """Start every checker in the background with `--checkers-early`, overlapping collection."""
+    config = session.config
+    # the xdist controller collects nothing, its workers run the checkers
+    if config.pluginmanager.has_plugin("dsession"):
+        return
+    scheduler = config.stash.get(scheduler_key, None)
+    if scheduler is not None and config.option.checkers_early and not config.option.collectonly:
+        scheduler.start()
+
+
+@pytest.hookimpl(trylast=True)
+def pytest_collection_modifyitems(items: list[pytest.Item], config: pytest.Config) -> None:
+    """Move the checker items before the tests with `--checkers-first`."""
+    if config.option.checkers_order == "first":
+        items.sort(key=lambda item: not isinstance(item, PluginItem))
+
+
+def pytest_runtest_teardown(item: pytest.Item, nextitem: pytest.Item | None) -> None:
+    """Stop the session after the checker items with `--checkers-first` when one failed."""
+    if (
+        item.config.option.checkers_order == "first"
+        and isinstance(item, PluginItem)
+        and not isinstance(nextitem, PluginItem)
+        and item.session.stash.get(failed_key, False)
+    ):
+        item.session.shouldstop = "checkers failed, --checkers-first"
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_protocol(item: pytest.Item) -> None:
+    """Show how long the checkers still running are expected to take, once the first checker item waits on them."""
+    scheduler = item.config.stash.get(scheduler_key, None)
+    if scheduler is None or scheduler.announced or not isinstance(item, PluginItem):
+        return
+    scheduler.announced = True
+    unfinished = scheduler.unfinished()
+    seconds = scheduler.remaining()
+    reporter = item.config.pluginmanager.get_plugin("terminalreporter")
+    if not unfinished or seconds is None or seconds < 1 or reporter is None:
+        return
+    tools = ", ".join(plugin.tool for plugin in unfinished)
+    typing.cast("TerminalReporter", reporter).write_line(f"checkers: ~{seconds:.0f}s remaining ({tools})")
+
+
+def pytest_report_teststatus(report: pytest.TestReport) -> tuple[str, str, tuple[str, dict[str, bool]]] | None:
+    """Report checkers over a resource limit apart from the failures."""
+    if report.when == "call" and report.failed and any(name == LIMIT_PROPERTY for name, _ in report.user_properties):
+        return "limit", "L", ("LIMIT", {"red": True})
+    return None
+
+
+def pytest_deselected(items: list[pytest.Item]) -> None:
+    """Note the session was narrowed, for `--checkers-scope`."""
+    if items:
+        items[0].config.stash[deselected_key] = True
+
+
+def pytest_collection_finish(session: pytest.Session) -> None:
+    """Start the selected checkers in the background, xdist workers only narrowing the checkers they run."""
+    config = session.config
+    if config.option.collectonly:
+        return
+    scheduler = config.stash.get(scheduler_key, None)
+    if scheduler is not None:
+        _scope(session, scheduler.plugins)
+        scheduler.start(session.items)
+    elif hasattr(config, "workerinput"):
+        plugins = [config.pluginmanager.get_plugin(tool) for tool in tools_map]
+        _scope(session, [plugin for plugin in plugins if isinstance(plugin, CheckersPlugin)])
+
+
+def _scope(session: pytest.Session, plugins: list[CheckersPlugin]) -> None:
+    """Narrow the checkers to the selected test modules and the sources they import, on narrowed runs."""
+    config = session.config
+    narrowed = config.args_source == pytest.Config.ArgsSource.ARGS or config.stash.get(deselected_key, False)
+    if not plugins or not config.option.checkers_scope or not narrowed:
+        return
+    from pytest_checkers.scope import scope  # noqa: PLC0415
+
+    roots = {
+        item.path.relative_to(config.rootpath).as_posix()
+        for item in session.items
+        if not isinstance(item, PluginItem) and item.path.is_relative_to(config.rootpath)
+    }
+    files = scope(plugins[0].index, roots) if roots else []
+    if not files:
+        return
+    for plugin in plugins:
+        # started early on the whole tree, or selecting its files already
+        if plugin.future is None and not plugin.granular and not plugin.package_runs:
+            plugin.selected_files = files
+
+
+def pytest_sessionfinish(session: pytest.Session) -> None:
+    """Stop the checkers scheduler."""
+    scheduler = session.config.stash.get(scheduler_key, None)
+    if scheduler is not None:
+        scheduler.shutdown()
+    # xdist workers time the checkers they run too
+    if history_key in session.config.stash:
+        session.config.stash[history_key].save()
+    if scheduler is not None:
+        if session.config.option.checkers_report:
+            _write_report(session.config.option.checkers_report, scheduler.plugins)
+        if session.config.option.checkers_profile_json:
+            _write_profile(session.config.option.checkers_profile_json, scheduler.plugins)
+    if not _watching(session.config):
+        _release(session.config)
+
+
+def pytest_unconfigure(config: pytest.Config) -> None:
+    """Watch the tree with `--checkers-watch` once the session is reported, then release the checkers."""
+    if _watching(config):
+        _watch(config, config.stash[scheduler_key].plugins)
+        _release(config)
+
+
+def _watching(config: pytest.Config) -> bool:
+    """Return whether the controller keeps checking after the session."""
+    return bool(
+        config.option.checkers_watch and scheduler_key in config.stash and not config.option.collectonly,
+    )
+
+
+def _release(config: pytest.Config) -> None:
+    """Stop the executor, and the daemons with `--checkers-daemon-stop`."""
+    executor = config.stash.get(executor_key, None)
+    if executor is not None:
+        executor.shutdown()
+    scheduler = config.stash.get(scheduler_key, None)
+    if scheduler is not None and config.option.checkers_daemon_stop:
+        for plugin in scheduler.plugins:
+            if plugin.daemon is not None:
+                plugin.daemon.stop()
+
+
+def _watch(config: pytest.Config, plugins: list[CheckersPlugin]) -> None:
+    """Check again the checkers each batch of changes affects, until interrupted."""
+    from pytest_checkers.watch import (  # noqa: PLC0415
+        affected,
+        open_watcher,
+    )
+
+    reporter = typing.cast("TerminalReporter", config.pluginmanager.get_plugin("terminalreporter"))
+    watcher = open_watcher(config.rootpath)
+    try:
+        while True:
+            reporter.write_sep("-", f"checkers watching for changes ({watcher.name}), Ctrl-C to stop")
+            changed = watcher.wait(config.option.checkers_watch_debounce)
+            _refresh(config, plugins)
+            runs = affected(plugins, changed)
+            if not runs:
+                continue
+            started = time.perf_counter()
+            for plugin, files in runs.items():
+                plugin.reset()
+                plugin.selected_files = files
+            if plugins[0].cpu_budget is not None:
+                plugins[0].cpu_budget.reset(_expected_runs(runs))
+            _run_watched(list(runs), config.option.checkers_jobs)
+            for plugin in runs:
+                plugin.pytest_terminal_summary(reporter)
+            if plugins[0].history is not None:
+                plugins[0].history.save()
+            failed = [plugin.tool for plugin in runs if plugin.is_error]
+            passed = [plugin.tool for plugin in runs if not plugin.is_error]
+            outcome = ", ".join([*(f"{tool} failed" for tool in failed), *(f"{tool} passed" for tool in passed)])
+            title = f"{len(changed)} changed, {outcome} in {time.perf_counter() - started:.2f}s"
+            reporter.write_sep("=", title, red=bool(failed), green=not failed)
+    except KeyboardInterrupt:
+        reporter.write_line("")
+    finally:
+        watcher.close()
+
+
+def _refresh(config: pytest.Config, plugins: list[CheckersPlugin]) -> None:
+    """List the sources again and rebuild what depends on the listing, keeping the daemons and the executor."""
+    index = FileIndex(config.rootpath)
+    cache = plugins[0].cache
+    if cache is not None:
+        from pytest_checkers.cache import ResultCache  # noqa: PLC0415
+
+        cache = ResultCache(config, index, cache.shared)
+    changes = plugins[0].changes
+    if changes is not None:
+        from pytest_checkers.changes import ChangeDetector  # noqa: PLC0415
+
+        changes = ChangeDetector(config, changes.base, index)
+    for plugin in plugins:
+        plugin.index = index
+        plugin.cache = cache
+        plugin.changes = changes
+    if config.option.checkers_packages:
+        _split_packages(config, plugins)
+
+
+def _run_watched(plugins: list[CheckersPlugin], jobs: int) -> None:
+    """Run the checkers concurrently, the ones the executor cannot run in a thread on the main one."""
+    from pytest_checkers.history import longest_first  # noqa: PLC0415
+
+    background = longest_first(plugin for plugin in plugins if plugin.background)
+    with concurrent.futures.ThreadPoolExecutor(jobs or len(background) or 1, thread_name_prefix="checkers") as pool:
+        futures = [pool.submit(plugin.run_tool) for plugin in background]
+        for plugin in plugins:
+            if not plugin.background:
+                plugin.run_tool()
+        for future in futures:
+            future.result()
+
+
+def _write_report(path: str, plugins: list[CheckersPlugin]) -> None:
+    """Export the parsed diagnostics as JSON."""
+    from pytest_checkers.diagnostics import to_dict  # noqa: PLC0415
+
+    report = {
+        plugin.tool: [to_dict(diagnostic) for diagnostic in plugin.diagnostics]
+        for plugin in plugins
+        if plugin.diagnostics is not None
+    }
+    pathlib.Path(path).write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+
+
+def _write_profile(path: str, plugins: list[CheckersPlugin]) -> None:
+    """Export the checkers profile as JSON."""
+    from pytest_checkers import profiling  # noqa: PLC0415
+    from pytest_checkers.discovery import tool_version  # noqa: PLC0415
+
+    report = {
+        plugin.tool: {"version": tool_version(plugin.tool), **profiling.to_dict(plugin.profile)}
+        for plugin in plugins
+        if plugin.profile is not None
+    }
+    pathlib.Path(path).write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+
+
+def pytest_terminal_summary(terminalreporter: TerminalReporter, config: pytest.Config) -> None:
+    """Show the checkers profile, after the checkers summaries."""
+    scheduler = config.stash.get(scheduler_key, None)
+    if scheduler is None or not config.option.checkers_profile:
+        return
+    from pytest_checkers.profiling import render_table  # noqa: PLC0415
+
+    profiles: dict[Tool, RunProfile] = {
+        plugin.tool: plugin.profile for plugin in scheduler.plugins if plugin.profile is not None
+    }
+    if not profiles:
+        return
+    terminalreporter.write_sep(title="checkers profile", sep="=")
+    for line in render_table(profiles):
+        terminalreporter.write_line(line)
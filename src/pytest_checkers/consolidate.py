@@ -0,0 +1,244 @@
+"""Consolidate."""
+
+from __future__ import annotations
+
+import configparser
+import dataclasses
+import json
+import re
+import typing
+from importlib.metadata import entry_points
+
+from pytest_checkers.settings import tool_settings
+
+if typing.TYPE_CHECKING:
+    import pathlib
+    from collections.abc import Callable
+
+    from pytest_checkers import Tool
+
+type Settings = dict[str, typing.Any]
+
+# flake8 extensions, by code prefix, with a ruff implementation
+RUFF_PREFIXES = frozenset(
+    {
+        "A", "ANN", "ARG", "ASYNC", "B", "BLE", "C4", "C90", "COM", "D", "DJ", "DTZ", "E", "EM", "ERA", "EXE", "F",
+        "FBT", "FIX", "G", "ICN", "INP", "INT", "ISC", "LOG", "N", "PIE", "PT", "PTH", "PYI", "Q", "RET", "RSE",
+        "S", "SIM", "SLF", "T10", "T20", "TC", "TD", "TID", "TRY", "W", "YTT",
+    },
+)  # fmt: skip
+# pycodestyle checks ruff does not implement
+RUFF_MISSING = frozenset(
+    {
+        "E121", "E122", "E123", "E124", "E125", "E126", "E127", "E128", "E129", "E131", "E133", "E704", "W503",
+        "W504", "W601", "W602", "W603", "W604", "W606",
+    },
+)  # fmt: skip
+FLAKE8_DEFAULT_IGNORE = ("E121", "E123", "E126", "E226", "E24", "E704", "W503", "W504")
+FLAKE8_FILES = ((".flake8", "flake8"), ("setup.cfg", "flake8"), ("tox.ini", "flake8"))
+# flake8 options that only shape its output
+FLAKE8_OUTPUT = frozenset(
+    {"benchmark", "color", "count", "format", "jobs", "output-file", "quiet", "require-plugins", "show-source",
+     "statistics", "tee", "verbose"},
+)  # fmt: skip
+ISORT_FILES = ((".isort.cfg", "settings"), (".isort.cfg", "isort"), ("setup.cfg", "isort"), ("tox.ini", "isort"))
+# what `profile = "black"` sets, ruff sorting the same way
+ISORT_BLACK = {
+    "profile": "black",
+    "multi-line-output": 3,
+    "include-trailing-comma": True,
+    "force-grid-wrap": 0,
+    "use-parentheses": True,
+    "ensure-newline-before-comments": True,
+    "split-on-trailing-comma": True,
+}
+ISORT_OPTIONS = {
+    "line-length": "line-length",
+    "src-paths": "src",
+    "known-first-party": "lint.isort.known-first-party",
+    "known-third-party": "lint.isort.known-third-party",
+    "known-local-folder": "lint.isort.known-local-folder",
+    "extra-standard-library": "lint.isort.extra-standard-library",
+    "force-single-line": "lint.isort.force-single-line",
+    "force-sort-within-sections": "lint.isort.force-sort-within-sections",
+    "combine-as-imports": "lint.isort.combine-as-imports",
+    "order-by-type": "lint.isort.order-by-type",
+    "case-sensitive": "lint.isort.case-sensitive",
+    "lines-after-imports": "lint.isort.lines-after-imports",
+    "force-to-top": "lint.isort.force-to-top",
+    "skip": "extend-exclude",
+    "extend-skip": "extend-exclude",
+    "skip-glob": "extend-exclude",
+    "extend-skip-glob": "extend-exclude",
+}
+TARGET_RE = re.compile(r"^py3(\d+)$")
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class RuffCommand:
+    """Ruff invocation standing for another tool, reported under that tool."""
+
+    cmd_flags: list[str]
+    structured_flags: list[str]
+    parser: Tool
+    file_flags: tuple[str, ...] = ("--force-exclude",)
+
+
+def normalize(settings: Settings) -> Settings:
+    """Dash the keys, both spellings being accepted by the tools."""
+    return {key.replace("_", "-"): value for key, value in settings.items()}
+
+
+def ini_settings(root: pathlib.Path, files: tuple[tuple[str, str], ...], table: str) -> Settings | None:
+    """Read the first config file with the tool section, else `[tool.<table>]`, `None` if unreadable."""
+    for name, section in files:
+        path = root / name
+        if not path.is_file():
+            continue
+        parser = configparser.RawConfigParser()
+        try:
+            parser.read(path, encoding="utf-8")
+        except (configparser.Error, UnicodeDecodeError):
+            return None
+        for candidate in (section, f"tool:{section}"):
+            if parser.has_section(candidate):
+                return normalize(dict(parser.items(candidate)))
+    return normalize(tool_settings(root, table))
+
+
+def as_list(value: typing.Any) -> list[str]:  # noqa: ANN401
+    """List of an ini comma or newline separated value, or of a TOML array."""
+    if isinstance(value, list):
+        return [str(item).strip() for item in typing.cast("list[object]", value) if str(item).strip()]
+    return [item.strip() for item in re.split(r"[,\s]+", str(value)) if item.strip()]
+
+
+def as_bool(value: typing.Any) -> bool:  # noqa: ANN401
+    """Boolean of an ini or TOML value."""
+    return value if isinstance(value, bool) else str(value).strip().lower() in {"1", "true", "yes", "on"}
+
+
+def toml_value(value: typing.Any) -> str:  # noqa: ANN401
+    """Render a value as inline TOML."""
+    if isinstance(value, dict):
+        items = typing.cast("dict[str, object]", value).items()
+        return "{" + ", ".join(f"{json.dumps(key)} = {toml_value(item)}" for key, item in items) + "}"
+    if isinstance(value, list):
+        return "[" + ", ".join(toml_value(item) for item in typing.cast("list[object]", value)) + "]"
+    return json.dumps(value)
+
+
+def override(key: str, value: typing.Any) -> list[str]:  # noqa: ANN401
+    """Ruff `--config` flag setting a key."""
+    return ["--config", f"{key} = {toml_value(value)}"]
+
+
+def per_file_ignores(value: typing.Any) -> dict[str, list[str]]:  # noqa: ANN401
+    """Parse flake8 `per-file-ignores`, `pattern: codes` pairs."""
+    ignores: dict[str, list[str]] = {}
+    pattern = None
+    for token in re.split(r"[\s,]+", " ".join(as_list(value))):
+        if token.endswith(":"):
+            pattern = token.removesuffix(":")
+        elif ":" in token:
+            pattern, code = token.split(":", 1)
+            if code:
+                ignores.setdefault(pattern, []).append(code)
+        elif token and pattern is not None:
+            ignores.setdefault(pattern, []).append(token)
+    return ignores
+
+
+def flake8_extensions() -> set[str] | None:
+    """Code prefixes of the installed flake8 extensions, `None` if one has no ruff counterpart."""
+    prefixes = {entry_point.name for entry_point in entry_points(group="flake8.extension")}
+    return prefixes if prefixes <= RUFF_PREFIXES else None
+
+
+def flake8_command(root: pathlib.Path) -> RuffCommand | None:
+    """Map the flake8 configuration onto `ruff check`, `None` when some of it has no ruff equivalent."""
+    settings = ini_settings(root, FLAKE8_FILES, "flake8")
+    extensions = flake8_extensions()
+    if settings is None or extensions is None:
+        return None
+    flags = ["--preview", *override("line-length", int(settings.pop("max-line-length", 79)))]
+    complexity = int(settings.pop("max-complexity", -1))
+    if complexity < 0:
+        extensions.discard("C90")
+    else:
+        flags += override("lint.mccabe.max-complexity", complexity)
+    select = as_list(settings.pop("select", "")) or sorted(extensions)
+    select += as_list(settings.pop("extend-select", ""))
+    if any(code in RUFF_MISSING for code in select):
+        return None
+    ignore = as_list(settings.pop("ignore", ",".join(FLAKE8_DEFAULT_IGNORE)))
+    ignore += as_list(settings.pop("extend-ignore", ""))
+    flags += override("lint.select", select)
+    flags += override("lint.ignore", [code for code in ignore if code not in RUFF_MISSING])
+    if "max-doc-length" in settings:
+        flags += override("lint.pycodestyle.max-doc-length", int(settings.pop("max-doc-length")))
+    if "per-file-ignores" in settings:
+        flags += override("lint.per-file-ignores", per_file_ignores(settings.pop("per-file-ignores")))
+    excludes = as_list(settings.pop("exclude", "")) + as_list(settings.pop("extend-exclude", ""))
+    if excludes:
+        flags += override("extend-exclude", excludes)
+    if "builtins" in settings:
+        flags += override("builtins", as_list(settings.pop("builtins")))
+    if set(settings) - FLAKE8_OUTPUT:
+        return None
+    return RuffCommand(
+        cmd_flags=["check", "--isolated", *flags, "--output-format", "concise"],
+        structured_flags=["check", "--isolated", *flags, "--output-format", "json"],
+        parser="ruff",
+    )
+
+
+def isort_command(root: pathlib.Path) -> RuffCommand | None:
+    """Map the isort configuration onto `ruff check --select I`, only the black profile sorting like ruff."""
+    settings = ini_settings(root, ISORT_FILES, "isort")
+    if settings is None or settings.get("profile") != "black":
+        return None
+    flags = override("line-length", 88)
+    excludes: list[str] = []
+    for key, value in settings.items():
+        if key in ISORT_BLACK:
+            if str(value).lower() != str(ISORT_BLACK[key]).lower():
+                return None
+        elif key not in ISORT_OPTIONS:
+            return None
+        elif ISORT_OPTIONS[key] == "extend-exclude":
+            excludes += as_list(value)
+        elif key in {"line-length", "lines-after-imports"}:
+            flags += override(ISORT_OPTIONS[key], int(value))
+        elif isinstance(value, bool) or str(value).lower() in {"true", "false"}:
+            flags += override(ISORT_OPTIONS[key], as_bool(value))
+        else:
+            flags += override(ISORT_OPTIONS[key], as_list(value))
+    if excludes:
+        flags += override("extend-exclude", excludes)
+    flags = ["check", "--isolated", *flags, "--select", "I", "--diff"]
+    return RuffCommand(cmd_flags=flags, structured_flags=flags, parser="isort")
+
+
+def black_command(root: pathlib.Path) -> RuffCommand | None:
+    """Map the black configuration onto `ruff format`, which has no equivalent of its regex excludes."""
+    settings = normalize(tool_settings(root, "black"))
+    flags = override("line-length", int(settings.pop("line-length", 88)))
+    if settings.pop("skip-string-normalization", False):
+        flags += override("format.quote-style", "preserve")
+    if settings.pop("skip-magic-trailing-comma", False):
+        flags += override("format.skip-magic-trailing-comma", value=True)
+    targets = [int(match[1]) for target in settings.pop("target-version", []) if (match := TARGET_RE.match(target))]
+    if targets:
+        flags += override("target-version", f"py3{min(targets)}")
+    if settings:
+        return None
+    flags = ["format", "--isolated", *flags, "--check", "--diff"]
+    return RuffCommand(cmd_flags=flags, structured_flags=flags, parser="black")
+
+
+commands: dict[Tool, Callable[[pathlib.Path], RuffCommand | None]] = {
+    "black": black_command,
+    "flake8": flake8_command,
+    "isort": isort_command,
+}
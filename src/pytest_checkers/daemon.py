@@ -0,0 +1,114 @@
+"""Daemon."""
+
+from __future__ import annotations
+
+import abc
+import subprocess
+import sys
+import threading
+import typing
+
+if typing.TYPE_CHECKING:
+    import pathlib
+
+    from pytest_checkers import Tool
+    from pytest_checkers.checkers import CheckersPlugin
+
+DEFAULT_IDLE_TIMEOUT = 3600
+
+
+class Daemon(abc.ABC):
+    """Long-lived checker process per project root."""
+
+    module: str
+
+    def __init__(self, plugin: CheckersPlugin, idle_timeout: int = DEFAULT_IDLE_TIMEOUT) -> None:
+        """Init."""
+        self.plugin = plugin
+        self.idle_timeout = idle_timeout
+        self._lock = threading.Lock()
+
+    @property
+    def status_file(self) -> pathlib.Path:
+        """Daemon status file, in pytest's cache directory."""
+        return self.plugin.config.cache.mkdir("checkers-daemon") / f"{self.plugin.tool}.json"
+
+    def command(self, *args: str) -> list[str]:
+        """Daemon client command."""
+        return [sys.executable, "-m", self.module, *args]
+
+    def call(self, *args: str) -> subprocess.CompletedProcess[str]:
+        """Call the daemon client from the project root."""
+        return subprocess.run(  # noqa: S603
+            self.command(*args),
+            capture_output=True,
+            text=True,
+            check=False,
+            cwd=self.plugin.config.rootpath,
+            env=self.plugin.env_vars,
+        )
+
+    @abc.abstractmethod
+    def status(self) -> bool:
+        """Return whether the daemon is up and running."""
+        ...
+
+    @abc.abstractmethod
+    def stop(self) -> None:
+        """Stop the daemon."""
+        ...
+
+    @abc.abstractmethod
+    def check(self, flags: list[str], paths: list[str]) -> tuple[str, int]:
+        """Send an incremental check request, starting the daemon when needed."""
+        ...
+
+    def run(self, flags: list[str], paths: list[str]) -> tuple[str, int] | None:
+        """Check through the daemon, `None` when it is unhealthy and was stopped."""
+        with self._lock:
+            try:
+                output, returncode = self.check(flags, paths)
+                if self.healthy(returncode):
+                    return output, returncode
+                self.stop()
+            except OSError:
+                pass
+            return None
+
+    def healthy(self, returncode: int) -> bool:
+        """Return whether the daemon survived a check with the given exit code."""
+        _ = returncode
+        return self.status()
+
+
+class DmypyDaemon(Daemon):
+    """Mypy daemon, `dmypy`."""
+
+    module = "mypy.dmypy"
+
+    def call(self, *args: str) -> subprocess.CompletedProcess[str]:
+        """Call `dmypy` with the project status file."""
+        return super().call("--status-file", str(self.status_file), *args)
+
+    def status(self) -> bool:
+        """Return whether `dmypy` is up and running."""
+        return self.call("status").returncode == 0
+
+    def stop(self) -> None:
+        """Stop `dmypy`, killing it if it does not respond."""
+        if self.call("stop").returncode != 0:
+            self.call("kill")
+
+    def check(self, flags: list[str], paths: list[str]) -> tuple[str, int]:
+        """Run `dmypy run`, which starts or restarts the daemon when needed."""
+        result = self.call("run", "--timeout", str(self.idle_timeout), "--", *flags, *paths)
+        return result.stdout + result.stderr, result.returncode
+
+    def healthy(self, returncode: int) -> bool:
+        """Return whether `dmypy` survived, mypy exits 2 also on blocking errors."""
+        return returncode in {0, 1} or self.status()
+
+
+daemons: dict[Tool, type[Daemon]] = {
+    "mypy": DmypyDaemon,
+}
@@ -0,0 +1,199 @@
+"""Diagnostics."""
+
+from __future__ import annotations
+
+import dataclasses
+import json
+import pathlib
+import re
+import typing
+
+if typing.TYPE_CHECKING:
+    from collections.abc import (
+        Callable,
+        Iterable,
+    )
+
+    from pytest_checkers import Tool
+
+type Parser = Callable[[str, pathlib.Path], list[Diagnostic]]
+
+FLAKE8_FORMAT = "%(path)s\t%(row)d\t%(col)d\t%(code)s\t%(text)s"
+HUNK_RE = re.compile(r"^@@ -(\d+)")
+PARSE_ERROR_RES = (
+    re.compile(r"^error: cannot parse: (?P<path>.+?):(?P<line>\d+):(?P<col>\d+)(?:: (?P<message>.*))?$"),
+    re.compile(
+        r"^error: cannot format (?P<path>.+?): Cannot parse(?: for target version [^:]+)?: "
+        r"(?P<line>\d+):(?P<col>\d+): (?P<message>.*)$",
+    ),
+)
+
+
+@dataclasses.dataclass(frozen=True, order=True, slots=True)
+class Diagnostic:
+    """Single finding of a checker."""
+
+    path: str
+    line: int
+    col: int
+    code: str
+    severity: str
+    message: str
+
+    def render(self) -> str:
+        """Render as a terminal line."""
+        return f"{self.path}:{self.line}:{self.col}: {self.severity} [{self.code}] {self.message}"
+
+
+def relative_path(path: str, root: pathlib.Path) -> str:
+    """Path relative to the project root when below it, relative paths being from the current directory."""
+    resolved = pathlib.Path(path).absolute()
+    try:
+        return resolved.relative_to(root).as_posix()
+    except ValueError:
+        return path
+
+
+def parse_ruff(output: str, root: pathlib.Path) -> list[Diagnostic]:
+    """Parse `ruff check --output-format json`."""
+    return [
+        Diagnostic(
+            path=relative_path(entry["filename"], root),
+            line=entry["location"]["row"],
+            col=entry["location"]["column"],
+            code=entry["code"] or "syntax-error",
+            severity="error",
+            message=entry["message"],
+        )
+        for entry in json.loads(output or "[]")
+    ]
+
+
+def parse_pyright(output: str, root: pathlib.Path) -> list[Diagnostic]:
+    """Parse `pyright --outputjson`."""
+    return [
+        Diagnostic(
+            path=relative_path(entry["file"], root),
+            line=entry["range"]["start"]["line"] + 1,
+            col=entry["range"]["start"]["character"] + 1,
+            code=entry.get("rule", ""),
+            severity=entry["severity"],
+            message=entry["message"],
+        )
+        for entry in json.loads(output or "{}").get("generalDiagnostics", [])
+    ]
+
+
+def parse_mypy(output: str, root: pathlib.Path) -> list[Diagnostic]:
+    """Parse `mypy -O json`, one object per line."""
+    diagnostics: list[Diagnostic] = []
+    for line in output.splitlines():
+        if not line.startswith("{"):
+            continue
+        entry = json.loads(line)
+        diagnostics.append(
+            Diagnostic(
+                path=relative_path(entry["file"], root),
+                line=entry["line"],
+                col=entry["column"] + 1,
+                code=entry["code"] or "",
+                severity=entry["severity"],
+                message=entry["message"],
+            ),
+        )
+    return diagnostics
+
+
+def parse_ty(output: str, root: pathlib.Path) -> list[Diagnostic]:
+    """Parse `ty check --output-format gitlab`."""
+    severities = {"blocker": "error", "critical": "error", "major": "error", "minor": "warning", "info": "info"}
+    diagnostics: list[Diagnostic] = []
+    for entry in json.loads(output or "[]"):
+        begin = entry["location"].get("positions", {}).get("begin", {})
+        code = entry["check_name"]
+        severity: str = entry["severity"]
+        diagnostics.append(
+            Diagnostic(
+                path=relative_path(entry["location"]["path"], root),
+                line=begin.get("line", 1),
+                col=begin.get("column", 1),
+                code=code,
+                severity=severities.get(severity, severity),
+                message=entry["description"].removeprefix(f"{code}: "),
+            ),
+        )
+    return diagnostics
+
+
+def parse_flake8(output: str, root: pathlib.Path) -> list[Diagnostic]:
+    """Parse flake8 with `FLAKE8_FORMAT`."""
+    diagnostics: list[Diagnostic] = []
+    for line in output.splitlines():
+        fields = line.split("\t", 4)
+        if len(fields) != 5:  # noqa: PLR2004
+            continue
+        path, row, col, code, text = fields
+        diagnostics.append(
+            Diagnostic(
+                path=relative_path(path, root),
+                line=int(row),
+                col=int(col),
+                code=code,
+                severity="warning" if code.startswith("W") else "error",
+                message=text,
+            ),
+        )
+    return diagnostics
+
+
+def parse_diff(code: str, message: str) -> Parser:
+    """Build a parser of unified diffs, one diagnostic per hunk."""
+
+    def _parse(output: str, root: pathlib.Path) -> list[Diagnostic]:
+        diagnostics: list[Diagnostic] = []
+        path = ""
+        for line in output.splitlines():
+            if line.startswith("--- "):
+                path = relative_path(line[4:].split("\t")[0].removesuffix(":before").strip(), root)
+            elif (hunk := HUNK_RE.match(line)) and path:
+                diagnostics.append(Diagnostic(path, max(int(hunk[1]), 1), 1, code, "error", message))
+            elif parse_error := next(filter(None, (regex.match(line) for regex in PARSE_ERROR_RES)), None):
+                diagnostics.append(
+                    Diagnostic(
+                        path=relative_path(parse_error["path"], root),
+                        line=int(parse_error["line"]),
+                        col=int(parse_error["col"]),
+                        code="parse",
+                        severity="error",
+                        message=parse_error["message"] or "cannot parse",
+                    ),
+                )
+        return diagnostics
+
+    return _parse
+
+
+def merge(*groups: Iterable[Diagnostic]) -> list[Diagnostic]:
+    """Merge diagnostics, dropping duplicates and sorting by location."""
+    return sorted({diagnostic for group in groups for diagnostic in group})
+
+
+def to_dict(diagnostic: Diagnostic) -> dict[str, typing.Any]:
+    """Serialize a diagnostic."""
+    return dataclasses.asdict(diagnostic)
+
+
+def from_dict(data: dict[str, typing.Any]) -> Diagnostic:
+    """Deserialize a diagnostic."""
+    return Diagnostic(**data)
+
+
+parsers: dict[Tool, Parser] = {
+    "black": parse_diff("format", "would reformat"),
+    "flake8": parse_flake8,
+    "isort": parse_diff("isort", "imports are incorrectly sorted"),
+    "mypy": parse_mypy,
+    "pyright": parse_pyright,
+    "ruff": parse_ruff,
+    "ty": parse_ty,
+}
@@ -0,0 +1,27 @@
+"""Discovery."""
+
+from __future__ import annotations
+
+import functools
+import importlib.metadata
+
+
+@functools.cache
+def distribution(name: str) -> importlib.metadata.Distribution | None:
+    """Find an installed distribution, memoized for the process."""
+    try:
+        return importlib.metadata.distribution(name)
+    except importlib.metadata.PackageNotFoundError:
+        return None
+
+
+def is_installed(name: str) -> bool:
+    """Return whether a distribution is installed."""
+    return distribution(name) is not None
+
+
+@functools.cache
+def tool_version(name: str) -> str:
+    """Installed version of a distribution, empty when not installed."""
+    dist = distribution(name)
+    return "" if dist is None else dist.version
@@ -0,0 +1,202 @@
+"""Executors."""
+
+from __future__ import annotations
+
+import abc
+import concurrent.futures
+import contextlib
+import io
+import multiprocessing
+import os
+import pathlib
+import sys
+import threading
+import typing
+
+if typing.TYPE_CHECKING:
+    from collections.abc import Callable
+    from multiprocessing.context import BaseContext
+
+    from pytest_checkers import Tool
+    from pytest_checkers.checkers import CheckersPlugin
+
+type Main = Callable[[list[str]], int | None]
+
+
+def _mypy(argv: list[str]) -> int:
+    from mypy import api  # noqa: PLC0415
+
+    stdout, stderr, returncode = api.run(argv)
+    sys.stdout.write(stdout)
+    sys.stderr.write(stderr)
+    return returncode
+
+
+def _black(argv: list[str]) -> int | None:
+    import black  # noqa: PLC0415
+    from black import cache  # noqa: PLC0415
+
+    # read once at import, before the `BLACK_CACHE_DIR` of the run was set
+    cache.CACHE_DIR = cache.get_cache_dir()
+    return black.main(argv, prog_name="black")  # type: ignore[no-any-return]
+
+
+def _isort(argv: list[str]) -> None:
+    from isort import main  # noqa: PLC0415
+
+    main.main(argv)
+
+
+def _flake8(argv: list[str]) -> int:
+    from flake8.main import cli  # type: ignore[import-untyped]  # noqa: PLC0415
+
+    return cli.main(argv)  # type: ignore[no-any-return]
+
+
+mains: dict[Tool, Main] = {
+    "black": _black,
+    "flake8": _flake8,
+    "isort": _isort,
+    "mypy": _mypy,
+}
+modules: dict[Tool, str] = {
+    "black": "black",
+    "flake8": "flake8.main.cli",
+    "isort": "isort.main",
+    "mypy": "mypy.api",
+}
+
+
+def run_main(
+    tool: Tool,
+    argv: list[str],
+    env: dict[str, str] | None = None,
+    cwd: pathlib.Path | None = None,
+) -> tuple[str, int]:
+    """Run the command line entry point of a tool in this process, capturing its output."""
+    # binary backed, some tools write to `sys.stdout.buffer`
+    stdout = io.TextIOWrapper(io.BytesIO(), encoding="utf-8", errors="replace", write_through=True)
+    stderr = io.TextIOWrapper(io.BytesIO(), encoding="utf-8", errors="replace", write_through=True)
+    argv_ = sys.argv
+    environ = os.environ.copy()
+    cwd_ = pathlib.Path.cwd()
+    sys.argv = [tool, *argv]
+    if env is not None:
+        os.environ.clear()
+        os.environ.update(env)
+    if cwd is not None:
+        os.chdir(cwd)
+    try:
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            try:
+                returncode = mains[tool](argv) or 0
+            except SystemExit as exc:
+                returncode = exc.code if isinstance(exc.code, int) else int(exc.code is not None)
+    finally:
+        sys.argv = argv_
+        if cwd is not None:
+            os.chdir(cwd_)
+        if env is not None:
+            os.environ.clear()
+            os.environ.update(environ)
+    output = b"".join(stream.buffer.getvalue() for stream in (stdout, stderr))
+    return output.decode("utf-8", errors="replace"), returncode
+
+
+def _preload(tools: list[Tool], cwd: pathlib.Path) -> None:
+    os.chdir(cwd)
+    for tool in tools:
+        __import__(modules[tool])
+
+
+class Executor(abc.ABC):
+    """Run checkers through their Python API instead of a new interpreter."""
+
+    name: str
+    threadsafe = True
+
+    def __init__(self, tools: list[Tool], jobs: int = 0) -> None:
+        """Init."""
+        _ = tools, jobs
+
+    def supports(self, tool: Tool) -> bool:
+        """Return whether the tool has a Python entry point."""
+        return tool in mains
+
+    @abc.abstractmethod
+    def run(self, plugin: CheckersPlugin, argv: list[str]) -> tuple[str, int]:
+        """Run the tool with the given arguments."""
+        raise NotImplementedError
+
+    def shutdown(self) -> None:  # noqa: B027
+        """Release the executor resources."""
+
+
+class InProcessExecutor(Executor):
+    """Run in the pytest process, reusing the imported tool modules.
+
+    Redirecting `sys.stdout` is process-wide, so runs are serialized and
+    kept out of the background scheduler threads.
+    """
+
+    name = "inprocess"
+    threadsafe = False
+
+    def __init__(self, tools: list[Tool], jobs: int = 0) -> None:
+        """Init."""
+        super().__init__(tools, jobs)
+        self._lock = threading.Lock()
+
+    def run(self, plugin: CheckersPlugin, argv: list[str]) -> tuple[str, int]:
+        """Run the tool in this process."""
+        with self._lock:
+            return run_main(plugin.tool, argv, plugin.env_vars, plugin.cwd)
+
+
+class PoolExecutor(Executor):
+    """Run in a pool of worker processes forked from a server with the tool modules preloaded."""
+
+    name = "pool"
+
+    def __init__(self, tools: list[Tool], jobs: int = 0) -> None:
+        """Init."""
+        super().__init__(tools, jobs)
+        self.tools: list[Tool] = [tool for tool in tools if tool in mains]
+        self.jobs = jobs or len(self.tools) or 1
+        self._lock = threading.Lock()
+        self._pool: concurrent.futures.ProcessPoolExecutor | None = None
+
+    def pool(self, cwd: pathlib.Path) -> concurrent.futures.ProcessPoolExecutor:
+        """Worker pool, started on first use in the working directory of the checkers."""
+        with self._lock:
+            if self._pool is None:
+                context: BaseContext
+                if "forkserver" in multiprocessing.get_all_start_methods():
+                    context = multiprocessing.get_context("forkserver")
+                    context.set_forkserver_preload([modules[tool] for tool in self.tools])
+                else:  # pragma: no cover  # windows, macOS without forkserver
+                    context = multiprocessing.get_context("spawn")
+                self._pool = concurrent.futures.ProcessPoolExecutor(
+                    max_workers=self.jobs,
+                    mp_context=context,
+                    initializer=_preload,
+                    initargs=(self.tools, cwd),
+                )
+            return self._pool
+
+    def run(self, plugin: CheckersPlugin, argv: list[str]) -> tuple[str, int]:
+        """Run the tool in a worker process."""
+        return self.pool(plugin.cwd).submit(run_main, plugin.tool, argv, plugin.env_vars, plugin.cwd).result()
+
+    def shutdown(self) -> None:
+        """Stop the worker processes."""
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=True, cancel_futures=True)
+                self._pool = None
+
+
+executors: dict[str, type[Executor]] = {
+    "inprocess": InProcessExecutor,
+    "pool": PoolExecutor,
+}
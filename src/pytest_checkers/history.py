@@ -0,0 +1,104 @@
+"""History."""
+
+from __future__ import annotations
+
+import math
+import threading
+import typing
+
+from pytest_checkers.cache import load
+
+if typing.TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    import pytest
+
+    from pytest_checkers.checkers import CheckersPlugin
+
+HISTORY_KEY = "checkers/history"
+# weight of the latest run in the decaying average
+DECAY = 0.3
+
+
+def bucket(files: int) -> int:
+    """File-count bucket of a run, each twice as large as the previous one."""
+    return max(files, 0).bit_length()
+
+
+def valid_bucket(key: object) -> typing.TypeGuard[str]:
+    """Return whether a stored key is a bucket, as `record` writes them."""
+    return isinstance(key, str) and key.isascii() and key.isdigit()
+
+
+class History:
+    """Decaying averages of the checkers durations, per run and file-count bucket, kept in pytest's cache."""
+
+    def __init__(self, config: pytest.Config, decay: float = DECAY) -> None:
+        """Init."""
+        self.config = config
+        self.decay = decay
+        self._lock = threading.Lock()
+        self.entries = self.load()
+        self.updated: dict[tuple[str, str], float] = {}
+
+    def load(self) -> dict[str, dict[str, float]]:
+        """Durations stored by the previous sessions, malformed slots and buckets left out."""
+        entries: dict[str, dict[str, float]] = {}
+        for slot, runs in load(self.config.cache, HISTORY_KEY).items():
+            if isinstance(runs, dict):
+                entries[slot] = {
+                    key: float(value)
+                    for key, value in typing.cast("dict[object, object]", runs).items()
+                    if valid_bucket(key) and isinstance(value, int | float) and not isinstance(value, bool)
+                }
+        return entries
+
+    def estimate(self, slot: str, files: int) -> float | None:
+        """Estimate the duration of a run from the closest bucket recorded, `None` when never recorded."""
+        with self._lock:
+            runs = self.entries.get(slot)
+            if not runs:
+                return None
+            target = bucket(files)
+            closest = min(runs, key=lambda key: (abs(int(key) - target), -int(key)))
+            return runs[closest]
+
+    def record(self, slot: str, files: int, seconds: float) -> None:
+        """Fold the duration of a run into its average."""
+        key = str(bucket(files))
+        with self._lock:
+            runs = self.entries.setdefault(slot, {})
+            previous = runs.get(key)
+            runs[key] = seconds if previous is None else self.decay * seconds + (1 - self.decay) * previous
+            self.updated[slot, key] = runs[key]
+
+    def save(self) -> None:
+        """Store the averages updated by this process over the ones other processes stored meanwhile."""
+        with self._lock:
+            if not self.updated:
+                return
+            entries = self.load()
+            for (slot, key), seconds in self.updated.items():
+                entries.setdefault(slot, {})[key] = seconds
+            self.config.cache.set(HISTORY_KEY, entries)
+            self.updated = {}
+
+
+def longest_first(plugins: Iterable[CheckersPlugin]) -> list[CheckersPlugin]:
+    """Order the checkers by expected duration, the ones never timed first, registration order breaking ties."""
+
+    def longest(plugin: CheckersPlugin) -> float:
+        seconds = plugin.expected_duration()
+        return -math.inf if seconds is None else -seconds
+
+    return sorted(plugins, key=longest)
+
+
+def remaining(jobs: int, running: Iterable[float], pending: Iterable[float]) -> float:
+    """Time until the last checker is expected to finish, the pending ones taking the first free job."""
+    slots = [max(seconds, 0.0) for seconds in running]
+    slots = sorted(slots + [0.0] * (jobs - len(slots)))
+    for seconds in pending:
+        slots[0] += seconds
+        slots.sort()
+    return max(slots, default=0.0)
@@ -0,0 +1,27 @@
+"""Imports."""
+
+from __future__ import annotations
+
+import ast
+import typing
+
+if typing.TYPE_CHECKING:
+    from collections.abc import Iterator
+
+
+def imports(tree: ast.Module) -> Iterator[tuple[int, str]]:
+    """Yield the level and name of the imports of a module, `from` imports with their submodule candidates.
+
+    Relative names are relative to the package `level` steps up, empty for
+    the package itself (`from . import name`).
+    """
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                yield 0, alias.name
+        elif isinstance(node, ast.ImportFrom):
+            base = node.module or ""
+            if base or node.level:
+                yield node.level, base
+            for alias in node.names:
+                yield node.level, f"{base}.{alias.name}" if base else alias.name
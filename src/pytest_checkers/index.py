@@ -0,0 +1,117 @@
+"""Index."""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import pathlib
+import subprocess
+import threading
+import typing
+
+if typing.TYPE_CHECKING:
+    from collections.abc import (
+        Iterable,
+        Iterator,
+    )
+
+SOURCE_SUFFIXES = frozenset({".py", ".pyi"})
+EXCLUDED_DIRS = frozenset({"__pycache__", "build", "dist", "node_modules", "site-packages", "venv"})
+
+type StatKey = tuple[int, int, int]
+
+
+def iter_source_files(root: pathlib.Path) -> Iterator[pathlib.Path]:
+    """Yield Python sources below root, skipping hidden, virtualenv and build directories."""
+    stack = [root]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if not entry.name.startswith(".") and entry.name not in EXCLUDED_DIRS:
+                        stack.append(pathlib.Path(entry.path))
+                elif pathlib.Path(entry.name).suffix in SOURCE_SUFFIXES:
+                    yield pathlib.Path(entry.path)
+
+
+def git_source_files(root: pathlib.Path) -> list[pathlib.Path] | None:
+    """Python sources below root tracked or not ignored by git, `None` outside a git work tree."""
+    if not any((parent / ".git").exists() for parent in (root, *root.parents)):
+        return None
+    try:
+        result = subprocess.run(
+            ["git", "ls-files", "-z", "--cached", "--others", "--exclude-standard"],  # noqa: S607
+            cwd=root,
+            capture_output=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    paths: list[pathlib.Path] = []
+    for name in result.stdout.decode(errors="surrogateescape").split("\0"):
+        rel = pathlib.PurePosixPath(name)
+        if rel.suffix not in SOURCE_SUFFIXES:
+            continue
+        if any(part.startswith(".") or part in EXCLUDED_DIRS for part in rel.parts[:-1]):
+            continue
+        paths.append(root.joinpath(*rel.parts))
+    return paths
+
+
+def stat_key(path: pathlib.Path) -> StatKey:
+    """Stat fingerprint of a file."""
+    stat = path.stat()
+    return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+
+def file_digest(path: pathlib.Path) -> str:
+    """Content hash of a file."""
+    with path.open("rb") as fp:
+        return hashlib.file_digest(fp, "sha256").hexdigest()
+
+
+class FileIndex:
+    """Python sources of the project, listed once per session and shared by every checker."""
+
+    def __init__(self, root: pathlib.Path) -> None:
+        """Init."""
+        self.root = root
+        self._lock = threading.Lock()
+        self._stats: dict[str, StatKey] | None = None
+        self._digests: dict[str, str] = {}
+
+    def stats(self) -> dict[str, StatKey]:
+        """Stat fingerprint of every source, by path relative to the root, in path order."""
+        with self._lock:
+            if self._stats is None:
+                paths = git_source_files(self.root)
+                if paths is None:
+                    paths = list(iter_source_files(self.root))
+                stats: dict[str, StatKey] = {}
+                for path in paths:
+                    try:
+                        stats[path.relative_to(self.root).as_posix()] = stat_key(path)
+                    except OSError:
+                        continue
+                self._stats = dict(sorted(stats.items()))
+            return self._stats
+
+    def subset(self, rels: Iterable[str]) -> FileIndex:
+        """Index of some of the sources, sharing the stats and content hashes already computed."""
+        stats = self.stats()
+        subset = FileIndex(self.root)
+        subset._stats = {rel: stats[rel] for rel in rels if rel in stats}
+        subset._digests = self._digests
+        subset._lock = self._lock
+        return subset
+
+    def paths(self) -> list[pathlib.Path]:
+        """Absolute paths of every source, in path order."""
+        return [self.root / rel for rel in self.stats()]
+
+    def digest(self, rel: str) -> str:
+        """Content hash of a source, computed once per session."""
+        with self._lock:
+            if rel not in self._digests:
+                self._digests[rel] = file_digest(self.root / rel)
+            return self._digests[rel]
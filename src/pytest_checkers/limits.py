@@ -0,0 +1,97 @@
+"""Limits."""
+
+from __future__ import annotations
+
+import dataclasses
+import os
+import re
+import signal
+import sys
+import typing
+
+SETTINGS_TABLE = "pytest-checkers"
+SIZE_RE = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([KMGT]?)(i?B)?\s*$", re.IGNORECASE)
+SIZE_UNITS = {"": 0, "K": 1, "M": 2, "G": 3, "T": 4}
+# Python, libc, node and rust allocation failures
+MEMORY_ERRORS = ("MemoryError", "Cannot allocate memory", "out of memory", "bad_alloc", "memory allocation of")
+# aborted, killed or crashed, as allocation failures often end
+MEMORY_SIGNALS = frozenset({-signal.SIGABRT, -signal.SIGKILL, -signal.SIGSEGV})
+
+
+def parse_size(value: int | str) -> int:
+    """Parse a size in bytes, `512MiB` and `2GB` standing for binary multiples."""
+    if isinstance(value, int):
+        return value
+    match = SIZE_RE.match(value)
+    if match is None:
+        msg = f"invalid size {value!r}"
+        raise ValueError(msg)
+    number, unit, _ = match.groups()
+    return int(float(number) * 1024 ** SIZE_UNITS[unit.upper()])
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class Limits:
+    """Resource limits of a checker subprocess."""
+
+    timeout: float | None = None
+    max_rss: int | None = None
+    nice: int = 0
+    cpus: tuple[int, ...] | None = None
+
+    @classmethod
+    def from_settings(cls, settings: dict[str, typing.Any], tool: str) -> Limits:
+        """Read `[tool.pytest-checkers]`, the per-tool tables overriding the top-level defaults."""
+        merged = {key: value for key, value in settings.items() if not isinstance(value, dict)}
+        tool_settings = settings.get(tool, {})
+        if isinstance(tool_settings, dict):
+            merged.update(typing.cast("dict[str, typing.Any]", tool_settings))
+        max_rss = merged.get("max-rss")
+        cpus = merged.get("cpus")
+        return cls(
+            timeout=float(merged["timeout"]) if merged.get("timeout") else None,
+            max_rss=parse_size(max_rss) if max_rss else None,
+            nice=int(merged.get("nice", 0)),
+            cpus=tuple(int(cpu) for cpu in cpus) if cpus else None,
+        )
+
+    def apply(self, pid: int) -> str | None:
+        """Apply the limits to a started process, the memory limit and the affinity on Linux only.
+
+        Applied from the parent, a `preexec_fn` not being safe with the
+        scheduler threads running, right after the tool started. Return why
+        they could not be applied, `None` when applied.
+        """
+        if os.name != "posix" or (self.max_rss is None and not self.nice and self.cpus is None):
+            return None
+        try:
+            if self.nice:
+                os.setpriority(os.PRIO_PROCESS, pid, os.getpriority(os.PRIO_PROCESS, pid) + self.nice)
+            if sys.platform == "linux":
+                import resource  # noqa: PLC0415
+
+                if self.max_rss is not None:
+                    resource.prlimit(pid, resource.RLIMIT_AS, (self.max_rss, self.max_rss))
+                if self.cpus is not None:
+                    os.sched_setaffinity(pid, self.cpus)
+        except ProcessLookupError:
+            # already exited
+            pass
+        except OSError as exc:
+            # not permitted, or CPUs out of the allowed set
+            return f"could not apply its limits: {exc}"
+        return None
+
+    def breach(self, output: str, returncode: int, *, timed_out: bool) -> str | None:
+        """Describe the limit a run hit, `None` when within limits.
+
+        Running out of address space has no dedicated exit status, it is told
+        from the allocation errors tools print and the signals they die of.
+        """
+        if timed_out:
+            return f"timed out after {self.timeout:g}s"
+        if self.max_rss is None or returncode == 0:
+            return None
+        if returncode in MEMORY_SIGNALS or any(error in output for error in MEMORY_ERRORS):
+            return f"exceeded the memory limit of {self.max_rss / 1024**2:g} MiB"
+        return None
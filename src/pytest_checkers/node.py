@@ -0,0 +1,144 @@
+"""Node."""
+
+from __future__ import annotations
+
+import dataclasses
+import importlib.util
+import json
+import os
+import pathlib
+import shutil
+import typing
+
+from pytest_checkers.cache import load
+from pytest_checkers.discovery import tool_version
+
+if typing.TYPE_CHECKING:
+    from collections.abc import Mapping
+
+    import pytest
+
+RUNTIME_KEY = "checkers/pyright-runtime"
+# settings of the PyPI wrapper changing which node and which pyright it runs
+WRAPPER_ENV = (
+    "PYRIGHT_PYTHON_FORCE_VERSION",
+    "PYRIGHT_PYTHON_PYLANCE_VERSION",
+    "PYRIGHT_PYTHON_USE_BUNDLED_PYRIGHT",
+    "PYRIGHT_PYTHON_GLOBAL_NODE",
+    "PYRIGHT_PYTHON_NODEJS_WHEEL",
+    "PYRIGHT_PYTHON_NODE_VERSION",
+    "PYRIGHT_PYTHON_CACHE_DIR",
+    "PYRIGHT_PYTHON_ENV_DIR",
+    "XDG_CACHE_HOME",
+)
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class NodeRuntime:
+    """Node executable and pyright CLI script the PyPI wrapper would run."""
+
+    node: str
+    script: str
+
+    def command(self) -> list[str]:
+        """Command running pyright without the wrapper."""
+        return [self.node, self.script]
+
+    def exists(self) -> bool:
+        """Return whether both files are still there."""
+        return pathlib.Path(self.node).is_file() and pathlib.Path(self.script).is_file()
+
+
+def _flag(env: Mapping[str, str], name: str, *, default: bool) -> bool:
+    """Boolean setting of the wrapper, parsed as it parses them."""
+    value = env.get(name)
+    return default if value is None else value.lower() in {"1", "t", "on", "true"}
+
+
+def _cache_dir(env: Mapping[str, str]) -> pathlib.Path:
+    """Directory the wrapper keeps its downloads in."""
+    base = env.get("PYRIGHT_PYTHON_CACHE_DIR") or env.get("XDG_CACHE_HOME")
+    return (pathlib.Path(base) if base else pathlib.Path.home() / ".cache") / "pyright-python"
+
+
+def _package_version(path: pathlib.Path) -> str | None:
+    """Version of an npm package, `None` when unreadable."""
+    try:
+        version = json.loads(path.read_text(encoding="utf-8")).get("version")
+    except (OSError, ValueError, AttributeError):
+        return None
+    return version if isinstance(version, str) else None
+
+
+def find_script(env: Mapping[str, str]) -> pathlib.Path | None:
+    """CLI script of the pyright npm package, bundled with the wrapper or downloaded to its cache, never fetched."""
+    if env.get("PYRIGHT_PYTHON_PYLANCE_VERSION"):
+        # the pyright version of a Pylance release is only known online
+        return None
+    spec = importlib.util.find_spec("pyright")
+    if spec is None or spec.origin is None:
+        return None
+    bundled = pathlib.Path(spec.origin).parent / "dist"
+    bundled_version = _package_version(bundled / "package.json")
+    version = env.get("PYRIGHT_PYTHON_FORCE_VERSION") or bundled_version
+    if version is None or version == "latest":
+        return None
+    if version == bundled_version and _flag(env, "PYRIGHT_PYTHON_USE_BUNDLED_PYRIGHT", default=True):
+        candidate = bundled
+    else:
+        candidate = _cache_dir(env) / version / "node_modules" / "pyright"
+        if _package_version(candidate / "package.json") != version:
+            return None
+    script = candidate / "index.js"
+    return script if script.is_file() else None
+
+
+def find_node(env: Mapping[str, str]) -> pathlib.Path | None:
+    """Node executable, looked up in the wrapper's order: nodejs-wheel, the global one, then its nodeenv."""
+    windows = os.name == "nt"
+    if _flag(env, "PYRIGHT_PYTHON_NODEJS_WHEEL", default=True):
+        spec = importlib.util.find_spec("nodejs_wheel")
+        if spec is not None and spec.origin is not None:
+            root = pathlib.Path(spec.origin).parent
+            candidate = root / "node.exe" if windows else root / "bin" / "node"
+            if candidate.is_file():
+                return candidate
+    if _flag(env, "PYRIGHT_PYTHON_GLOBAL_NODE", default=True) and not env.get("PYRIGHT_PYTHON_NODE_VERSION"):
+        found = shutil.which("node.exe" if windows else "node")
+        if found is not None:
+            return pathlib.Path(found)
+    env_dir = env.get("PYRIGHT_PYTHON_ENV_DIR")
+    base = pathlib.Path(env_dir) if env_dir else _cache_dir(env) / "nodeenv"
+    candidate = base / "Scripts" / "node.exe" if windows else base / "bin" / "node"
+    return candidate if candidate.is_file() else None
+
+
+def runtime_key(env: Mapping[str, str]) -> str:
+    """Key of a resolution, the wrapper version and the settings it reads."""
+    settings = {name: env[name] for name in WRAPPER_ENV if name in env}
+    return json.dumps([tool_version("pyright"), settings], sort_keys=True)
+
+
+def resolve(config: pytest.Config, env: Mapping[str, str] | None = None) -> NodeRuntime | None:
+    """Node runtime of pyright, cached across sessions until the wrapper or its settings change.
+
+    `None` when the wrapper would have to download node or the npm
+    package first, in which case it is left to do so.
+    """
+    env = os.environ if env is None else env
+    key = runtime_key(env)
+    has_cache = config.pluginmanager.has_plugin("cacheprovider")
+    if has_cache:
+        entry = load(config.cache, RUNTIME_KEY)
+        if entry.get("key") == key and isinstance(entry.get("node"), str) and isinstance(entry.get("script"), str):
+            runtime = NodeRuntime(entry["node"], entry["script"])
+            if runtime.exists():
+                return runtime
+    node = find_node(env)
+    script = find_script(env)
+    if node is None or script is None:
+        return None
+    runtime = NodeRuntime(str(node), str(script))
+    if has_cache:
+        config.cache.set(RUNTIME_KEY, {"key": key, **dataclasses.asdict(runtime)})
+    return runtime
@@ -0,0 +1,156 @@
+"""Packages."""
+
+from __future__ import annotations
+
+import ast
+import dataclasses
+import graphlib
+import pathlib
+import typing
+
+from pytest_checkers.imports import imports
+
+if typing.TYPE_CHECKING:
+    from collections.abc import (
+        Iterable,
+        Mapping,
+    )
+
+    from pytest_checkers.index import FileIndex
+
+PROJECT_FILES = ("pyproject.toml", "setup.py", "setup.cfg")
+ROOT = "."
+
+type Graph = dict[str, set[str]]
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class Package:
+    """Sub-project of a monorepo, with its own project file."""
+
+    path: str
+    files: tuple[str, ...]
+    modules: frozenset[str]
+
+    def directory(self, root: pathlib.Path) -> pathlib.Path:
+        """Absolute directory of the package."""
+        return root if self.path == ROOT else root / self.path
+
+    def source_root(self, root: pathlib.Path) -> pathlib.Path:
+        """Directory its modules are imported from, `src` in a src layout."""
+        directory = self.directory(root)
+        return directory / "src" if (directory / "src").is_dir() else directory
+
+
+def slug(path: str) -> str:
+    """File name standing for a package path, the root one included."""
+    import urllib.parse  # noqa: PLC0415
+
+    return urllib.parse.quote(path, safe="").replace(".", "%2E")
+
+
+def package_of(rel: str, root: pathlib.Path, memo: dict[str, str]) -> str:
+    """Closest directory of a source holding a project file, the root when none below it does."""
+    parent = pathlib.PurePosixPath(rel).parent
+    chain: list[str] = []
+    while str(parent) != ROOT:
+        key = parent.as_posix()
+        if key in memo:
+            found = memo[key]
+            break
+        chain.append(key)
+        if any((root / key / name).is_file() for name in PROJECT_FILES):
+            found = key
+            break
+        parent = parent.parent
+    else:
+        found = ROOT
+    for key in chain:
+        memo[key] = found
+    return found
+
+
+def top_level_module(rel: str) -> str | None:
+    """Top-level import name a source provides, relative to its package, `src` layouts included."""
+    parts = list(pathlib.PurePosixPath(rel).parts)
+    if parts[0] == "src" and len(parts) > 1:
+        del parts[0]
+    name = pathlib.PurePosixPath(parts[0]).stem if len(parts) == 1 else parts[0]
+    return name if name.isidentifier() and name != "__init__" else None
+
+
+def discover(index: FileIndex) -> list[Package]:
+    """Sub-projects of the tree, each source belonging to the closest one."""
+    memo: dict[str, str] = {}
+    files: dict[str, list[str]] = {}
+    for rel in index.stats():
+        files.setdefault(package_of(rel, index.root, memo), []).append(rel)
+    packages: list[Package] = []
+    for path, rels in sorted(files.items()):
+        prefix = "" if path == ROOT else f"{path}/"
+        modules = {top_level_module(rel.removeprefix(prefix)) for rel in rels}
+        packages.append(Package(path, tuple(rels), frozenset(module for module in modules if module)))
+    return packages
+
+
+def imported_modules(source: bytes | str) -> set[str]:
+    """Top-level names of the absolute imports of a source, none when it does not parse."""
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError):
+        return set()
+    return {name.partition(".")[0] for level, name in imports(tree) if not level}
+
+
+def dependency_graph(packages: list[Package], root: pathlib.Path) -> Graph:
+    """Map each package to the packages it imports from."""
+    providers: dict[str, str] = {}
+    for package in packages:
+        for module in package.modules:
+            providers.setdefault(module, package.path)
+    graph: Graph = {}
+    for package in packages:
+        imported: set[str] = set()
+        for rel in package.files:
+            try:
+                imported |= imported_modules((root / rel).read_bytes())
+            except OSError:
+                continue
+        graph[package.path] = {providers[module] for module in imported if module in providers} - {package.path}
+    return graph
+
+
+def closure(graph: Mapping[str, set[str]], names: Iterable[str]) -> set[str]:
+    """Collect packages and everything they depend on, transitively."""
+    seen: set[str] = set()
+    stack = list(names)
+    while stack:
+        name = stack.pop()
+        if name not in seen:
+            seen.add(name)
+            stack.extend(graph.get(name, ()))
+    return seen
+
+
+def dependents(graph: Mapping[str, set[str]], names: Iterable[str]) -> set[str]:
+    """Collect packages and everything depending on them, transitively."""
+    reverse: Graph = {}
+    for name, dependencies in graph.items():
+        for dependency in dependencies:
+            reverse.setdefault(dependency, set()).add(name)
+    return closure(reverse, names)
+
+
+def ordered(graph: Mapping[str, set[str]]) -> list[str]:
+    """Order packages dependencies first, by name within a level or when imports are cyclic."""
+    sorter = graphlib.TopologicalSorter({name: sorted(dependencies) for name, dependencies in sorted(graph.items())})
+    try:
+        sorter.prepare()
+    except graphlib.CycleError:
+        return sorted(graph)
+    order: list[str] = []
+    while sorter.is_active():
+        ready = sorted(sorter.get_ready())
+        order.extend(ready)
+        sorter.done(*ready)
+    return order
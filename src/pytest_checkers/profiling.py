@@ -0,0 +1,102 @@
+"""Profiling."""
+
+from __future__ import annotations
+
+import dataclasses
+import os
+import sys
+import typing
+
+if typing.TYPE_CHECKING:
+    import resource
+    import subprocess
+    from collections.abc import Iterable
+
+    from pytest_checkers import Tool
+
+PROFILE_COLUMNS = ("tool", "source", "wall s", "user s", "sys s", "max RSS MiB", "output KiB", "files")
+
+
+@dataclasses.dataclass(slots=True)
+class RunProfile:
+    """Cost of a single checker run."""
+
+    source: str = "subprocess"
+    wall: float = 0.0
+    user: float = 0.0
+    system: float = 0.0
+    max_rss: int = 0
+    output_bytes: int = 0
+    files: int = 0
+
+    def add_rusage(self, rusage: resource.struct_rusage) -> None:
+        """Add the resource usage of a child process."""
+        self.user += rusage.ru_utime
+        self.system += rusage.ru_stime
+        # kilobytes on Linux, bytes on macOS
+        max_rss = rusage.ru_maxrss if sys.platform == "darwin" else rusage.ru_maxrss * 1024
+        self.max_rss = max(self.max_rss, max_rss)
+
+    def row(self, tool: Tool) -> tuple[str, ...]:
+        """Table row."""
+        return (
+            tool,
+            self.source,
+            f"{self.wall:.2f}",
+            f"{self.user:.2f}",
+            f"{self.system:.2f}",
+            f"{self.max_rss / 1024**2:.1f}",
+            f"{self.output_bytes / 1024:.1f}",
+            str(self.files),
+        )
+
+
+def wait(process: subprocess.Popen[bytes]) -> tuple[int, resource.struct_rusage | None]:
+    """Wait for a child process, with its resource usage where `os.wait4` is available."""
+    if not hasattr(os, "wait4"):  # pragma: no cover  # windows
+        return process.wait(), None
+    try:
+        _, status, rusage = os.wait4(process.pid, 0)
+    except ChildProcessError:
+        return process.wait(), None
+    process.returncode = os.waitstatus_to_exitcode(status)
+    return process.returncode, rusage
+
+
+def combine(profiles: Iterable[RunProfile]) -> RunProfile:
+    """Combine the profiles of the shards of a run, which ran side by side."""
+    combined = RunProfile()
+    sources: set[str] = set()
+    for profile in profiles:
+        sources.add(profile.source)
+        combined.wall = max(combined.wall, profile.wall)
+        combined.user += profile.user
+        combined.system += profile.system
+        combined.max_rss = max(combined.max_rss, profile.max_rss)
+        combined.output_bytes += profile.output_bytes
+        combined.files += profile.files
+    combined.source = "+".join(sorted(sources)) or combined.source
+    return combined
+
+
+def render_table(profiles: dict[Tool, RunProfile]) -> list[str]:
+    """Render profiles as aligned table lines, slowest first."""
+    rows: list[tuple[str, ...]] = [PROFILE_COLUMNS]
+    rows.extend(profile.row(tool) for tool, profile in sorted(profiles.items(), key=lambda item: -item[1].wall))
+    widths = [max(len(row[index]) for row in rows) for index in range(len(PROFILE_COLUMNS))]
+    lines: list[str] = []
+    for row in rows:
+        cells = [cell.ljust(width) for cell, width in zip(row[:2], widths[:2], strict=True)]
+        cells.extend(cell.rjust(width) for cell, width in zip(row[2:], widths[2:], strict=True))
+        lines.append("  ".join(cells))
+    return lines
+
+
+def to_dict(profile: RunProfile) -> dict[str, typing.Any]:
+    """Serialize a profile."""
+    return dataclasses.asdict(profile)
+
+
+def from_dict(data: dict[str, typing.Any]) -> RunProfile:
+    """Deserialize a profile."""
+    return RunProfile(**data)
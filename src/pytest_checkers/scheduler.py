@@ -0,0 +1,115 @@
+"""Scheduler."""
+
+from __future__ import annotations
+
+import concurrent.futures
+import heapq
+import os
+import pathlib
+import threading
+import time
+import typing
+
+if typing.TYPE_CHECKING:
+    import pytest
+
+    from pytest_checkers.checkers import CheckersPlugin
+
+
+def balanced_shards(paths: list[str], count: int) -> list[list[str]]:
+    """Split files into shards of balanced total size, largest files first."""
+    sizes: dict[str, int] = {}
+    for path in paths:
+        try:
+            sizes[path] = pathlib.Path(path).stat().st_size
+        except OSError:
+            sizes[path] = 0
+    shards: list[list[str]] = [[] for _ in range(count)]
+    loads = [(0, index) for index in range(count)]
+    for path in sorted(paths, key=lambda path: (-sizes[path], path)):
+        load, index = heapq.heappop(loads)
+        shards[index].append(path)
+        heapq.heappush(loads, (load + sizes[path], index))
+    return [sorted(shard) for shard in shards]
+
+
+class CheckersScheduler:
+    """Run enabled checkers concurrently in the background."""
+
+    def __init__(self, plugins: list[CheckersPlugin], jobs: int = 0) -> None:
+        """Init."""
+        self.plugins = plugins
+        self.jobs = jobs or min(len(plugins), os.process_cpu_count() or 1) or 1
+        self.executor: concurrent.futures.ThreadPoolExecutor | None = None
+        self.discarded: list[CheckersPlugin] = []
+        self.started: dict[CheckersPlugin, float] = {}
+        self.announced = False
+        self._lock = threading.Lock()
+
+    def start(self, items: list[pytest.Item] | None = None) -> None:
+        """Submit every checker with a selected item, or every checker before collection, longest expected first."""
+        from pytest_checkers.checkers import PluginItem  # noqa: PLC0415
+        from pytest_checkers.history import longest_first  # noqa: PLC0415
+
+        if items is None:
+            plugins = [plugin for plugin in self.plugins if plugin.background and not plugin.granular]
+        else:
+            selected = {item.name for item in items if isinstance(item, PluginItem)}
+            for plugin in self.plugins:
+                if plugin.tool not in selected and plugin.future is not None:
+                    if not plugin.future.cancel():
+                        self.discarded.append(plugin)
+                    plugin.future = None
+            plugins = [plugin for plugin in self.plugins if plugin.tool in selected and plugin.background]
+        plugins = [plugin for plugin in plugins if plugin.future is None]
+        if not plugins:
+            return
+        if self.executor is None:
+            self.executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=self.jobs,
+                thread_name_prefix="checkers",
+            )
+        for plugin in longest_first(plugins):
+            plugin.future = self.executor.submit(self.run, plugin)
+
+    def run(self, plugin: CheckersPlugin) -> None:
+        """Execute a checker, noting when it started."""
+        with self._lock:
+            self.started[plugin] = time.monotonic()
+        plugin.execute()
+
+    def remaining(self) -> float | None:
+        """Seconds the unfinished checkers are expected to take, `None` when one of them was never timed."""
+        from pytest_checkers.history import remaining  # noqa: PLC0415
+
+        now = time.monotonic()
+        running: list[float] = []
+        pending: list[float] = []
+        for plugin in self.unfinished():
+            expected = plugin.expected_duration()
+            if expected is None:
+                return None
+            with self._lock:
+                started = self.started.get(plugin)
+            if started is None:
+                pending.append(expected)
+            else:
+                running.append(expected - (now - started))
+        return remaining(self.jobs, running, pending)
+
+    def unfinished(self) -> list[CheckersPlugin]:
+        """Checkers submitted and not done yet, in submission order."""
+        return [plugin for plugin in self.plugins if plugin.future is not None and not plugin.future.done()]
+
+    def shutdown(self) -> None:
+        """Drop pending checkers and wait for running ones."""
+        if self.executor is None:
+            return
+        self.executor.shutdown(wait=True, cancel_futures=True)
+        self.executor = None
+        # started early, then deselected
+        for plugin in self.discarded:
+            plugin.cmd_output = ""
+            plugin.cmd_returncode = 0
+            plugin.diagnostics = None
+            plugin.profile = None
@@ -0,0 +1,90 @@
+"""Scope."""
+
+from __future__ import annotations
+
+import ast
+import pathlib
+import typing
+
+from pytest_checkers.imports import imports
+
+if typing.TYPE_CHECKING:
+    from collections.abc import (
+        Iterable,
+        Iterator,
+    )
+
+    from pytest_checkers.index import FileIndex
+
+
+class ModuleMap:
+    """Import names of the indexed sources, both from their package root and from the project root."""
+
+    def __init__(self, index: FileIndex) -> None:
+        """Init."""
+        rels = set(index.stats())
+        self.files: dict[str, str] = {}
+        self.names: dict[str, str] = {}
+        for rel in sorted(rels):
+            names = list(self.module_names(rel, rels))
+            if names:
+                self.names[rel] = names[0]
+            for name in names:
+                self.files.setdefault(name, rel)
+
+    @staticmethod
+    def module_names(rel: str, rels: set[str]) -> Iterator[str]:
+        """Names a source is imported as, from the top of its package chain first (`src` layouts)."""
+        path = pathlib.PurePosixPath(rel)
+        parts = path.with_suffix("").parts
+        if parts[-1] == "__init__":
+            parts = parts[:-1]
+        dirs = path.parent.parts
+        start = len(dirs)
+        while start and any(f"{'/'.join(dirs[:start])}/__init__{suffix}" in rels for suffix in (".py", ".pyi")):
+            start -= 1
+        if parts[start:]:
+            yield ".".join(parts[start:])
+        if start and parts:
+            yield ".".join(parts)
+
+    def resolve(self, name: str) -> Iterator[str]:
+        """Yield the sources an import runs, the module and its parent packages."""
+        parts = name.split(".")
+        for end in range(1, len(parts) + 1):
+            rel = self.files.get(".".join(parts[:end]))
+            if rel is not None:
+                yield rel
+
+
+def imported_names(tree: ast.Module, module: str, *, package: bool) -> Iterator[str]:
+    """Absolute names of the imports of a module, relative ones resolved, submodule candidates included."""
+    parent = module.split(".") if package else module.split(".")[:-1]
+    for level, name in imports(tree):
+        if not level:
+            yield name
+            continue
+        base = parent[: len(parent) - level + 1]
+        resolved = ".".join([*base, name] if name else base)
+        if resolved:
+            yield resolved
+
+
+def scope(index: FileIndex, roots: Iterable[str]) -> list[str]:
+    """Collect the sources the roots import, transitively, the roots included."""
+    modules = ModuleMap(index)
+    seen: set[str] = set()
+    stack = [rel for rel in roots if rel in modules.names]
+    while stack:
+        rel = stack.pop()
+        if rel in seen:
+            continue
+        seen.add(rel)
+        try:
+            tree = ast.parse((index.root / rel).read_bytes(), rel)
+        except (OSError, SyntaxError, ValueError):
+            continue
+        package = pathlib.PurePosixPath(rel).stem == "__init__"
+        for name in imported_names(tree, modules.names[rel], package=package):
+            stack.extend(modules.resolve(name))
+    return sorted(seen)
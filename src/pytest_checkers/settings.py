@@ -0,0 +1,46 @@
+"""Settings."""
+
+from __future__ import annotations
+
+import functools
+import tomllib
+import typing
+
+if typing.TYPE_CHECKING:
+    import pathlib
+
+
+@functools.cache
+def pyproject(root: pathlib.Path) -> dict[str, typing.Any]:
+    """Parse the `pyproject.toml` of the project, empty when missing or invalid."""
+    try:
+        with (root / "pyproject.toml").open("rb") as fp:
+            return tomllib.load(fp)
+    except (OSError, tomllib.TOMLDecodeError):
+        return {}
+
+
+def tool_settings(root: pathlib.Path, name: str) -> dict[str, typing.Any]:
+    """Get the `[tool.<name>]` table of `pyproject.toml`."""
+    settings = pyproject(root).get("tool", {}).get(name, {})
+    return typing.cast("dict[str, typing.Any]", settings) if isinstance(settings, dict) else {}
+
+
+def config_file(root: pathlib.Path, files: tuple[tuple[str, str | None], ...], table: str) -> pathlib.Path | None:
+    """Find the config file of a tool, the first one holding its section, else `pyproject.toml` with its table."""
+    import configparser  # noqa: PLC0415
+
+    for name, section in files:
+        path = root / name
+        if not path.is_file():
+            continue
+        if section is None:
+            return path
+        parser = configparser.RawConfigParser()
+        try:
+            parser.read(path, encoding="utf-8")
+        except (configparser.Error, UnicodeDecodeError):
+            continue
+        if parser.has_section(section) or parser.has_section(f"tool:{section}"):
+            return path
+    return root / "pyproject.toml" if tool_settings(root, table) else None
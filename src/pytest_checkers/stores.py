@@ -0,0 +1,171 @@
+"""Stores."""
+
+from __future__ import annotations
+
+import abc
+import contextlib
+import hashlib
+import os
+import pathlib
+import tempfile
+import threading
+
+DEFAULT_MAX_SIZE = 512 * 1024**2
+DEFAULT_MAX_ENTRY = 16 * 1024**2
+HTTP_TIMEOUT = 10.0
+
+
+def seal(data: bytes) -> bytes:
+    """Prefix an entry with its content hash."""
+    return hashlib.sha256(data).hexdigest().encode() + b"\n" + data
+
+
+def unseal(blob: bytes) -> bytes | None:
+    """Entry of a sealed blob, `None` when corrupted or truncated."""
+    digest, _, data = blob.partition(b"\n")
+    return data if hashlib.sha256(data).hexdigest().encode() == digest else None
+
+
+class Store(abc.ABC):
+    """Content-addressed entries, integrity-checked and shared by every runner pointing at it."""
+
+    name = "store"
+
+    def __init__(self, max_entry: int = DEFAULT_MAX_ENTRY) -> None:
+        """Init."""
+        self.max_entry = max_entry
+
+    def get(self, key: str) -> bytes | None:
+        """Entry stored under a key, `None` when missing or corrupted."""
+        blob = self.read(key)
+        if blob is None:
+            return None
+        data = unseal(blob)
+        if data is None:
+            self.discard(key)
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        """Store an entry, skipping the ones over the entry size bound."""
+        if len(data) <= self.max_entry:
+            self.write(key, seal(data))
+
+    @abc.abstractmethod
+    def read(self, key: str) -> bytes | None:
+        """Read a sealed blob."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def write(self, key: str, blob: bytes) -> None:
+        """Write a sealed blob."""
+        raise NotImplementedError
+
+    def discard(self, key: str) -> None:  # noqa: B027
+        """Drop a corrupted blob."""
+
+
+class DirectoryStore(Store):
+    """Entries in a local or shared directory, evicting the least recently used past `max_size`."""
+
+    name = "directory"
+
+    def __init__(
+        self,
+        path: pathlib.Path,
+        max_size: int = DEFAULT_MAX_SIZE,
+        max_entry: int = DEFAULT_MAX_ENTRY,
+    ) -> None:
+        """Init."""
+        super().__init__(max_entry)
+        self.path = path
+        self.max_size = max_size
+        self._lock = threading.Lock()
+
+    def entry_path(self, key: str) -> pathlib.Path:
+        """Path of an entry, fanned out by key prefix."""
+        return self.path / key[:2] / key
+
+    def read(self, key: str) -> bytes | None:
+        """Read a sealed blob, marking it as recently used."""
+        path = self.entry_path(key)
+        try:
+            blob = path.read_bytes()
+            os.utime(path)
+        except OSError:
+            return None
+        return blob
+
+    def write(self, key: str, blob: bytes) -> None:
+        """Write a sealed blob atomically, so that concurrent runners never read a partial one."""
+        path = self.entry_path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile(dir=path.parent, prefix=".tmp-", delete=False) as fp:
+                fp.write(blob)
+            pathlib.Path(fp.name).replace(path)
+        except OSError:
+            return
+        self.evict()
+
+    def discard(self, key: str) -> None:
+        """Drop a corrupted blob."""
+        with contextlib.suppress(OSError):
+            self.entry_path(key).unlink()
+
+    def evict(self) -> None:
+        """Remove the least recently used entries until the store fits `max_size`."""
+        with self._lock:
+            entries: list[tuple[float, int, pathlib.Path]] = []
+            for path in self.path.glob("??/*"):
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+            size = sum(entry_size for _, entry_size, _ in entries)
+            for _, entry_size, path in sorted(entries, key=lambda entry: entry[0]):
+                if size <= self.max_size:
+                    break
+                with contextlib.suppress(OSError):
+                    path.unlink()
+                size -= entry_size
+
+
+class HttpStore(Store):
+    """Entries behind an HTTP endpoint answering `GET` and `PUT` on `<url>/<key>`, eviction left to the server."""
+
+    name = "http"
+
+    def __init__(self, url: str, max_entry: int = DEFAULT_MAX_ENTRY, timeout: float = HTTP_TIMEOUT) -> None:
+        """Init."""
+        super().__init__(max_entry)
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+
+    def read(self, key: str) -> bytes | None:
+        """Fetch a sealed blob, an unreachable server counting as a miss."""
+        import urllib.request  # noqa: PLC0415
+
+        try:
+            with urllib.request.urlopen(f"{self.url}/{key}", timeout=self.timeout) as response:  # noqa: S310
+                blob: bytes = response.read(self.max_entry + 1024)
+        except OSError:
+            return None
+        return blob
+
+    def write(self, key: str, blob: bytes) -> None:
+        """Upload a sealed blob, failures leaving the result uncached."""
+        import urllib.request  # noqa: PLC0415
+
+        request = urllib.request.Request(f"{self.url}/{key}", data=blob, method="PUT")  # noqa: S310
+        request.add_header("Content-Type", "application/octet-stream")
+        with contextlib.suppress(OSError):
+            urllib.request.urlopen(request, timeout=self.timeout).close()  # noqa: S310
+
+
+def open_store(location: str, max_size: int = DEFAULT_MAX_SIZE) -> Store:
+    """Store of an `http(s)://` URL, a `file://` URL or a directory path."""
+    if location.startswith(("http://", "https://")):
+        return HttpStore(location)
+    path = location.removeprefix("file://")
+    return DirectoryStore(pathlib.Path(path).expanduser(), max_size)
@@ -0,0 +1,258 @@
+"""Watch."""
+
+from __future__ import annotations
+
+import abc
+import os
+import pathlib
+import select
+import struct
+import sys
+import time
+import typing
+
+from pytest_checkers.cache import CONFIG_FILES
+from pytest_checkers.index import (
+    EXCLUDED_DIRS,
+    SOURCE_SUFFIXES,
+    iter_source_files,
+    stat_key,
+)
+
+if typing.TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from pytest_checkers.checkers import CheckersPlugin
+    from pytest_checkers.index import StatKey
+
+DEFAULT_DEBOUNCE = 0.3
+POLL_INTERVAL = 0.5
+# events were dropped, everything is to be checked again
+OVERFLOW = "*"
+# config files read by a single tool, the others affecting every tool
+TOOL_CONFIGS = {
+    ".flake8": "flake8",
+    "mypy.ini": "mypy",
+    ".mypy.ini": "mypy",
+    "pyrightconfig.json": "pyright",
+    "ruff.toml": "ruff",
+    ".ruff.toml": "ruff",
+    ".isort.cfg": "isort",
+}
+
+IN_MODIFY = 0x2
+IN_CLOSE_WRITE = 0x8
+IN_MOVED_FROM = 0x40
+IN_MOVED_TO = 0x80
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_Q_OVERFLOW = 0x4000
+IN_IGNORED = 0x8000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+EVENT = struct.Struct("iIII")
+
+
+def watched(name: str) -> bool:
+    """Return whether a directory is watched, hidden, virtualenv and build ones being skipped."""
+    return not name.startswith(".") and name not in EXCLUDED_DIRS
+
+
+def relevant(rel: str) -> bool:
+    """Return whether a changed path can affect a checker."""
+    path = pathlib.PurePosixPath(rel)
+    if not all(watched(part) for part in path.parts[:-1]):
+        return False
+    return path.suffix in SOURCE_SUFFIXES or path.name in CONFIG_FILES
+
+
+class Watcher(abc.ABC):
+    """Changes below the project root, batched over bursts of saves."""
+
+    name = "watcher"
+
+    def __init__(self, root: pathlib.Path) -> None:
+        """Init."""
+        self.root = root
+
+    @abc.abstractmethod
+    def poll(self, timeout: float | None) -> set[str]:
+        """Relevant paths changed within a timeout, waiting for the first one without."""
+        raise NotImplementedError
+
+    def wait(self, debounce: float = DEFAULT_DEBOUNCE) -> set[str]:
+        """Wait for changes, until none happened for `debounce` seconds."""
+        changed: set[str] = set()
+        while not changed:
+            changed = self.poll(None)
+        while batch := self.poll(debounce):
+            changed |= batch
+        return changed
+
+    def close(self) -> None:  # noqa: B027
+        """Release the watcher."""
+
+
+class PollingWatcher(Watcher):
+    """Compare stat snapshots of the tree at an interval, wherever inotify is unavailable."""
+
+    name = "polling"
+
+    def __init__(self, root: pathlib.Path, interval: float = POLL_INTERVAL) -> None:
+        """Init."""
+        super().__init__(root)
+        self.interval = interval
+        self.snapshot = self.scan()
+
+    def scan(self) -> dict[str, StatKey]:
+        """Stat of the sources and the root config files."""
+        paths = [*iter_source_files(self.root), *(self.root / name for name in CONFIG_FILES)]
+        snapshot: dict[str, StatKey] = {}
+        for path in paths:
+            try:
+                snapshot[path.relative_to(self.root).as_posix()] = stat_key(path)
+            except OSError:
+                continue
+        return snapshot
+
+    def poll(self, timeout: float | None) -> set[str]:
+        """Relevant paths changed within a timeout, waiting for the first one without."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = self.interval if deadline is None else min(self.interval, deadline - time.monotonic())
+            if remaining > 0:
+                time.sleep(remaining)
+            snapshot = self.scan()
+            rels = snapshot.keys() | self.snapshot.keys()
+            changed = {rel for rel in rels if snapshot.get(rel) != self.snapshot.get(rel)}
+            self.snapshot = snapshot
+            if changed or (deadline is not None and time.monotonic() >= deadline):
+                return {rel for rel in changed if relevant(rel)}
+
+
+class InotifyWatcher(Watcher):
+    """Linux inotify watches on every directory of the tree, through libc."""
+
+    name = "inotify"
+
+    def __init__(self, root: pathlib.Path) -> None:
+        """Init, raising `OSError` when inotify is unavailable or out of watches."""
+        super().__init__(root)
+        if not sys.platform.startswith("linux"):
+            msg = "inotify is only available on Linux"
+            raise OSError(msg)
+        import ctypes  # noqa: PLC0415
+        import ctypes.util  # noqa: PLC0415
+
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.dirs: dict[int, pathlib.Path] = {}
+        try:
+            self.add_tree(root)
+        except OSError:
+            self.close()
+            raise
+
+    def add_tree(self, top: pathlib.Path) -> None:
+        """Watch a directory and the directories below it, skipping hidden, virtualenv and build ones."""
+        import ctypes  # noqa: PLC0415
+
+        stack = [top]
+        while stack:
+            directory = stack.pop()
+            wd = self._libc.inotify_add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+            if wd < 0:
+                raise OSError(ctypes.get_errno(), f"inotify_add_watch failed on {directory}")
+            self.dirs[wd] = directory
+            try:
+                entries = list(os.scandir(directory))
+            except OSError:
+                continue
+            stack.extend(
+                pathlib.Path(entry.path)
+                for entry in entries
+                if entry.is_dir(follow_symlinks=False) and watched(entry.name)
+            )
+
+    def poll(self, timeout: float | None) -> set[str]:
+        """Relevant paths changed within a timeout, waiting for the first one without."""
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return set()
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+        return {rel for rel in self.parse(data) if rel == OVERFLOW or relevant(rel)}
+
+    def parse(self, data: bytes) -> Iterable[str]:
+        """Paths of a buffer of inotify events, relative to the root, watching the new directories."""
+        offset = 0
+        while offset + EVENT.size <= len(data):
+            wd, mask, _, length = EVENT.unpack_from(data, offset)
+            start = offset + EVENT.size
+            offset = start + length
+            name = data[start:offset].rstrip(b"\0")
+            if mask & IN_Q_OVERFLOW:
+                yield OVERFLOW
+                continue
+            if mask & IN_IGNORED:
+                self.dirs.pop(wd, None)
+                continue
+            directory = self.dirs.get(wd)
+            if directory is None or not name:
+                continue
+            path = directory / os.fsdecode(name)
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO) and watched(path.name):
+                    try:
+                        self.add_tree(path)
+                    except OSError:
+                        yield OVERFLOW
+                        continue
+                    # sources moved in with the directory raise no events of their own
+                    yield from (source.relative_to(self.root).as_posix() for source in iter_source_files(path))
+                continue
+            yield path.relative_to(self.root).as_posix()
+
+    def close(self) -> None:
+        """Release the inotify descriptor and its watches."""
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+def open_watcher(root: pathlib.Path) -> Watcher:
+    """Watch with inotify where available, else by polling."""
+    try:
+        return InotifyWatcher(root)
+    except OSError:
+        return PollingWatcher(root)
+
+
+def affected(plugins: Iterable[CheckersPlugin], changed: set[str]) -> dict[CheckersPlugin, list[str] | None]:
+    """Checkers a change affects, with the sources to check again, `None` standing for the whole tree.
+
+    A config change affects the tools reading it, every tool for the shared
+    ones. Whole-program tools check the tree again on any source change,
+    file-local ones only the changed sources still present.
+    """
+    configs = {pathlib.PurePosixPath(rel).name for rel in changed if pathlib.PurePosixPath(rel).name in CONFIG_FILES}
+    sources = sorted(rel for rel in changed if pathlib.PurePosixPath(rel).suffix in SOURCE_SUFFIXES)
+    runs: dict[CheckersPlugin, list[str] | None] = {}
+    for plugin in plugins:
+        if OVERFLOW in changed or any(TOOL_CONFIGS.get(name, plugin.tool) == plugin.tool for name in configs):
+            runs[plugin] = None
+        elif not sources:
+            continue
+        elif plugin.file_local and not plugin.package_runs:
+            present = [rel for rel in sources if (plugin.config.rootpath / rel).is_file()]
+            if present:
+                runs[plugin] = present
+        else:
+            runs[plugin] = None
+    return runs
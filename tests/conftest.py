@@ -2,8 +2,13 @@
 
 from __future__ import annotations
 
+import io
 import os
 import typing
+from unittest.mock import (
+    MagicMock,
+    patch,
+)
 
 import pytest
 
@@ -14,6 +19,9 @@ from pytest_checkers import (
     Tool,
 )
 
+if typing.TYPE_CHECKING:
+    import pathlib
+
 pytest_plugins = ["pytester"]
 
 
@@ -78,6 +86,51 @@ def tool_flags() -> dict[Tool, list[str]]:
     }
 
 
+@pytest.fixture
+def tool_plain_flags() -> dict[Tool, list[str]]:
+    """Tool flags in plain mode."""
+    return {
+        "pyright": [],
+        "ty": ["check"],
+        "mypy": [],
+        "ruff": ["check", "--output-format", "concise"],
+        "flake8": ["--color=never"],
+        "black": ["--diff"],
+        "isort": ["--diff"],
+    }
+
+
+@pytest.fixture
+def cache_config(tmp_path: pathlib.Path) -> typing.Any:
+    """Mock config rooted in a temporary directory, with an in-memory pytest cache."""
+    store: dict[str, typing.Any] = {}
+    config = MagicMock(spec=pytest.Config)
+    config.rootpath = tmp_path
+    config.cache = MagicMock()
+    config.cache.get.side_effect = store.get
+    config.cache.set.side_effect = store.__setitem__
+    return config
+
+
+@pytest.fixture
+def mock_popen() -> typing.Iterator[MagicMock]:
+    """Patch `subprocess.Popen`, queue `(stdout, stderr, returncode)` in `mock_popen.outputs`."""
+    outputs: list[tuple[bytes, bytes, int]] = []
+
+    def _process(*_: typing.Any, **__: typing.Any) -> MagicMock:
+        stdout, stderr, returncode = outputs.pop(0) if outputs else (b"", b"", 0)
+        process = MagicMock()
+        process.__enter__.return_value = process
+        process.stdout = io.BytesIO(stdout)
+        process.stderr = io.BytesIO(stderr)
+        process.wait.return_value = returncode
+        return process
+
+    with patch("subprocess.Popen", side_effect=_process) as mock:
+        mock.outputs = outputs
+        yield mock
+
+
 def pytest_generate_tests(metafunc: pytest.Metafunc) -> None:
     """Dynamically parameterize tests using the registered plugin's tools_map."""
     checkers = metafunc.config.pluginmanager.get_plugin("checkers")
@@ -36,6 +36,10 @@ class TestPytestHelp:
         checkers_help = helps.get(GROUP_NAME)
         result.stdout.fnmatch_lines([f"*--{GROUP_NAME}*{checkers_help}"])
 
+    def test_jobs_flag(self, result: pytest.RunResult) -> None:
+        """Test checkers jobs flag."""
+        result.stdout.fnmatch_lines(["*--checkers-jobs=N*"])
+
     def test_tool_flag(
         self,
         result: pytest.RunResult,
@@ -119,3 +123,74 @@ class TestSummaries:
             assert invalid_result.ret == 1, "Expected 'Test execution was interrupted by the user'"
         else:
             assert invalid_result.ret == 4, "Expected 'pytest command line usage error'"
+
+
+class TestWorkingDirectory:
+    """Test the checkers running alongside the tests."""
+
+    def test_chdir(self, pytester: pytest.Pytester, tested_tools: list[str] | None) -> None:
+        """Test a test changing directory does not move where the tools find their config."""
+        if tested_tools is not None and not {"flake8", "mypy"}.issubset(tested_tools):
+            pytest.skip("flake8 and mypy not tested")
+        (pytester.path / "mypy.ini").write_text("[mypy]\nstrict = True\n", encoding="utf-8")
+        source = '"""Doc."""\n\n\ndef dummy(arg):\n    return arg\n'
+        (pytester.path / "dummy_file.py").write_text(source, encoding="utf-8")
+        (pytester.path / "test_chdir.py").write_text(
+            '"""Test chdir."""\n\nimport time\n\n\n'
+            "def test_chdir(monkeypatch):\n"
+            '    """Test chdir."""\n    monkeypatch.chdir("/")\n    time.sleep(3)\n',
+            encoding="utf-8",
+        )
+        result = pytester.runpytest_subprocess("--flake8", "--mypy", "--checkers-jobs", "1")
+        result.assert_outcomes(passed=2, failed=1)
+        result.stdout.fnmatch_lines(["*no-untyped-def*"])
+
+
+class TestXdist:
+    """Test pytest-xdist support."""
+
+    @pytest.fixture
+    def project(self, pytester: pytest.Pytester, tested_tools: list[str] | None) -> pytest.Pytester:
+        """Write four modules failing ruff."""
+        pytest.importorskip("xdist")
+        if tested_tools is not None and "ruff" not in tested_tools:
+            pytest.skip("ruff not tested")
+        for index in range(4):
+            (pytester.path / f"dummy_{index}.py").write_text("import os\n", encoding="utf-8")
+        return pytester
+
+    @pytest.fixture
+    def result(self, project: pytest.Pytester) -> pytest.RunResult:
+        """Run ruff on two xdist workers."""
+        return project.runpytest_subprocess("-n", "2", "--ruff")
+
+    def test_shards(self, result: pytest.RunResult) -> None:
+        """Test ruff is split in one failing shard per worker."""
+        result.assert_outcomes(failed=2)
+
+    def test_single_summary(self, result: pytest.RunResult) -> None:
+        """Test the controller reports every shard once."""
+        result.stdout.fnmatch_lines(["*=== tests ruff ===*", "*Found 2 errors*", "*Found 2 errors*"])
+        assert result.stdout.str().count("tests ruff") == 1
+
+    def test_early(self, project: pytest.Pytester) -> None:
+        """Test the controller leaves the early checkers to the workers."""
+        (project.path / "conftest.py").write_text(
+            "from pytest_checkers.checkers import scheduler_key\n\n\n"
+            "def pytest_terminal_summary(terminalreporter, config):\n"
+            '    terminalreporter.write_line(f"controller ran {len(config.stash[scheduler_key].started)}")\n',
+            encoding="utf-8",
+        )
+        result = project.runpytest_subprocess("-n", "2", "--ruff", "--checkers-early")
+        result.stdout.fnmatch_lines(["controller ran 0"])
+
+    def test_scope(self, project: pytest.Pytester) -> None:
+        """Test the workers narrow the checkers to the selected tests and the sources they import."""
+        (project.path / "test_a.py").write_text(
+            '"""Test a."""\n\nimport dummy_0\n\n\ndef test_a() -> None:\n    """Test a."""\n    assert dummy_0\n',
+            encoding="utf-8",
+        )
+        result = project.runpytest_subprocess("-n", "2", "--ruff", "--checkers-scope", "test_a.py")
+        result.assert_outcomes(passed=2, failed=1)
+        result.stdout.fnmatch_lines(["*dummy_0.py:1:8: F401*"])
+        assert "dummy_1.py" not in result.stdout.str()
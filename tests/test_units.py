@@ -2,8 +2,18 @@
 
 from __future__ import annotations
 
+import argparse
+import ast
+import http.server
+import io
+import json
+import os
 import pathlib
+import shutil
+import signal
+import subprocess
 import sys
+import threading
 import typing
 from unittest.mock import (
     MagicMock,
@@ -12,11 +22,109 @@ from unittest.mock import (
 
 import pytest
 
+import pytest_checkers
+from benchmarks.bench import (
+    cache_misses,
+    compare,
+    generate,
+)
+from pytest_checkers.budget import (
+    CpuBudget,
+    split,
+)
+from pytest_checkers.cache import ResultCache
+from pytest_checkers.capture import (
+    CHUNK_SIZE,
+    OutputCapture,
+)
+from pytest_checkers.changes import ChangeDetector
+from pytest_checkers.consolidate import (
+    black_command,
+    flake8_command,
+    isort_command,
+)
+from pytest_checkers.daemon import DmypyDaemon
+from pytest_checkers.diagnostics import (
+    Diagnostic,
+    merge,
+    parsers,
+)
+from pytest_checkers.discovery import (
+    distribution,
+    is_installed,
+    tool_version,
+)
+from pytest_checkers.executors import (
+    InProcessExecutor,
+    PoolExecutor,
+    run_main,
+)
+from pytest_checkers.history import (
+    HISTORY_KEY,
+    History,
+    longest_first,
+    remaining,
+)
+from pytest_checkers.index import (
+    FileIndex,
+    iter_source_files,
+)
+from pytest_checkers.limits import (
+    Limits,
+    parse_size,
+)
+from pytest_checkers.node import (
+    NodeRuntime,
+    find_node,
+    find_script,
+    resolve,
+)
+from pytest_checkers.packages import (
+    closure,
+    dependency_graph,
+    dependents,
+    discover,
+    imported_modules,
+    ordered,
+)
+from pytest_checkers.profiling import (
+    RunProfile,
+    combine,
+    render_table,
+    wait,
+)
+from pytest_checkers.scheduler import (
+    CheckersScheduler,
+    balanced_shards,
+)
+from pytest_checkers.scope import (
+    ModuleMap,
+    imported_names,
+    scope,
+)
+from pytest_checkers.settings import pyproject
+from pytest_checkers.stores import (
+    DirectoryStore,
+    HttpStore,
+    open_store,
+)
+from pytest_checkers.watch import (
+    OVERFLOW,
+    InotifyWatcher,
+    PollingWatcher,
+    affected,
+    open_watcher,
+    relevant,
+)
+
 if typing.TYPE_CHECKING:
     import types
 
     from pytest_checkers import Tool
-    from pytest_checkers.checkers import CheckersPlugin
+    from pytest_checkers.checkers import (
+        CheckersPlugin,
+        PluginItem,
+    )
 
 
 class TestPluginItem:
@@ -27,6 +135,7 @@ class TestPluginItem:
         """Mock plugin."""
         plugin = MagicMock(spec=checkers_module.CheckersPlugin)
         plugin.is_error = False
+        plugin.breach = None
         plugin.cmd_output = ""
         return plugin
 
@@ -61,6 +170,17 @@ class TestPluginItem:
         with pytest.raises(pytest.fail.Exception, match="failed with output"):
             item_obj.runtest()
 
+    def test_runtest_breach(self, checkers_module: types.ModuleType, item_setup: tuple[pytest.Item, MagicMock]) -> None:
+        """Test a resource limit breach fails with its own outcome."""
+        item_obj, mock_plugin = item_setup
+        mock_plugin.breach = "timed out after 1s"
+        with pytest.raises(pytest.fail.Exception, match="test_plugin timed out after 1s"):
+            item_obj.runtest()
+        report = MagicMock(when="call", failed=True, user_properties=item_obj.user_properties)
+        assert checkers_module.pytest_report_teststatus(report) == ("limit", "L", ("LIMIT", {"red": True}))
+        report.user_properties = []
+        assert checkers_module.pytest_report_teststatus(report) is None
+
     def test_repr_failure(self, item_setup: tuple[pytest.Item, MagicMock]) -> None:
         """Test `repr_failure`."""
         item_obj, _ = item_setup
@@ -75,6 +195,55 @@ class TestPluginItem:
         assert line == 0
         assert msg == "tool::test_plugin"
 
+    def test_runtest_file(self, item_setup: tuple[pytest.Item, MagicMock]) -> None:
+        """Test per-file items fail only on their own diagnostics."""
+        item_obj, mock_plugin = item_setup
+        typing.cast("PluginItem", item_obj).file = "a.py"
+        mock_plugin.diagnostics = [Diagnostic("b.py", 1, 1, "E1", "error", "bad")]
+        mock_plugin.is_error = True
+        mock_plugin.diagnostics_for.return_value = []
+        mock_plugin.unattributed_diagnostics.return_value = []
+        item_obj.runtest()
+        mock_plugin.diagnostics_for.return_value = [Diagnostic("a.py", 1, 1, "E1", "error", "bad")]
+        with pytest.raises(pytest.fail.Exception) as excinfo:
+            item_obj.runtest()
+        mock_plugin.diagnostics_for.assert_called_with("a.py")
+        assert item_obj.repr_failure(excinfo) == "a.py:1:1: error [E1] bad"
+
+    def test_runtest_file_unparsed(self, item_setup: tuple[pytest.Item, MagicMock]) -> None:
+        """Test per-file items fail on the whole run when the output did not parse."""
+        item_obj, mock_plugin = item_setup
+        typing.cast("PluginItem", item_obj).file = "a.py"
+        mock_plugin.diagnostics = None
+        mock_plugin.is_error = True
+        with pytest.raises(pytest.fail.Exception, match="failed with output"):
+            item_obj.runtest()
+
+    def test_runtest_file_unattributed(self, item_setup: tuple[pytest.Item, MagicMock]) -> None:
+        """Test per-file items fail on the diagnostics of a failed run no source file accounts for."""
+        item_obj, mock_plugin = item_setup
+        typing.cast("PluginItem", item_obj).file = "a.py"
+        diagnostic = Diagnostic("mypy.ini", 1, 1, "misc", "error", "plugin not found")
+        mock_plugin.diagnostics = [diagnostic]
+        mock_plugin.diagnostics_for.return_value = []
+        mock_plugin.unattributed_diagnostics.return_value = [diagnostic]
+        item_obj.runtest()
+        mock_plugin.is_error = True
+        with pytest.raises(pytest.fail.Exception) as excinfo:
+            item_obj.runtest()
+        assert item_obj.repr_failure(excinfo) == "mypy.ini:1:1: error [misc] plugin not found"
+
+    def test_runtest_file_failed_without_diagnostics(self, item_setup: tuple[pytest.Item, MagicMock]) -> None:
+        """Test per-file items fail when the run failed without any diagnostic."""
+        item_obj, mock_plugin = item_setup
+        typing.cast("PluginItem", item_obj).file = "a.py"
+        mock_plugin.diagnostics = []
+        mock_plugin.is_error = True
+        mock_plugin.diagnostics_for.return_value = []
+        mock_plugin.unattributed_diagnostics.return_value = []
+        with pytest.raises(pytest.fail.Exception, match="failed with output"):
+            item_obj.runtest()
+
 
 class TestCheckersPlugin:
     """TestCheckersPlugin."""
@@ -106,6 +275,45 @@ class TestCheckersPlugin:
         """Test `env_vars`."""
         assert dummy_class.env_vars.get("FORCE_COLOR") == "1"
         assert dummy_class.env_vars.get("MYPY_FORCE_COLOR") == "1"
+        assert dummy_class.env_vars is dummy_class.env_vars
+
+    def test_env_vars_plain(self, checkers_module: types.ModuleType, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test the plain environment turns colour off."""
+        monkeypatch.setenv("FORCE_COLOR", "1")
+        env = checkers_module.child_env(color=False)
+        assert "FORCE_COLOR" not in env
+        assert "MYPY_FORCE_COLOR" not in env
+        assert env["NO_COLOR"] == "1"
+
+    @pytest.mark.parametrize(
+        ("plain", "workerinput", "hasmarkup", "expected"),
+        [
+            (True, None, True, False),
+            (False, None, True, True),
+            (False, None, False, False),
+            (False, {"checkers_color": True}, False, True),
+        ],
+    )
+    def test_color(
+        self,
+        checkers_module: types.ModuleType,
+        plain: bool,  # noqa: FBT001
+        workerinput: dict[str, bool] | None,
+        hasmarkup: bool,  # noqa: FBT001
+        expected: bool,  # noqa: FBT001
+    ) -> None:
+        """Test the colour follows pytest markup, the plain option and the xdist controller."""
+        config = MagicMock()
+        config.option.checkers_plain = plain
+        if workerinput is None:
+            del config.workerinput
+        else:
+            config.workerinput = workerinput
+        with patch("_pytest.config.create_terminal_writer", return_value=MagicMock(hasmarkup=hasmarkup)):
+            assert checkers_module._color(config) is expected  # noqa: SLF001
+            node = MagicMock(config=config, workerinput={})
+            checkers_module.pytest_configure_node(node)
+        assert node.workerinput == {"checkers_color": expected}
 
     def test_is_error_false(self, dummy_class: CheckersPlugin) -> None:
         """Test `is_error` false."""
@@ -116,16 +324,42 @@ class TestCheckersPlugin:
         dummy_class.cmd_returncode = 1
         assert dummy_class.is_error
 
-    def test_run_tool(self, dummy_class: CheckersPlugin, dummy_tool: str) -> None:
+    def test_spawn_cwd(
+        self,
+        dummy_class: CheckersPlugin,
+        mock_popen: MagicMock,
+        monkeypatch: pytest.MonkeyPatch,
+        tmp_path: pathlib.Path,
+    ) -> None:
+        """Test the tool runs where pytest was invoked, whatever directory a running test moved to."""
+        dummy_class.cwd = pathlib.Path.cwd()
+        monkeypatch.chdir(tmp_path)
+        dummy_class.run_tool()
+        assert mock_popen.call_args.kwargs["cwd"] == dummy_class.cwd
+
+    def test_run_tool(self, dummy_class: CheckersPlugin, dummy_tool: str, mock_popen: MagicMock) -> None:
         """Test `run_tool`."""
-        with patch("subprocess.run") as mock_run:
-            mock_run.return_value(returncode=0)
-            dummy_class.run_tool()
-            expected_cmd = [sys.executable, "-m", dummy_tool, str(dummy_class.config.rootpath)]
-            mock_run.assert_called_once()
-            args, kwargs = mock_run.call_args
-            assert args[0] == expected_cmd
-            assert kwargs["env"] == dummy_class.env_vars
+        mock_popen.outputs.append((b"out\n", b"err\n", 3))
+        dummy_class.run_tool()
+        expected_cmd = [sys.executable, "-m", dummy_tool, str(dummy_class.config.rootpath)]
+        mock_popen.assert_called_once()
+        args, kwargs = mock_popen.call_args
+        assert args[0] == expected_cmd
+        assert kwargs["env"] == dummy_class.env_vars
+        assert dummy_class.cmd_output == "out\nerr\n"
+        assert dummy_class.cmd_returncode == 3
+
+    def test_run_tool_scheduled(self, dummy_class: CheckersPlugin, mock_popen: MagicMock) -> None:
+        """Test `run_tool` collects the scheduled result."""
+        future = MagicMock()
+        dummy_class.future = future
+        dummy_class.run_tool()
+        mock_popen.assert_not_called()
+        future.result.assert_called_once()
+
+    def test_nodeid(self, dummy_class: CheckersPlugin, dummy_tool: str) -> None:
+        """Test `nodeid`."""
+        assert dummy_class.nodeid == f"checkers::{dummy_tool}"
 
     def test_pytest_terminal_summary(self, dummy_class: CheckersPlugin) -> None:
         """Test `pytest_terminal_summary`."""
@@ -139,7 +373,7 @@ class TestCheckersPlugin:
             sep="=",
             green=True,
         )
-        mock_reporter.write.assert_called_once_with("Success Done.")
+        assert "".join(call.args[0] for call in mock_reporter.write.call_args_list) == "Success Done."
 
     def test_pytest_collection_modifyitems(self, dummy_class: CheckersPlugin) -> None:
         """Test `pytest_collection_modifyitems`."""
@@ -165,6 +399,1734 @@ class TestCheckersPlugin:
             assert items[0] == mock_created_item
 
 
+class TestCheckersScheduler:
+    """TestCheckersScheduler."""
+
+    @pytest.fixture
+    def plugins(self) -> list[typing.Any]:
+        """Mock plugins."""
+        plugins = [MagicMock(tool="ruff"), MagicMock(tool="mypy")]
+        for plugin in plugins:
+            plugin.future = None
+            plugin.expected_duration.return_value = None
+        return plugins
+
+    def test_jobs_default(self, plugins: list[typing.Any]) -> None:
+        """Test default concurrency."""
+        scheduler = CheckersScheduler(plugins)
+        assert 1 <= scheduler.jobs <= len(plugins)
+
+    def test_jobs_explicit(self, plugins: list[typing.Any]) -> None:
+        """Test explicit concurrency."""
+        scheduler = CheckersScheduler(plugins, 3)
+        assert scheduler.jobs == 3
+
+    def test_start_selected(self, checkers_module: types.ModuleType, plugins: list[typing.Any]) -> None:
+        """Test only selected checkers are started."""
+        scheduler = CheckersScheduler(plugins)
+        item = MagicMock(spec=checkers_module.PluginItem)
+        item.name = "ruff"
+        scheduler.start([item, MagicMock(nodeid="test_dummy.py::test_dummy")])
+        scheduler.shutdown()
+        ruff, mypy = plugins
+        assert ruff.future is not None
+        ruff.execute.assert_called_once()
+        assert mypy.future is None
+        mypy.execute.assert_not_called()
+
+    def test_balanced_shards(self, tmp_path: pathlib.Path) -> None:
+        """Test files are split into shards of balanced size."""
+        paths: list[str] = []
+        for name, size in [("a.py", 50), ("b.py", 40), ("c.py", 30), ("d.py", 20)]:
+            (tmp_path / name).write_text("x" * size, encoding="utf-8")
+            paths.append(str(tmp_path / name))
+        a, b, c, d = paths
+        assert balanced_shards(paths, 2) == [[a, d], [b, c]]
+
+    def test_balanced_shards_more_shards_than_files(self) -> None:
+        """Test extra shards are empty."""
+        assert balanced_shards(["missing.py"], 3) == [["missing.py"], [], []]
+
+    def test_start_nothing_selected(self, plugins: list[typing.Any]) -> None:
+        """Test no executor without selected checkers."""
+        scheduler = CheckersScheduler(plugins)
+        scheduler.start([])
+        assert scheduler.executor is None
+
+    @pytest.mark.parametrize(("collectonly", "started"), [(False, True), (True, False)])
+    def test_collection_finish(
+        self,
+        checkers_module: types.ModuleType,
+        collectonly: bool,  # noqa: FBT001
+        started: bool,  # noqa: FBT001
+    ) -> None:
+        """Test checkers are not started with `--collect-only`."""
+        session = MagicMock()
+        session.config.option.collectonly = collectonly
+        checkers_module.pytest_collection_finish(session)
+        scheduler = session.config.stash.get.return_value
+        assert scheduler.start.called is started
+
+    def test_start_early(self, checkers_module: types.ModuleType, plugins: list[typing.Any]) -> None:
+        """Test every checker starts before collection, deselected ones are dropped."""
+        ruff, mypy = plugins
+        for plugin in plugins:
+            plugin.granular = False
+        scheduler = CheckersScheduler(plugins)
+        scheduler.start()
+        ruff.execute.assert_called_once()
+        future = ruff.future
+        item = MagicMock(spec=checkers_module.PluginItem)
+        item.name = "ruff"
+        scheduler.start([item])
+        scheduler.shutdown()
+        assert ruff.future is future
+        ruff.execute.assert_called_once()
+        assert mypy.future is None
+        assert mypy in scheduler.discarded or not mypy.execute.called
+        if mypy in scheduler.discarded:
+            assert mypy.cmd_output == ""
+
+
+class TestXdist:
+    """TestXdist."""
+
+    @pytest.fixture
+    def plugin(self, checkers_module: types.ModuleType, cache_config: MagicMock) -> CheckersPlugin:
+        """Return file-local plugin split in shards."""
+        for name in ("a.py", "b.py", "c.py"):
+            (cache_config.rootpath / name).write_text("x = 1\n", encoding="utf-8")
+        plugin = checkers_module.RuffPlugin(config=cache_config)
+        plugin.shards = 2
+        return typing.cast("CheckersPlugin", plugin)
+
+    def test_shard_paths(self, plugin: CheckersPlugin) -> None:
+        """Test every source is in exactly one shard."""
+        plugin.shard = 0
+        first = plugin.paths
+        plugin.shard = 1
+        second = plugin.paths
+        root = plugin.config.rootpath
+        assert sorted(first + second) == [str(root / name) for name in ("a.py", "b.py", "c.py")]
+
+    def test_shard_items(self, plugin: CheckersPlugin) -> None:
+        """Test one item per shard."""
+        items: list[typing.Any] = []
+        with patch("pytest_checkers.checkers.PluginItem") as mock_plugin_item_class:
+            mock_plugin_item_class.from_parent.side_effect = [MagicMock(), MagicMock()]
+            plugin.pytest_collection_modifyitems(
+                session=MagicMock(),
+                config=MagicMock(),
+                items=items,
+            )
+        assert [item.shard for item in items] == [0, 1]
+        nodeids = [item._nodeid for item in items]  # pyright: ignore[reportPrivateUsage]  # noqa: SLF001
+        assert nodeids == ["checkers::ruff[0]", "checkers::ruff[1]"]
+
+    def test_merge_shards(self, plugin: CheckersPlugin) -> None:
+        """Test the controller merges shard results in order."""
+        reports: list[MagicMock] = []
+        for shard, output, returncode in [(1, "second\n", 1), (0, "first\n", 0)]:
+            report = MagicMock(spec=pytest.TestReport)
+            report.user_properties = [
+                ("other", "ignored"),
+                ("checkers", {"tool": "ruff", "shard": shard, "shards": 2, "output": output, "returncode": returncode}),
+            ]
+            reports.append(report)
+        for report in reports:
+            plugin.pytest_runtest_logreport(report)
+        assert plugin.cmd_output == "first\nsecond\n"
+        assert plugin.cmd_returncode == 1
+
+    def test_worker_configure(self, checkers_module: types.ModuleType) -> None:
+        """Test workers shard file-local checkers and do not schedule."""
+        mock_config = MagicMock()
+        mock_config.option.checkers = True
+        mock_config.option.checkers_granular = False
+        mock_config.option.checkers_packages = False
+        mock_config.option.checkers_cpus = 0
+        mock_config.option.checkers_pyright_offline = False
+        mock_config.workerinput = {"workercount": 4}
+        with patch("pytest_checkers.checkers.added_options", ["ruff", "mypy"]):
+            checkers_module.pytest_configure(mock_config)
+        plugins = {call.args[0].tool: call.args[0] for call in mock_config.pluginmanager.register.call_args_list}
+        assert plugins["ruff"].shards == 4
+        assert plugins["mypy"].shards == 1
+        stashed = [call.args[0] for call in mock_config.stash.__setitem__.call_args_list]
+        assert checkers_module.scheduler_key not in stashed
+
+
+class TestOrder:
+    """TestOrder."""
+
+    @pytest.fixture
+    def items(self, checkers_module: types.ModuleType) -> list[typing.Any]:
+        """Return a test between two checker items."""
+        first, second = MagicMock(spec=checkers_module.PluginItem), MagicMock(spec=checkers_module.PluginItem)
+        return [first, MagicMock(spec=pytest.Item), second]
+
+    def test_first(self, checkers_module: types.ModuleType, items: list[typing.Any]) -> None:
+        """Test checker items are moved before the tests."""
+        first, test, second = items
+        config = MagicMock()
+        config.option.checkers_order = "first"
+        checkers_module.pytest_collection_modifyitems(items, config)
+        assert items == [first, second, test]
+
+    def test_last(self, checkers_module: types.ModuleType, items: list[typing.Any]) -> None:
+        """Test checker items stay after the tests by default."""
+        expected = items.copy()
+        config = MagicMock()
+        config.option.checkers_order = "last"
+        checkers_module.pytest_collection_modifyitems(items, config)
+        assert items == expected
+
+    @pytest.mark.parametrize(("failed", "shouldstop"), [(True, True), (False, False)])
+    def test_stop(
+        self,
+        checkers_module: types.ModuleType,
+        items: list[typing.Any],
+        failed: bool,  # noqa: FBT001
+        shouldstop: bool,  # noqa: FBT001
+    ) -> None:
+        """Test the session stops after the last checker item when one failed."""
+        first, test, second = items
+        for item in items:
+            item.config.option.checkers_order = "first"
+            item.session.shouldstop = False
+            item.session.stash = {checkers_module.failed_key: failed}
+        checkers_module.pytest_runtest_teardown(first, second)
+        assert not first.session.shouldstop
+        checkers_module.pytest_runtest_teardown(second, test)
+        assert bool(second.session.shouldstop) is shouldstop
+
+
+class TestGranular:
+    """TestGranular."""
+
+    @pytest.fixture
+    def plugin(self, checkers_module: types.ModuleType, cache_config: MagicMock) -> CheckersPlugin:
+        """Return plugin with one item per file."""
+        for name in ("a.py", "b.py"):
+            (cache_config.rootpath / name).write_text("x = 1\n", encoding="utf-8")
+        plugin = checkers_module.RuffPlugin(config=cache_config)
+        plugin.granular = True
+        plugin.structured = True
+        return typing.cast("CheckersPlugin", plugin)
+
+    def test_file_items(self, plugin: CheckersPlugin) -> None:
+        """Test one item per source file."""
+        items: list[typing.Any] = []
+        with patch("pytest_checkers.checkers.PluginItem") as mock_plugin_item_class:
+            mock_plugin_item_class.from_parent.side_effect = [MagicMock(), MagicMock()]
+            plugin.pytest_collection_modifyitems(session=MagicMock(), config=MagicMock(), items=items)
+        assert [item.file for item in items] == ["a.py", "b.py"]
+        nodeids = [item._nodeid for item in items]  # pyright: ignore[reportPrivateUsage]  # noqa: SLF001
+        assert nodeids == ["checkers::ruff::a.py", "checkers::ruff::b.py"]
+
+    def test_selected_files(self, checkers_module: types.ModuleType, plugin: CheckersPlugin) -> None:
+        """Test a single run over the files of the selected items."""
+        item = MagicMock(spec=checkers_module.PluginItem)
+        item.name = "ruff"
+        item.file = "b.py"
+        plugin.pytest_collection_finish(MagicMock(items=[item, MagicMock()]))
+        assert plugin.paths == [str(plugin.config.rootpath / "b.py")]
+
+    def test_unattributed_diagnostics(self, plugin: CheckersPlugin) -> None:
+        """Test diagnostics outside the source files are told apart."""
+        config_error = Diagnostic("ruff.toml", 1, 1, "E1", "error", "bad")
+        plugin.diagnostics = [Diagnostic("a.py", 1, 1, "F401", "error", "unused"), config_error]
+        assert plugin.unattributed_diagnostics() == [config_error]
+
+    def test_single_run(self, plugin: CheckersPlugin, mock_popen: MagicMock) -> None:
+        """Test the tool runs once for every file item."""
+        diagnostic = {"filename": "a.py", "location": {"row": 1, "column": 1}, "code": "F401", "message": "unused"}
+        mock_popen.outputs.append((json.dumps([diagnostic]).encode(), b"", 1))
+        plugin.run_tool()
+        plugin.run_tool()
+        assert mock_popen.call_count == 1
+        assert [d.code for d in plugin.diagnostics_for("a.py")] == ["F401"]
+        assert plugin.diagnostics_for("b.py") == []
+
+
+class TestOutputCapture:
+    """TestOutputCapture."""
+
+    def test_spool(self) -> None:
+        """Test output past the spool size rolls over to a file."""
+        capture = OutputCapture(spool_size=10)
+        with patch.object(capture.spool, "rollover", wraps=capture.spool.rollover) as rollover:
+            capture.write(b"0123456789abcdef")
+        rollover.assert_called_once()
+        assert capture.read() == "0123456789abcdef"
+
+    def test_drain(self) -> None:
+        """Test streams are read in chunks."""
+        capture = OutputCapture()
+        capture.drain(io.BytesIO(b"x" * (3 * CHUNK_SIZE + 1)))
+        assert capture.size == 3 * CHUNK_SIZE + 1
+
+    def test_markers_across_chunks(self) -> None:
+        """Test markers split across writes are found."""
+        capture = OutputCapture(markers=("@@", "fail to reformat"))
+        capture.write(b"--- a.py\n@")
+        assert not capture.matched
+        capture.write(b"@ -1 +1 @@\n")
+        assert capture.found == {"@@"}
+
+    @pytest.mark.parametrize(
+        ("head", "tail", "expected"),
+        [
+            (0, 0, "1\n2\n3\n4\n5\n"),
+            (2, 0, "1\n2\n... 3 lines truncated ...\n"),
+            (0, 2, "... 3 lines truncated ...\n4\n5\n"),
+            (1, 1, "1\n... 3 lines truncated ...\n5\n"),
+            (3, 3, "1\n2\n3\n4\n5\n"),
+        ],
+    )
+    def test_truncation(self, head: int, tail: int, expected: str) -> None:
+        """Test head and tail truncation."""
+        capture = OutputCapture.from_text("1\n2\n3\n4\n5\n")
+        assert "".join(capture.iter_text(head, tail)) == expected
+
+    def test_multibyte_boundary(self) -> None:
+        """Test characters split across chunks are decoded."""
+        capture = OutputCapture()
+        capture.encoding = "utf-8"
+        capture.write(b"x" * (CHUNK_SIZE - 1) + "✨".encode())
+        assert capture.read().endswith("✨")
+
+
+class TestDiagnostics:
+    """TestDiagnostics."""
+
+    @pytest.mark.parametrize(
+        ("tool", "output"),
+        [
+            (
+                "ruff",
+                json.dumps(
+                    [
+                        {
+                            "code": "F401",
+                            "filename": "/root/bad.py",
+                            "location": {"row": 2, "column": 8},
+                            "message": "unused",
+                        },
+                    ],
+                ),
+            ),
+            (
+                "pyright",
+                json.dumps(
+                    {
+                        "generalDiagnostics": [
+                            {
+                                "file": "/root/bad.py",
+                                "severity": "error",
+                                "message": "unused",
+                                "range": {"start": {"line": 1, "character": 7}},
+                                "rule": "F401",
+                            },
+                        ],
+                    },
+                ),
+            ),
+            (
+                "mypy",
+                json.dumps(
+                    {
+                        "file": "/root/bad.py",
+                        "line": 2,
+                        "column": 7,
+                        "message": "unused",
+                        "code": "F401",
+                        "severity": "error",
+                    },
+                ),
+            ),
+            (
+                "ty",
+                json.dumps(
+                    [
+                        {
+                            "check_name": "F401",
+                            "description": "F401: unused",
+                            "severity": "major",
+                            "location": {"path": "/root/bad.py", "positions": {"begin": {"line": 2, "column": 8}}},
+                        },
+                    ],
+                ),
+            ),
+            ("flake8", "/root/bad.py\t2\t8\tF401\tunused\n"),
+        ],
+    )
+    def test_parsers(self, tool: Tool, output: str) -> None:
+        """Test structured outputs are parsed into the same record."""
+        expected = [Diagnostic("bad.py", 2, 8, "F401", "error", "unused")]
+        assert parsers[tool](output, pathlib.Path("/root")) == expected
+
+    def test_parse_diff(self) -> None:
+        """Test one diagnostic per diff hunk, and parse errors."""
+        output = (
+            "--- /root/a.py:before\t2025-01-01\n+++ /root/a.py:after\t2025-01-01\n@@ -3,2 +3,3 @@\n x\n"
+            "@@ -10,1 +11,1 @@\n-y\n+z\nerror: cannot parse: /root/b.py:4:2: bad\n"
+        )
+        assert parsers["isort"](output, pathlib.Path("/root")) == [
+            Diagnostic("a.py", 3, 1, "isort", "error", "imports are incorrectly sorted"),
+            Diagnostic("a.py", 10, 1, "isort", "error", "imports are incorrectly sorted"),
+            Diagnostic("b.py", 4, 2, "parse", "error", "bad"),
+        ]
+
+    def test_merge(self) -> None:
+        """Test merging sorts and drops duplicates."""
+        first = Diagnostic("b.py", 1, 1, "E1", "error", "x")
+        second = Diagnostic("a.py", 9, 1, "E1", "error", "x")
+        assert merge([first, second], [first]) == [second, first]
+
+    def test_invalid_output(self, checkers_module: types.ModuleType, cache_config: MagicMock) -> None:
+        """Test unparsable output keeps the raw output."""
+        plugin = checkers_module.RuffPlugin(config=cache_config)
+        plugin.structured = True
+        plugin.cmd_output = "ruff crashed"
+        plugin.parse_diagnostics()
+        assert plugin.diagnostics is None
+
+    def test_structured_summary(self, checkers_module: types.ModuleType, cache_config: MagicMock) -> None:
+        """Test the summary is rendered from the records."""
+        plugin = checkers_module.RuffPlugin(config=cache_config)
+        plugin.diagnostics = [Diagnostic("a.py", 1, 2, "F401", "error", "unused")]
+        mock_reporter = MagicMock()
+        plugin.pytest_terminal_summary(mock_reporter)
+        lines = [call.args[0] for call in mock_reporter.write_line.call_args_list]
+        assert lines == ["a.py:1:2: error [F401] unused", "Found 1 diagnostics."]
+
+    def test_structured_flags(self, tool_map: tuple[Tool, type[CheckersPlugin]]) -> None:
+        """Test every tool has structured flags in structured mode."""
+        _, tool_class = tool_map
+        plugin = tool_class(config=MagicMock())
+        plugin.structured = True
+        assert plugin.run_flags == plugin.structured_flags
+
+    def test_merge_shards(self, checkers_module: types.ModuleType, cache_config: MagicMock) -> None:
+        """Test shard diagnostics are merged on the controller."""
+        plugin = checkers_module.RuffPlugin(config=cache_config)
+        plugin.diagnostics = [Diagnostic("a.py", 1, 2, "F401", "error", "unused")]
+        plugin.shard = 1
+        report = MagicMock(spec=pytest.TestReport)
+        report.user_properties = [("checkers", plugin.shard_report())]
+        controller = checkers_module.RuffPlugin(config=cache_config)
+        controller.pytest_runtest_logreport(report)
+        assert controller.diagnostics == plugin.diagnostics
+
+
+class TestResultCache:
+    """TestResultCache."""
+
+    @pytest.fixture
+    def plugin(self, checkers_module: types.ModuleType, cache_config: MagicMock) -> CheckersPlugin:
+        """Return plugin rooted in the temporary directory."""
+        (cache_config.rootpath / "pkg").mkdir()
+        (cache_config.rootpath / "pkg" / "mod.py").write_text("x = 1\n", encoding="utf-8")
+        (cache_config.rootpath / ".venv").mkdir()
+        (cache_config.rootpath / ".venv" / "ignored.py").write_text("", encoding="utf-8")
+        plugin = checkers_module.RuffPlugin(config=cache_config)
+        plugin.cache = ResultCache(cache_config)
+        return typing.cast("CheckersPlugin", plugin)
+
+    def test_digests(self, plugin: CheckersPlugin) -> None:
+        """Test source hashes skip hidden directories."""
+        assert plugin.cache is not None
+        assert list(plugin.cache.digests()) == ["pkg/mod.py"]
+
+    def test_digests_stat_fast_path(self, plugin: CheckersPlugin) -> None:
+        """Test unchanged files are not re-hashed."""
+        assert plugin.cache is not None
+        plugin.cache.digests()
+        fresh = ResultCache(plugin.config)
+        with patch("pytest_checkers.index.file_digest") as mock_digest:
+            fresh.digests()
+            mock_digest.assert_not_called()
+
+    def test_replay(self, plugin: CheckersPlugin, mock_popen: MagicMock) -> None:
+        """Test a stored green result is replayed without running the tool."""
+        mock_popen.outputs.append((b"All checks passed!\n", b"", 0))
+        plugin.execute()
+        plugin.cmd_output = ""
+        plugin.execute()
+        mock_popen.assert_called_once()
+        assert plugin.cmd_output == "All checks passed!\n"
+
+    def test_source_change_invalidates(self, plugin: CheckersPlugin) -> None:
+        """Test a changed source changes the key."""
+        assert plugin.cache is not None
+        key = plugin.cache.key(plugin)
+        (plugin.config.rootpath / "pkg" / "mod.py").write_text("x = 22\n", encoding="utf-8")
+        assert ResultCache(plugin.config).key(plugin) != key
+
+    def test_config_change_invalidates(self, plugin: CheckersPlugin) -> None:
+        """Test a changed config file changes the key."""
+        assert plugin.cache is not None
+        key = plugin.cache.key(plugin)
+        (plugin.config.rootpath / ".flake8").write_text("[flake8]\n", encoding="utf-8")
+        assert plugin.cache.key(plugin) != key
+
+    def test_errors_not_stored(self, plugin: CheckersPlugin) -> None:
+        """Test failing results are not stored."""
+        assert plugin.cache is not None
+        plugin.cmd_returncode = 1
+        plugin.cache.store(plugin, "key")
+        assert not plugin.cache.replay(plugin, "key")
+
+
+class TestStores:
+    """TestStores."""
+
+    @pytest.fixture
+    def http_url(self) -> typing.Iterator[str]:
+        """Serve GET and PUT from memory on a local port."""
+        entries: dict[str, bytes] = {}
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                body = entries.get(self.path)
+                self.send_response(404 if body is None else 200)
+                self.end_headers()
+                self.wfile.write(body or b"")
+
+            def do_PUT(self) -> None:
+                entries[self.path] = self.rfile.read(int(self.headers["Content-Length"]))
+                self.send_response(201)
+                self.end_headers()
+
+            def log_message(self, format: str, *args: typing.Any) -> None:  # noqa: A002
+                _ = format, args
+
+        server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        yield f"http://127.0.0.1:{server.server_address[1]}/cache/"
+        server.shutdown()
+        server.server_close()
+
+    def test_directory(self, tmp_path: pathlib.Path) -> None:
+        """Test entries round-trip and corrupted ones are dropped."""
+        store = open_store(str(tmp_path / "store"))
+        assert isinstance(store, DirectoryStore)
+        assert store.get("ab12") is None
+        store.put("ab12", b"payload")
+        assert store.get("ab12") == b"payload"
+        path = tmp_path / "store" / "ab" / "ab12"
+        path.write_bytes(path.read_bytes()[:-1])
+        assert store.get("ab12") is None
+        assert not path.exists()
+
+    def test_directory_bounds(self, tmp_path: pathlib.Path) -> None:
+        """Test oversized entries are skipped and the least recently used evicted."""
+        store = DirectoryStore(tmp_path, max_size=500, max_entry=100)
+        store.put("aa", b"x" * 101)
+        assert store.get("aa") is None
+        for age, key in enumerate(["aa", "bb", "cc"]):
+            store.put(key, b"x" * 90)
+            os.utime(store.entry_path(key), (age, age))
+        store.get("aa")
+        store.put("dd", b"x" * 90)
+        assert [key for key in ["aa", "bb", "cc", "dd"] if store.get(key)] == ["aa", "cc", "dd"]
+
+    def test_http(self, http_url: str) -> None:
+        """Test entries round-trip through an HTTP endpoint."""
+        store = open_store(http_url)
+        assert isinstance(store, HttpStore)
+        assert store.get("ab12") is None
+        store.put("ab12", b"payload")
+        assert store.get("ab12") == b"payload"
+
+    def test_http_unreachable(self) -> None:
+        """Test an unreachable endpoint is a miss."""
+        store = HttpStore("http://127.0.0.1:9/", timeout=1)
+        store.put("ab12", b"payload")
+        assert store.get("ab12") is None
+
+    def test_shared_replay(
+        self,
+        checkers_module: types.ModuleType,
+        cache_config: MagicMock,
+        mock_popen: MagicMock,
+        http_url: str,
+    ) -> None:
+        """Test a result stored by one runner is replayed by another."""
+
+        def _missing(_: str, default: object) -> object:
+            return default
+
+        (cache_config.rootpath / "mod.py").write_text("x = 1\n", encoding="utf-8")
+        plugins: list[CheckersPlugin] = []
+        for _ in range(2):
+            config = MagicMock(spec=pytest.Config, rootpath=cache_config.rootpath)
+            config.cache = MagicMock()
+            config.cache.get.side_effect = _missing
+            plugin = checkers_module.MypyPlugin(config=config)
+            plugin.cache = ResultCache(config, store=open_store(http_url))
+            plugins.append(plugin)
+        mock_popen.outputs.append((b"Success: no issues found\n", b"", 0))
+        plugins[0].execute()
+        plugins[1].execute()
+        mock_popen.assert_called_once()
+        assert plugins[1].cmd_output == "Success: no issues found\n"
+
+
+class TestToolCaches:
+    """TestToolCaches."""
+
+    @pytest.fixture
+    def config(self, cache_config: MagicMock, tmp_path: pathlib.Path) -> MagicMock:
+        """Return config with a shared tool cache path."""
+        cache_config.option = argparse.Namespace(
+            checkers_tool_cache=False,
+            checkers_tool_cache_dir=str(tmp_path / "shared"),
+            checkers_cache_clear=False,
+        )
+        cache_config.pluginmanager = MagicMock()
+        cache_config.pluginmanager.has_plugin.return_value = True
+        return cache_config
+
+    def test_pinned(self, checkers_module: types.ModuleType, config: MagicMock, mock_popen: MagicMock) -> None:
+        """Test the tools get their cache location through a flag or the environment."""
+        mypy = checkers_module.MypyPlugin(config=config)
+        black = checkers_module.BlackPlugin(config=config)
+        flake8 = checkers_module.Flake8Plugin(config=config)
+        env: dict[str, str] = {}
+        for plugin in (mypy, black, flake8):
+            plugin.env_vars = env
+        checkers_module._configure_tool_caches(config, [mypy, black, flake8])  # noqa: SLF001
+        shared = pathlib.Path(config.option.checkers_tool_cache_dir)
+        mypy.execute()
+        args, _ = mock_popen.call_args
+        assert args[0][-3:] == ["--cache-dir", str(shared / "mypy"), str(config.rootpath)]
+        assert black.env_vars["BLACK_CACHE_DIR"] == str(shared / "black")
+        assert "BLACK_CACHE_DIR" not in flake8.env_vars
+        assert black.cache_flags == []
+        assert flake8.cache_flags == []
+        assert (shared / "flake8").is_dir()
+        black.ruff = black_command(config.rootpath)
+        assert black.cache_flags == ["--cache-dir", str(shared / "black")]
+
+    def test_clear(self, checkers_module: types.ModuleType, config: MagicMock) -> None:
+        """Test clearing drops the managed caches and the stored results."""
+        stale = pathlib.Path(config.option.checkers_tool_cache_dir) / "mypy" / "stale"
+        stale.parent.mkdir(parents=True)
+        stale.write_text("", encoding="utf-8")
+        config.option.checkers_cache_clear = True
+        mypy = checkers_module.MypyPlugin(config=config)
+        checkers_module._configure_tool_caches(config, [mypy])  # noqa: SLF001
+        assert not stale.exists()
+        assert mypy.tool_cache == stale.parent
+        config.cache.set.assert_called_once_with("checkers/results/mypy", {})
+
+    @pytest.mark.parametrize("tool_cache_dir", [None, MagicMock()])
+    def test_disabled(self, checkers_module: types.ModuleType, config: MagicMock, tool_cache_dir: object) -> None:
+        """Test the tools keep their own caches by default, or when the option is not a path."""
+        config.option.checkers_tool_cache_dir = tool_cache_dir
+        mypy = checkers_module.MypyPlugin(config=config)
+        checkers_module._configure_tool_caches(config, [mypy])  # noqa: SLF001
+        assert mypy.tool_cache is None
+        assert mypy.cache_flags == []
+
+
+class TestFileIndex:
+    """TestFileIndex."""
+
+    @pytest.fixture
+    def root(self, tmp_path: pathlib.Path) -> pathlib.Path:
+        """Project with a virtualenv, a build directory and an ignored module."""
+        for rel in ("pkg/mod.py", "pkg/stub.pyi", "ignored.py", ".venv/lib.py", "build/out.py", "notes.txt"):
+            (tmp_path / rel).parent.mkdir(parents=True, exist_ok=True)
+            (tmp_path / rel).write_text("x = 1\n", encoding="utf-8")
+        (tmp_path / ".gitignore").write_text("ignored.py\n", encoding="utf-8")
+        return tmp_path
+
+    def test_walk(self, root: pathlib.Path) -> None:
+        """Test the tree walk outside git."""
+        assert list(FileIndex(root).stats()) == ["ignored.py", "pkg/mod.py", "pkg/stub.pyi"]
+
+    @pytest.mark.skipif(shutil.which("git") is None, reason="git not available")
+    def test_gitignore(self, root: pathlib.Path) -> None:
+        """Test git ignored files are left out."""
+        subprocess.run(["git", "init", "-q"], cwd=root, check=True)  # noqa: S607
+        index = FileIndex(root / "pkg")
+        assert list(FileIndex(root).stats()) == ["pkg/mod.py", "pkg/stub.pyi"]
+        assert index.paths() == [root / "pkg" / "mod.py", root / "pkg" / "stub.pyi"]
+
+    def test_listed_once(self, root: pathlib.Path) -> None:
+        """Test the tree is listed and hashed once per session."""
+        index = FileIndex(root)
+        with patch("pytest_checkers.index.iter_source_files", wraps=iter_source_files) as mock_walk:
+            index.stats()
+            index.stats()
+        mock_walk.assert_called_once()
+        with patch("pytest_checkers.index.file_digest", return_value="digest") as mock_digest:
+            assert index.digest("pkg/mod.py") == index.digest("pkg/mod.py") == "digest"
+        mock_digest.assert_called_once()
+
+    def test_shared(self, checkers_module: types.ModuleType, tmp_path: pathlib.Path) -> None:
+        """Test caching and change detection share the checkers index."""
+        mock_config = MagicMock(rootpath=tmp_path)
+        mock_config.option.checkers = True
+        mock_config.option.checkers_executor = "subprocess"
+        mock_config.option.checkers_daemon = False
+        mock_config.option.checkers_changed_base = None
+        mock_config.option.checkers_cpus = 0
+        mock_config.option.checkers_pyright_offline = False
+        with patch("pytest_checkers.checkers.added_options", ["ruff", "mypy"]):
+            checkers_module.pytest_configure(mock_config)
+        plugins = [call.args[0] for call in mock_config.pluginmanager.register.call_args_list]
+        index = plugins[0].index
+        assert all(plugin.index is index for plugin in plugins)
+        assert plugins[0].cache.index is index
+        assert plugins[0].changes.index is index
+
+    def test_explicit_files(self, checkers_module: types.ModuleType, cache_config: MagicMock) -> None:
+        """Test file-local tools get the index as explicit files."""
+        (cache_config.rootpath / "a.py").write_text("x = 1\n", encoding="utf-8")
+        ruff = checkers_module.RuffPlugin(config=cache_config)
+        mypy = checkers_module.MypyPlugin(config=cache_config)
+        ruff.explicit_files = mypy.explicit_files = True
+        assert ruff.paths == [str(cache_config.rootpath / "a.py")]
+        assert mypy.paths == [str(cache_config.rootpath)]
+
+    def test_black_excludes(self, checkers_module: types.ModuleType, cache_config: MagicMock) -> None:
+        """Test black applies its configured excludes to explicit files."""
+        (cache_config.rootpath / "pyproject.toml").write_text(
+            '[tool.black]\nextend-exclude = "migrations"\n',
+            encoding="utf-8",
+        )
+        plugin = checkers_module.BlackPlugin(config=cache_config)
+        assert plugin.file_flags == ["--force-exclude", "(?:migrations)"]
+
+
+class TestChangeDetector:
+    """TestChangeDetector."""
+
+    @pytest.fixture
+    def plugin(self, checkers_module: types.ModuleType, cache_config: MagicMock) -> CheckersPlugin:
+        """Return file-local plugin in changed mode."""
+        for name in ("a.py", "b.py"):
+            (cache_config.rootpath / name).write_text("x = 1\n", encoding="utf-8")
+        plugin = checkers_module.RuffPlugin(config=cache_config)
+        plugin.changes = ChangeDetector(cache_config)
+        return typing.cast("CheckersPlugin", plugin)
+
+    def test_full_tree_without_baseline(self, plugin: CheckersPlugin) -> None:
+        """Test the full tree is checked without a previous passing run."""
+        assert plugin.paths == [str(plugin.config.rootpath)]
+
+    def test_changed_only(self, plugin: CheckersPlugin) -> None:
+        """Test only changed sources are checked after a passing run."""
+        assert plugin.changes is not None
+        plugin.changes.record(plugin.tool)
+        (plugin.config.rootpath / "b.py").write_text("x = 22\n", encoding="utf-8")
+        plugin.changes = ChangeDetector(plugin.config)
+        assert plugin.paths == [str(plugin.config.rootpath / "b.py")]
+
+    def test_config_change_full_tree(self, plugin: CheckersPlugin) -> None:
+        """Test a config change falls back to the full tree."""
+        assert plugin.changes is not None
+        plugin.changes.record(plugin.tool)
+        (plugin.config.rootpath / "pyproject.toml").write_text("[tool.ruff]\n", encoding="utf-8")
+        plugin.changes = ChangeDetector(plugin.config)
+        assert plugin.paths == [str(plugin.config.rootpath)]
+
+    def test_whole_program_tool_full_tree(self, checkers_module: types.ModuleType, plugin: CheckersPlugin) -> None:
+        """Test non file-local tools always check the full tree."""
+        assert plugin.changes is not None
+        plugin.changes.record("mypy")
+        mypy = checkers_module.MypyPlugin(config=plugin.config)
+        mypy.changes = plugin.changes
+        assert mypy.paths == [str(plugin.config.rootpath)]
+
+    def test_nothing_changed(self, plugin: CheckersPlugin, mock_popen: MagicMock) -> None:
+        """Test the tool is not run when nothing changed."""
+        assert plugin.changes is not None
+        plugin.changes.record(plugin.tool)
+        plugin.execute()
+        mock_popen.assert_not_called()
+        assert not plugin.is_error
+
+    def test_git_base(self, plugin: CheckersPlugin) -> None:
+        """Test changed sources from git."""
+        plugin.changes = ChangeDetector(plugin.config, "main")
+        with patch("subprocess.run") as mock_run:
+            mock_run.side_effect = [MagicMock(stdout="a.py\nREADME.md\n"), MagicMock(stdout="new.py\n")]
+            assert plugin.paths == [str(plugin.config.rootpath / "a.py")]
+
+    def test_git_base_config_change(self, plugin: CheckersPlugin) -> None:
+        """Test a config change in git falls back to the full tree."""
+        plugin.changes = ChangeDetector(plugin.config, "main")
+        with patch("subprocess.run") as mock_run:
+            mock_run.return_value = MagicMock(stdout="a.py\nsub/pyproject.toml\n")
+            assert plugin.paths == [str(plugin.config.rootpath)]
+
+    def test_removed(self, plugin: CheckersPlugin) -> None:
+        """Test sources deleted since the last passing run are reported."""
+        assert plugin.changes is not None
+        plugin.changes.record(plugin.tool)
+        (plugin.config.rootpath / "b.py").unlink()
+        plugin.changes = ChangeDetector(plugin.config)
+        assert plugin.changes.removed(plugin.tool) == ["b.py"]
+        assert plugin.changes.changed(plugin.tool) == []
+
+
+class TestPackages:
+    """TestPackages."""
+
+    @pytest.fixture
+    def config(self, cache_config: MagicMock) -> MagicMock:
+        """Return config rooted in a monorepo, an app depending on a src-layout library."""
+        files = {
+            "pyproject.toml": "[tool.mypy]\nstrict = true\n",
+            "tools/run.py": "import bapp\n",
+            "libs/a/pyproject.toml": "[project]\nname = 'a'\n",
+            "libs/a/src/alib/__init__.py": "X = 1\n",
+            "apps/b/pyproject.toml": "[tool.mypy]\nstrict = false\n",
+            "apps/b/bapp/__init__.py": "import os, alib  # noqa\nfrom alib import X\n",
+        }
+        for rel, text in files.items():
+            (cache_config.rootpath / rel).parent.mkdir(parents=True, exist_ok=True)
+            (cache_config.rootpath / rel).write_text(text, encoding="utf-8")
+        cache_config.option = argparse.Namespace(checkers_packages=True, checkers_jobs=1, checkers_cache_clear=False)
+        cache_config.pluginmanager = MagicMock()
+        cache_config.pluginmanager.has_plugin.return_value = True
+        return cache_config
+
+    @pytest.fixture
+    def plugin(self, checkers_module: types.ModuleType, config: MagicMock) -> CheckersPlugin:
+        """Return mypy split per package."""
+        plugin = checkers_module.MypyPlugin(config=config)
+        checkers_module._configure_packages(config, [plugin])  # noqa: SLF001
+        return typing.cast("CheckersPlugin", plugin)
+
+    def test_discover(self, config: MagicMock) -> None:
+        """Test every source belongs to the closest project and provides its top-level module."""
+        packages = {package.path: package for package in discover(FileIndex(config.rootpath))}
+        assert packages["libs/a"].files == ("libs/a/src/alib/__init__.py",)
+        assert packages["libs/a"].modules == {"alib"}
+        assert packages["libs/a"].source_root(config.rootpath) == config.rootpath / "libs/a/src"
+        assert packages["."].files == ("tools/run.py",)
+        assert packages["."].modules == {"tools"}
+
+    def test_imported_modules(self) -> None:
+        """Test the top-level names of absolute imports are found, not import lines in strings."""
+        source = (
+            '"""Doc.\n\nimport f\n"""\n\nimport os.path, json as j\nfrom a.b import c\n\nif j:\n    from . import d\n'
+            'x = """\nfrom e import g\n"""\n'
+        )
+        assert imported_modules(source) == {"os", "json", "a"}
+        assert imported_modules("import os\nif\n") == set()
+
+    def test_graph(self, config: MagicMock) -> None:
+        """Test packages are ordered dependencies first, a change affecting its dependents."""
+        graph = dependency_graph(discover(FileIndex(config.rootpath)), config.rootpath)
+        assert graph == {".": {"apps/b"}, "apps/b": {"libs/a"}, "libs/a": set()}
+        assert ordered(graph) == ["libs/a", "apps/b", "."]
+        assert closure(graph, ["apps/b"]) == {"apps/b", "libs/a"}
+        assert dependents(graph, ["apps/b"]) == {"apps/b", "."}
+        assert ordered({"a": {"b"}, "b": {"a"}}) == ["a", "b"]
+
+    def test_runs(self, plugin: CheckersPlugin, mock_popen: MagicMock) -> None:
+        """Test each package is checked on its own, with its config and its dependencies importable."""
+        root = plugin.config.rootpath
+        assert list(plugin.package_runs) == ["libs/a", "apps/b", "."]
+        app = plugin.package_runs["apps/b"]
+        assert app.env_vars["MYPYPATH"] == str(root / "libs/a/src")
+        assert app.scope == frozenset({"apps/b/bapp/__init__.py", "libs/a/src/alib/__init__.py"})
+        mock_popen.outputs.extend([(b"", b"", 0), (b"error\n", b"", 1), (b"", b"", 0)])
+        plugin.run_tool()
+        commands = [call.args[0] for call in mock_popen.call_args_list]
+        assert commands[1][-3:] == ["--config-file", str(root / "apps/b/pyproject.toml"), str(root / "apps/b")]
+        assert commands[2][-1] == str(root / "tools/run.py")
+        assert plugin.is_error
+        assert not plugin.package_runs["libs/a"].is_error
+        assert plugin.cmd_output == "error\n"
+
+    def test_affected(self, plugin: CheckersPlugin, mock_popen: MagicMock) -> None:
+        """Test only changed packages and their dependents are checked again."""
+        plugin.changes = ChangeDetector(plugin.config)
+        plugin.changes.record(plugin.tool)
+        (plugin.config.rootpath / "apps/b/bapp/__init__.py").write_text("import alib\n", encoding="utf-8")
+        plugin.changes = ChangeDetector(plugin.config)
+        assert plugin.affected_packages() == {"apps/b", "."}
+        plugin.run_tool()
+        assert mock_popen.call_count == 2
+        assert plugin.package_runs["libs/a"].cmd_output == "Unchanged since the last passing run.\n"
+
+    def test_items(self, plugin: CheckersPlugin) -> None:
+        """Test one item per package, the selected ones only being checked."""
+        session = MagicMock(spec=pytest.Session)
+        items: list[typing.Any] = []
+        with patch("pytest_checkers.checkers.PluginItem") as mock_plugin_item_class:
+            mock_plugin_item_class.from_parent.side_effect = [MagicMock(), MagicMock(), MagicMock()]
+            plugin.pytest_collection_modifyitems(session, plugin.config, items)
+        assert [item._nodeid for item in items] == [  # noqa: SLF001
+            "checkers::mypy::libs/a",
+            "checkers::mypy::apps/b",
+            "checkers::mypy::.",
+        ]
+        assert [item.package for item in items] == ["libs/a", "apps/b", "."]
+
+
+class TestScope:
+    """TestScope."""
+
+    @pytest.fixture
+    def index(self, tmp_path: pathlib.Path) -> FileIndex:
+        """Return the index of a src-layout project, with tests for two features."""
+        files = {
+            "src/shop/__init__.py": "",
+            "src/shop/payments/__init__.py": "from . import refund\n",
+            "src/shop/payments/refund.py": "from ..util import money\n",
+            "src/shop/util.py": "import os\n",
+            "src/shop/cart.py": "import shop.util\n",
+            "tests/payments/test_refund.py": "from shop.payments.refund import refund\n",
+            "tests/test_cart.py": "import shop.cart\n",
+            "tests/test_broken.py": "import shop.cart\ndef (\n",
+        }
+        for rel, text in files.items():
+            (tmp_path / rel).parent.mkdir(parents=True, exist_ok=True)
+            (tmp_path / rel).write_text(text, encoding="utf-8")
+        return FileIndex(tmp_path)
+
+    def test_module_names(self, index: FileIndex) -> None:
+        """Test sources are named from the top of their package chain, then from the root."""
+        modules = ModuleMap(index)
+        assert modules.names["src/shop/payments/refund.py"] == "shop.payments.refund"
+        assert modules.files["src.shop.util"] == "src/shop/util.py"
+        assert modules.names["tests/test_cart.py"] == "test_cart"
+        assert list(modules.resolve("shop.payments.nothing")) == [
+            "src/shop/__init__.py",
+            "src/shop/payments/__init__.py",
+        ]
+
+    def test_imported_names(self) -> None:
+        """Test relative imports are resolved against the importing module."""
+        tree = ast.parse("from ..util import money\nfrom . import refund\nimport json.decoder\n")
+        names = set(imported_names(tree, "shop.payments.refund", package=False))
+        assert names == {"shop.util", "shop.util.money", "shop.payments", "shop.payments.refund", "json.decoder"}
+
+    def test_scope(self, index: FileIndex) -> None:
+        """Test the scope holds the test modules and everything they import, transitively."""
+        assert scope(index, ["tests/payments/test_refund.py"]) == [
+            "src/shop/__init__.py",
+            "src/shop/payments/__init__.py",
+            "src/shop/payments/refund.py",
+            "src/shop/util.py",
+            "tests/payments/test_refund.py",
+        ]
+        assert scope(index, ["tests/test_broken.py", "outside.py"]) == ["tests/test_broken.py"]
+
+    def test_narrowed_run(self, checkers_module: types.ModuleType, index: FileIndex) -> None:
+        """Test checkers are scoped on narrowed runs only, granular ones keeping their files."""
+        config = MagicMock(spec=pytest.Config)
+        config.rootpath = index.root
+        config.option = argparse.Namespace(checkers_scope=True)
+        config.stash = pytest.Stash()
+        config.args_source = pytest.Config.ArgsSource.TESTPATHS
+        ruff, flake8 = checkers_module.RuffPlugin(config=config), checkers_module.Flake8Plugin(config=config)
+        ruff.index = index
+        flake8.granular = True
+        session = MagicMock(spec=pytest.Session)
+        session.config = config
+        session.items = [MagicMock(spec=pytest.Item, path=index.root / "tests/test_cart.py")]
+        checkers_module._scope(session, [ruff, flake8])  # noqa: SLF001
+        assert ruff.selected_files is None
+        session.items[0].config = config
+        checkers_module.pytest_deselected(session.items)
+        checkers_module._scope(session, [ruff, flake8])  # noqa: SLF001
+        assert ruff.selected_files == [
+            "src/shop/__init__.py",
+            "src/shop/cart.py",
+            "src/shop/util.py",
+            "tests/test_cart.py",
+        ]
+        assert flake8.selected_files is None
+
+
+class TestWatch:
+    """TestWatch."""
+
+    @pytest.fixture
+    def plugins(self, checkers_module: types.ModuleType, cache_config: MagicMock) -> list[CheckersPlugin]:
+        """Return a file-local and a whole-program checker over two sources."""
+        for name in ("a.py", "b.py"):
+            (cache_config.rootpath / name).write_text("x = 1\n", encoding="utf-8")
+        cache_config.option = argparse.Namespace(
+            checkers_watch_debounce=0.0,
+            checkers_jobs=1,
+            checkers_packages=False,
+        )
+        return [checkers_module.RuffPlugin(config=cache_config), checkers_module.MypyPlugin(config=cache_config)]
+
+    def test_relevant(self) -> None:
+        """Test only sources and config files outside hidden and build directories count."""
+        assert relevant("pkg/mod.py")
+        assert relevant("sub/pyproject.toml")
+        assert not relevant("README.md")
+        assert not relevant(".venv/lib.py")
+        assert not relevant("build/out.py")
+
+    def test_affected(self, plugins: list[CheckersPlugin]) -> None:
+        """Test file-local tools check the changed sources, the others the tree, configs their tools."""
+        ruff, mypy = plugins
+        assert affected(plugins, {"b.py"}) == {ruff: ["b.py"], mypy: None}
+        assert affected(plugins, {"gone.py"}) == {mypy: None}
+        assert affected(plugins, {"mypy.ini"}) == {mypy: None}
+        assert affected(plugins, {"pyproject.toml", "b.py"}) == {ruff: None, mypy: None}
+        assert affected(plugins, {OVERFLOW}) == {ruff: None, mypy: None}
+
+    def test_polling(self, tmp_path: pathlib.Path) -> None:
+        """Test polling reports the changed sources."""
+        (tmp_path / "a.py").write_text("", encoding="utf-8")
+        watcher = PollingWatcher(tmp_path, interval=0.01)
+        (tmp_path / "a.py").write_text("x = 1\n", encoding="utf-8")
+        (tmp_path / "notes.txt").write_text("", encoding="utf-8")
+        assert watcher.wait(debounce=0.05) == {"a.py"}
+
+    @pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify is Linux only")
+    def test_inotify(self, tmp_path: pathlib.Path) -> None:
+        """Test inotify reports changed sources, new directories included."""
+        watcher = open_watcher(tmp_path)
+        try:
+            assert isinstance(watcher, InotifyWatcher)
+            (tmp_path / "pkg").mkdir()
+            (tmp_path / "pkg" / "mod.py").write_text("x = 1\n", encoding="utf-8")
+            (tmp_path / ".hidden").mkdir()
+            (tmp_path / ".hidden" / "mod.py").write_text("x = 1\n", encoding="utf-8")
+            assert watcher.wait(debounce=0.05) == {"pkg/mod.py"}
+        finally:
+            watcher.close()
+
+    def test_watch(
+        self,
+        checkers_module: types.ModuleType,
+        plugins: list[CheckersPlugin],
+        mock_popen: MagicMock,
+    ) -> None:
+        """Test each batch of changes runs the affected checkers and reports, until interrupted."""
+        ruff, mypy = plugins
+        config = ruff.config
+        config.pluginmanager = MagicMock()
+        reporter = config.pluginmanager.get_plugin.return_value
+        watcher = MagicMock(spec=PollingWatcher)
+        watcher.name = "polling"
+        watcher.wait.side_effect = [{"b.py"}, KeyboardInterrupt]
+        mock_popen.outputs.append((b"b.py:1:1: F401 unused\n", b"", 1))
+        with patch("pytest_checkers.watch.open_watcher", return_value=watcher):
+            checkers_module._watch(config, plugins)  # noqa: SLF001
+        args, _ = mock_popen.call_args_list[0]
+        assert args[0][-1] == str(config.rootpath / "b.py")
+        assert ruff.is_error
+        assert not mypy.is_error
+        summary = reporter.write_sep.call_args_list[-2]
+        assert summary.args[1].startswith("1 changed, ruff failed, mypy passed in ")
+        assert summary.kwargs == {"red": True, "green": False}
+        watcher.close.assert_called_once()
+
+
+class TestDmypyDaemon:
+    """TestDmypyDaemon."""
+
+    @pytest.fixture
+    def plugin(self, checkers_module: types.ModuleType, cache_config: MagicMock) -> CheckersPlugin:
+        """Return mypy plugin in daemon mode."""
+        cache_config.cache.mkdir.return_value = cache_config.rootpath
+        plugin = checkers_module.MypyPlugin(config=cache_config)
+        plugin.daemon = DmypyDaemon(plugin, idle_timeout=60)
+        return typing.cast("CheckersPlugin", plugin)
+
+    def test_run(self, plugin: CheckersPlugin) -> None:
+        """Test checks go through `dmypy run`."""
+        with patch("subprocess.run") as mock_run:
+            mock_run.return_value = MagicMock(stdout="Success\n", stderr="", returncode=0)
+            plugin.execute()
+            mock_run.assert_called_once()
+            args, kwargs = mock_run.call_args
+        status_file = str(plugin.config.rootpath / "mypy.json")
+        assert args[0][:5] == [sys.executable, "-m", "mypy.dmypy", "--status-file", status_file]
+        assert args[0][5:9] == ["run", "--timeout", "60", "--"]
+        assert kwargs["cwd"] == plugin.config.rootpath
+        assert plugin.cmd_output == "Success\n"
+
+    def test_blocking_error_healthy(self, plugin: CheckersPlugin) -> None:
+        """Test a blocking error from a running daemon is kept."""
+        with patch("subprocess.run") as mock_run:
+            mock_run.side_effect = [
+                MagicMock(stdout="a.py:1: error: invalid syntax\n", stderr="", returncode=2),
+                MagicMock(returncode=0),
+            ]
+            plugin.execute()
+            assert mock_run.call_count == 2
+        assert plugin.cmd_returncode == 2
+
+    def test_fallback_unhealthy(self, plugin: CheckersPlugin, mock_popen: MagicMock) -> None:
+        """Test the daemon is stopped and the one-shot run used when it is unhealthy."""
+        mock_popen.outputs.append((b"Success\n", b"", 0))
+        with patch("subprocess.run") as mock_run:
+            mock_run.side_effect = [
+                MagicMock(stdout="", stderr="Daemon crashed!\n", returncode=2),
+                MagicMock(returncode=2),
+                MagicMock(returncode=2),
+                MagicMock(returncode=0),
+            ]
+            plugin.execute()
+            commands = [call.args[0] for call in mock_run.call_args_list]
+        assert [cmd[5] for cmd in commands] == ["run", "status", "stop", "kill"]
+        assert mock_popen.call_args.args[0] == [sys.executable, "-m", "mypy", str(plugin.config.rootpath)]
+        assert plugin.cmd_output == "Success\n"
+
+    def test_fallback_oserror(self, plugin: CheckersPlugin, mock_popen: MagicMock) -> None:
+        """Test the one-shot run is used when the daemon cannot be reached."""
+        mock_popen.outputs.append((b"Success\n", b"", 0))
+        with patch("subprocess.run", side_effect=OSError):
+            plugin.execute()
+        assert plugin.cmd_output == "Success\n"
+
+    def test_lifecycle(self, plugin: CheckersPlugin) -> None:
+        """Test check, status and stop."""
+        assert plugin.daemon is not None
+        with patch("subprocess.run") as mock_run:
+            mock_run.return_value = MagicMock(returncode=0, stdout="Success\n", stderr="")
+            assert plugin.daemon.check(["--strict"], ["a.py"]) == ("Success\n", 0)
+            assert plugin.daemon.status()
+            plugin.daemon.stop()
+            commands = [call.args[0][5:] for call in mock_run.call_args_list]
+        assert commands == [["run", "--timeout", "60", "--", "--strict", "a.py"], ["status"], ["stop"]]
+
+
+class TestProfiling:
+    """TestProfiling."""
+
+    @pytest.fixture
+    def plugin(self, checkers_module: types.ModuleType, cache_config: MagicMock) -> CheckersPlugin:
+        """Return profiled plugin."""
+        for name in ("a.py", "b.py"):
+            (cache_config.rootpath / name).write_text("x = 1\n", encoding="utf-8")
+        plugin = checkers_module.RuffPlugin(config=cache_config)
+        plugin.profiling = True
+        return typing.cast("CheckersPlugin", plugin)
+
+    @pytest.mark.skipif(not hasattr(os, "wait4"), reason="os.wait4 not available")
+    def test_wait_rusage(self) -> None:
+        """Test the child resource usage is collected."""
+        with subprocess.Popen([sys.executable, "-c", "import sys; sys.exit(3)"]) as process:
+            returncode, rusage = wait(process)
+        assert returncode == 3
+        assert process.returncode == 3
+        assert rusage is not None
+        profile = RunProfile()
+        profile.add_rusage(rusage)
+        assert profile.user + profile.system > 0
+        assert profile.max_rss > 0
+
+    def test_execute(self, plugin: CheckersPlugin, mock_popen: MagicMock) -> None:
+        """Test a run records its cost."""
+        mock_popen.outputs.append((b"found", b"", 1))
+        with patch("pytest_checkers.profiling.wait", return_value=(1, None)):
+            plugin.execute()
+        assert plugin.profile is not None
+        assert plugin.profile.source == "subprocess"
+        assert plugin.profile.wall > 0
+        assert plugin.profile.output_bytes == len(b"found")
+        assert plugin.profile.files == 2
+
+    def test_not_profiling(self, plugin: CheckersPlugin, mock_popen: MagicMock) -> None:
+        """Test no profile by default."""
+        plugin.profiling = False
+        plugin.execute()
+        mock_popen.assert_called_once()
+        assert plugin.profile is None
+
+    def test_combine(self) -> None:
+        """Test shard profiles combine as parallel runs."""
+        combined = combine([RunProfile("subprocess", 2, 1, 1, 10, 5, 3), RunProfile("cache", 1, 2, 0, 20, 5, 4)])
+        assert combined == RunProfile("cache+subprocess", 2, 3, 1, 20, 10, 7)
+
+    def test_render_table(self) -> None:
+        """Test the table is aligned and sorted slowest first."""
+        lines = render_table({"ruff": RunProfile(wall=0.1), "mypy": RunProfile(wall=3)})
+        assert lines[0].split()[:2] == ["tool", "source"]
+        assert [line.split()[0] for line in lines[1:]] == ["mypy", "ruff"]
+        assert len({len(line) for line in lines}) == 1
+
+    def test_summary_and_json(
+        self,
+        checkers_module: types.ModuleType,
+        plugin: CheckersPlugin,
+        tmp_path: pathlib.Path,
+    ) -> None:
+        """Test the table is shown and the profile exported."""
+        plugin.profile = RunProfile(wall=1.5, files=2)
+        config = MagicMock()
+        config.stash.get.return_value = MagicMock(plugins=[plugin])
+        config.option.checkers_profile = True
+        config.option.checkers_report = None
+        config.option.checkers_daemon_stop = False
+        config.option.checkers_profile_json = str(tmp_path / "profile.json")
+        mock_reporter = MagicMock()
+        checkers_module.pytest_terminal_summary(mock_reporter, config)
+        assert mock_reporter.write_line.call_args_list[1].args[0].startswith("ruff")
+        checkers_module.pytest_sessionfinish(MagicMock(config=config))
+        exported = json.loads((tmp_path / "profile.json").read_text(encoding="utf-8"))
+        assert exported["ruff"]["wall"] == 1.5
+        assert exported["ruff"]["files"] == 2
+        assert "version" in exported["ruff"]
+
+
+class TestLimits:
+    """TestLimits."""
+
+    @pytest.mark.parametrize(
+        ("value", "expected"),
+        [(1024, 1024), ("100", 100), ("2K", 2048), ("512MiB", 512 * 1024**2), ("1.5GB", 1536 * 1024**2)],
+    )
+    def test_parse_size(self, value: int | str, expected: int) -> None:
+        """Test sizes are parsed as binary multiples."""
+        assert parse_size(value) == expected
+
+    def test_parse_size_invalid(self) -> None:
+        """Test invalid sizes are refused."""
+        with pytest.raises(ValueError, match="invalid size"):
+            parse_size("lots")
+
+    def test_from_settings(self) -> None:
+        """Test the tool table overrides the top-level defaults."""
+        settings = {"timeout": 60, "nice": 5, "mypy": {"timeout": 300, "max-rss": "2GiB", "cpus": [0, 1]}}
+        assert Limits.from_settings(settings, "mypy") == Limits(300, 2 * 1024**3, 5, (0, 1))
+        assert Limits.from_settings(settings, "ruff") == Limits(60, None, 5, None)
+        assert Limits.from_settings({}, "ruff") == Limits()
+
+    def test_apply_nothing(self) -> None:
+        """Test nothing is applied without limits applying to the process."""
+        with patch("os.setpriority") as setpriority:
+            Limits().apply(os.getpid())
+            Limits(timeout=1).apply(os.getpid())
+        setpriority.assert_not_called()
+
+    @pytest.mark.skipif(sys.platform != "linux", reason="memory limit and affinity are applied on Linux only")
+    def test_spawn_limits(self, checkers_module: types.ModuleType, cache_config: MagicMock) -> None:
+        """Test the limits are applied to the started tool."""
+        plugin = checkers_module.RuffPlugin(config=cache_config)
+        plugin.limits = Limits(max_rss=4 * 1024**3, nice=3, cpus=(0,))
+        script = (
+            "import os, resource, time; time.sleep(0.5); "
+            "print(resource.getrlimit(resource.RLIMIT_AS)[0], os.getpriority(os.PRIO_PROCESS, 0), "
+            "sorted(os.sched_getaffinity(0)))"
+        )
+        plugin.spawn([sys.executable, "-c", script])
+        assert plugin.cmd_output == f"{4 * 1024**3} {os.getpriority(os.PRIO_PROCESS, 0) + 3} [0]\n"
+
+    @pytest.mark.skipif(os.name != "posix", reason="limits are applied on POSIX only")
+    def test_spawn_denied(self, checkers_module: types.ModuleType, cache_config: MagicMock) -> None:
+        """Test limits the tool cannot be put under are reported as a breach, the tool not left running."""
+        plugin = checkers_module.RuffPlugin(config=cache_config)
+        plugin.limits = Limits(nice=3)
+        with patch("os.setpriority", side_effect=PermissionError(1, "Operation not permitted")):
+            plugin.spawn([sys.executable, "-c", "import time; time.sleep(30); print('ran')"])
+        assert plugin.breach == "could not apply its limits: [Errno 1] Operation not permitted"
+        assert "ran" not in plugin.cmd_output
+
+    def test_configure_invalid(self, checkers_module: types.ModuleType, cache_config: MagicMock) -> None:
+        """Test invalid limits are a usage error naming the setting."""
+        (cache_config.rootpath / "pyproject.toml").write_text(
+            '[tool.pytest-checkers.ruff]\nmax-rss = "lots"\n',
+            encoding="utf-8",
+        )
+        plugin = checkers_module.RuffPlugin(config=cache_config)
+        with pytest.raises(pytest.UsageError, match=r"invalid \[tool.pytest-checkers\] limits for ruff"):
+            checkers_module._configure_limits(cache_config, [plugin])  # noqa: SLF001
+
+    @pytest.mark.parametrize(
+        ("output", "returncode", "expected"),
+        [
+            ("", 0, None),
+            ("a.py:1: error", 1, None),
+            ("MemoryError", 1, "exceeded the memory limit of 64 MiB"),
+            ("", -signal.SIGABRT, "exceeded the memory limit of 64 MiB"),
+        ],
+    )
+    def test_breach_memory(self, output: str, returncode: int, expected: str | None) -> None:
+        """Test memory breaches are told from ordinary failures."""
+        assert Limits(max_rss=64 * 1024**2).breach(output, returncode, timed_out=False) == expected
+        assert Limits().breach(output, returncode, timed_out=False) is None
+
+    @pytest.mark.skipif(os.name != "posix", reason="process groups are POSIX only")
+    def test_timeout(self, checkers_module: types.ModuleType, cache_config: MagicMock) -> None:
+        """Test a tool over its timeout is killed and reported as a breach."""
+        plugin = checkers_module.RuffPlugin(config=cache_config)
+        plugin.limits = Limits(timeout=0.2)
+        plugin.spawn([sys.executable, "-c", "import time; print('started', flush=True); time.sleep(30)"])
+        assert plugin.breach == "timed out after 0.2s"
+        assert plugin.cmd_returncode == -signal.SIGKILL
+        assert plugin.is_error
+        assert plugin.cmd_output.startswith("started")
+        assert plugin.cmd_output.endswith("ruff timed out after 0.2s\n")
+
+
+class TestCpuBudget:
+    """TestCpuBudget."""
+
+    def test_shares(self) -> None:
+        """Test runs starting together split the budget, later ones getting what finished ones gave back."""
+        budget = CpuBudget(8, expected=4)
+        shares = [budget.acquire() for _ in range(3)]
+        assert shares == [2, 2, 2]
+        budget.release(shares[0])
+        assert budget.acquire() == 4
+        assert budget.acquire() == 1
+        budget.reset(1)
+        assert budget.acquire(cap=3) == 1
+
+    def test_split(self) -> None:
+        """Test xdist workers split the budget, concurrent tests keeping a CPU."""
+        assert split(8, 1, concurrent_tests=True) == 7
+        assert split(8, 4, concurrent_tests=False) == 2
+        assert split(2, 4, concurrent_tests=False) == 1
+
+    def test_native_parallelism(
+        self,
+        checkers_module: types.ModuleType,
+        cache_config: MagicMock,
+        mock_popen: MagicMock,
+    ) -> None:
+        """Test each tool gets its share through its own flag or environment variable."""
+        flake8 = checkers_module.Flake8Plugin(config=cache_config)
+        ruff = checkers_module.RuffPlugin(config=cache_config)
+        flake8.cpu_budget = ruff.cpu_budget = CpuBudget(6, expected=2)
+        flake8.execute()
+        args, kwargs = mock_popen.call_args
+        assert args[0][-3:] == ["--jobs", "3", str(cache_config.rootpath)]
+        assert "RAYON_NUM_THREADS" not in kwargs["env"]
+        ruff.execute()
+        _, kwargs = mock_popen.call_args
+        assert kwargs["env"]["RAYON_NUM_THREADS"] == "6"
+        flake8.ruff = flake8_command(cache_config.rootpath)
+        assert flake8.parallel_flags(2) == []
+        assert flake8.parallel_env(2)["RAYON_NUM_THREADS"] == "2"
+
+
+class TestNodeRuntime:
+    """TestNodeRuntime."""
+
+    @staticmethod
+    def fake_runtime(tmp_path: pathlib.Path, version: str = "1.0.0") -> dict[str, str]:
+        """Lay out a nodeenv and a downloaded pyright package, return the wrapper settings pointing at them."""
+        node = tmp_path / "env" / "bin" / "node"
+        node.parent.mkdir(parents=True)
+        node.write_text("")
+        package = tmp_path / "cache" / "pyright-python" / version / "node_modules" / "pyright"
+        package.mkdir(parents=True)
+        (package / "package.json").write_text(json.dumps({"version": version}))
+        (package / "index.js").write_text("")
+        return {
+            "PYRIGHT_PYTHON_NODEJS_WHEEL": "0",
+            "PYRIGHT_PYTHON_GLOBAL_NODE": "0",
+            "PYRIGHT_PYTHON_ENV_DIR": str(tmp_path / "env"),
+            "PYRIGHT_PYTHON_CACHE_DIR": str(tmp_path / "cache"),
+            "PYRIGHT_PYTHON_FORCE_VERSION": version,
+        }
+
+    def test_find(self, tmp_path: pathlib.Path) -> None:
+        """Test node and the pyright script are found where the wrapper put them, never fetched."""
+        env = self.fake_runtime(tmp_path)
+        assert find_node(env) == tmp_path / "env" / "bin" / "node"
+        package = tmp_path / "cache" / "pyright-python" / "1.0.0" / "node_modules" / "pyright"
+        assert find_script(env) == package / "index.js"
+        assert find_script({**env, "PYRIGHT_PYTHON_FORCE_VERSION": "2.0.0"}) is None
+        assert find_script({**env, "PYRIGHT_PYTHON_FORCE_VERSION": "latest"}) is None
+        assert find_script({**env, "PYRIGHT_PYTHON_PYLANCE_VERSION": "latest-release"}) is None
+        assert find_node({**env, "PYRIGHT_PYTHON_ENV_DIR": str(tmp_path / "missing")}) is None
+
+    def test_resolve(self, cache_config: MagicMock, tmp_path: pathlib.Path) -> None:
+        """Test the resolution is cached, re-done when the settings change or a cached file went away."""
+        cache_config.pluginmanager = MagicMock()
+        cache_config.pluginmanager.has_plugin.return_value = True
+        env = self.fake_runtime(tmp_path)
+        runtime = resolve(cache_config, env)
+        assert runtime is not None
+        assert runtime.command() == [str(tmp_path / "env" / "bin" / "node"), runtime.script]
+        with (
+            patch("pytest_checkers.node.find_node") as mock_node,
+            patch("pytest_checkers.node.find_script") as mock_script,
+        ):
+            assert resolve(cache_config, env) == runtime
+            mock_node.assert_not_called()
+            mock_script.return_value = None
+            assert resolve(cache_config, {**env, "PYRIGHT_PYTHON_FORCE_VERSION": "2.0.0"}) is None
+            pathlib.Path(runtime.node).unlink()
+            assert resolve(cache_config, env) is None
+
+    def test_plugin(self, checkers_module: types.ModuleType, cache_config: MagicMock, mock_popen: MagicMock) -> None:
+        """Test pyright runs on node directly once resolved, and fails offline rather than using the wrapper."""
+        plugin = checkers_module.PyrightPlugin(config=cache_config)
+        plugin.execute()
+        assert mock_popen.call_args[0][0][:3] == [sys.executable, "-m", "pyright"]
+        plugin.runtime = NodeRuntime("/opt/node", "/opt/pyright/index.js")
+        plugin.execute()
+        assert mock_popen.call_args[0][0][:2] == ["/opt/node", "/opt/pyright/index.js"]
+        plugin.runtime = None
+        plugin.offline = True
+        mock_popen.reset_mock()
+        plugin.execute()
+        mock_popen.assert_not_called()
+        assert plugin.is_error
+        assert "offline" in plugin.cmd_output
+
+
+class TestHistory:
+    """TestHistory."""
+
+    def test_estimate(self, cache_config: MagicMock) -> None:
+        """Test durations decay into a per-bucket average, the closest bucket standing in for unrecorded ones."""
+        history = History(cache_config)
+        assert history.estimate("ruff", 10) is None
+        history.record("ruff", 10, 2.0)
+        history.record("ruff", 12, 4.0)
+        assert history.estimate("ruff", 9) == pytest.approx(2.6)
+        assert history.estimate("ruff", 1000) == pytest.approx(2.6)
+        history.record("ruff", 1000, 10.0)
+        assert history.estimate("ruff", 5000) == 10.0
+
+    def test_save(self, cache_config: MagicMock) -> None:
+        """Test each process stores its own averages over the ones stored meanwhile, malformed entries dropped."""
+        cache_config.cache.set(HISTORY_KEY, {"ruff": {"3": "bad"}, "flake8": []})
+        first, second = History(cache_config), History(cache_config)
+        first.record("ruff", 4, 1.0)
+        second.record("mypy", 4, 5.0)
+        first.save()
+        second.save()
+        assert History(cache_config).entries == {"ruff": {"3": 1.0}, "mypy": {"3": 5.0}}
+
+    def test_malformed_buckets(self, cache_config: MagicMock) -> None:
+        """Test stored keys that are not buckets are ignored rather than failing the estimate."""
+        cache_config.cache.set(HISTORY_KEY, {"ruff": {"big": 3.0, "-1": 4.0, "2": 1.0, "3": True}, "mypy": {"x": 1}})
+        history = History(cache_config)
+        assert history.estimate("ruff", 100) == 1.0
+        assert history.estimate("mypy", 100) is None
+
+    def test_longest_first(self, checkers_module: types.ModuleType, cache_config: MagicMock) -> None:
+        """Test the checkers never timed start first, then the longest expected."""
+        plugins = [checkers_module.RuffPlugin(config=cache_config), checkers_module.MypyPlugin(config=cache_config)]
+        plugins.append(checkers_module.PyrightPlugin(config=cache_config))
+        history = History(cache_config)
+        history.record("ruff", 0, 1.0)
+        history.record("mypy", 0, 8.0)
+        for plugin in plugins:
+            plugin.history = history
+        assert [plugin.tool for plugin in longest_first(plugins)] == ["pyright", "mypy", "ruff"]
+        history.record("pyright", 0, 3.0)
+        scheduler = CheckersScheduler(plugins, 1)
+        with patch.object(checkers_module.CheckersPlugin, "execute"):
+            scheduler.start()
+            for plugin in plugins:
+                plugin.run_tool()
+            scheduler.shutdown()
+        assert list(scheduler.started) == [plugins[1], plugins[2], plugins[0]]
+
+    def test_remaining(self) -> None:
+        """Test the pending checkers take the first free job."""
+        assert remaining(2, [3.0], [4.0, 1.0]) == 4.0
+        assert remaining(1, [], [2.0, 3.0]) == 5.0
+        assert remaining(2, [-1.0], []) == 0.0
+
+    def test_announce(self, checkers_module: types.ModuleType) -> None:
+        """Test the time remaining is shown once, before the first checker item."""
+        item = MagicMock(spec=checkers_module.PluginItem)
+        scheduler = MagicMock(announced=False)
+        scheduler.unfinished.return_value = [MagicMock(tool="pyright")]
+        scheduler.remaining.return_value = 12.4
+        item.config.stash = {checkers_module.scheduler_key: scheduler}
+        reporter = item.config.pluginmanager.get_plugin.return_value
+        checkers_module.pytest_runtest_protocol(item)
+        checkers_module.pytest_runtest_protocol(item)
+        reporter.write_line.assert_called_once_with("checkers: ~12s remaining (pyright)")
+
+    def test_execute(self, checkers_module: types.ModuleType, cache_config: MagicMock, mock_popen: MagicMock) -> None:
+        """Test real runs are timed per file-count bucket, replays and timeouts are not."""
+        (cache_config.rootpath / "a.py").write_text("x = 1\n", encoding="utf-8")
+        plugin = checkers_module.RuffPlugin(config=cache_config)
+        plugin.history = History(cache_config)
+        plugin.execute()
+        assert set(plugin.history.entries["ruff"]) == {"1"}
+        plugin.history = History(cache_config)
+        plugin.cache = ResultCache(cache_config)
+        plugin.cache.replay = MagicMock(return_value=True)
+        plugin.execute()
+        assert plugin.history.entries == {}
+        assert mock_popen.call_count == 1
+
+
+class TestExecutors:
+    """TestExecutors."""
+
+    @pytest.fixture
+    def fake_main(self) -> typing.Iterator[MagicMock]:
+        """Patch the isort entry point."""
+
+        def _main(argv: list[str]) -> int:
+            sys.stdout.write(f"out {' '.join(argv)}\n")
+            sys.stdout.buffer.write(b"bytes\n")
+            sys.stderr.write("err\n")
+            raise SystemExit(int(sys.argv[0] == "isort"))
+
+        mock = MagicMock(side_effect=_main)
+        with patch.dict("pytest_checkers.executors.mains", {"isort": mock}):
+            yield mock
+
+    def test_run_main(self, fake_main: MagicMock) -> None:
+        """Test output, exit code and `sys.argv` isolation."""
+        argv = sys.argv
+        assert run_main("isort", ["--diff", "a.py"]) == ("out --diff a.py\nbytes\nerr\n", 1)
+        assert sys.argv is argv
+        fake_main.assert_called_once_with(["--diff", "a.py"])
+
+    def test_run_main_env(self, fake_main: MagicMock) -> None:
+        """Test the environment is restored."""
+        _ = fake_main
+        run_main("isort", [], {"CHECKERS_TEST_VAR": "1"})
+        assert "CHECKERS_TEST_VAR" not in os.environ
+
+    def test_run_main_cwd(self, fake_main: MagicMock, tmp_path: pathlib.Path) -> None:
+        """Test the tool runs in the given directory, the current one restored."""
+        cwd = pathlib.Path.cwd()
+
+        def _main(_: list[str]) -> None:
+            sys.stdout.write(str(pathlib.Path.cwd()))
+
+        fake_main.side_effect = _main
+        assert run_main("isort", [], cwd=tmp_path) == (str(tmp_path), 0)
+        assert pathlib.Path.cwd() == cwd
+
+    def test_black_cache_dir(self, tmp_path: pathlib.Path) -> None:
+        """Test black keeps its cache in the `BLACK_CACHE_DIR` of the run, not the one it was imported with."""
+        pytest.importorskip("black")
+        (tmp_path / "a.py").write_text("a = 1\n", encoding="utf-8")
+        _, returncode = run_main("black", ["--check", "a.py"], {**os.environ, "BLACK_CACHE_DIR": "cache"}, tmp_path)
+        assert returncode == 0
+        assert list((tmp_path / "cache").glob("*/cache.*.pickle"))
+
+    def test_inprocess(self, checkers_module: types.ModuleType, cache_config: MagicMock, fake_main: MagicMock) -> None:
+        """Test tools with a Python API run in process, off the scheduler threads."""
+        _ = fake_main
+        isort = checkers_module.IsortPlugin(config=cache_config)
+        ruff = checkers_module.RuffPlugin(config=cache_config)
+        isort.executor = ruff.executor = InProcessExecutor(["isort", "ruff"])
+        assert not isort.background
+        assert ruff.background
+        isort.execute()
+        assert isort.cmd_output.startswith("out --diff")
+        assert isort.cmd_returncode == 1
+
+    def test_inprocess_env_cwd(
+        self,
+        checkers_module: types.ModuleType,
+        cache_config: MagicMock,
+        fake_main: MagicMock,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        """Test in-process runs get the environment and the working directory of a subprocess."""
+
+        def _main(_: list[str]) -> None:
+            sys.stdout.write(f"{os.environ.get('CHECKERS_TEST_VAR')} {'PATH' in os.environ} {pathlib.Path.cwd()}")
+
+        fake_main.side_effect = _main
+        monkeypatch.chdir("/")
+        plugin = checkers_module.IsortPlugin(config=cache_config)
+        plugin.executor = InProcessExecutor(["isort"])
+        plugin.env_vars = {"CHECKERS_TEST_VAR": "1"}
+        plugin.execute()
+        assert plugin.cmd_output == f"1 False {cache_config.rootpath}"
+        assert "PATH" in os.environ
+        assert "CHECKERS_TEST_VAR" not in os.environ
+        assert pathlib.Path.cwd() == pathlib.Path("/")
+
+    def test_pool(self, checkers_module: types.ModuleType, cache_config: MagicMock) -> None:
+        """Test tools run in warm worker processes."""
+        (cache_config.rootpath / "a.py").write_text("import sys\nimport os\n", encoding="utf-8")
+        plugin = checkers_module.IsortPlugin(config=cache_config)
+        plugin.executor = PoolExecutor(["isort"])
+        assert plugin.background
+        try:
+            plugin.execute()
+        finally:
+            plugin.executor.shutdown()
+        assert plugin.is_error
+        assert "+import os" in plugin.cmd_output
+
+
+class TestBenchmarks:
+    """TestBenchmarks."""
+
+    def test_generate(self, tmp_path: pathlib.Path) -> None:
+        """Test synthetic projects are laid out in packages with planted errors."""
+        planted = generate(tmp_path, 250, error_every=10)
+        assert planted == {"unused-import": 9, "type": 8, "format": 8}
+        assert len(list(tmp_path.glob("pkg_*/mod_*.py"))) == 250
+        assert sorted(path.name for path in tmp_path.glob("pkg_*")) == ["pkg_0", "pkg_1", "pkg_2"]
+
+    def test_generate_clean(self, tmp_path: pathlib.Path) -> None:
+        """Test projects for the cached mode have no planted errors."""
+        assert generate(tmp_path, 20, error_every=0) == {"unused-import": 0, "type": 0, "format": 0}
+
+    def test_cache_misses(self) -> None:
+        """Test tools not replayed from the cache are reported."""
+        assert cache_misses({"ruff": {"source": "cache"}, "mypy": {"source": "subprocess"}}) == ["mypy"]
+
+    def test_compare(self) -> None:
+        """Test slowdowns past the threshold are reported."""
+        baseline: dict[str, typing.Any] = {
+            "startup": {"with": {"wall": 1.0}},
+            "modes": {"serial": {"wall": 10.0, "tools": {"mypy": {"wall": 8.0}}}},
+        }
+        current: dict[str, typing.Any] = {
+            "startup": {"with": {"wall": 1.05}},
+            "modes": {"serial": {"wall": 12.0, "tools": {"mypy": {"wall": 10.0}}}, "pool": {"wall": 1, "tools": {}}},
+        }
+        assert compare(current, baseline, 0.1) == [
+            "serial: 12.00s, baseline 10.00s (+20%)",
+            "serial mypy: 10.00s, baseline 8.00s (+25%)",
+        ]
+
+
+class TestConsolidate:
+    """TestConsolidate."""
+
+    def test_flake8(self, tmp_path: pathlib.Path) -> None:
+        """Test the flake8 settings map onto ruff flags."""
+        (tmp_path / ".flake8").write_text(
+            "[flake8]\nmax-line-length = 100\nextend-ignore = E203\nper-file-ignores =\n    a.py: E402, F401\n"
+            "max-complexity = 10\nstatistics = True\n",
+            encoding="utf-8",
+        )
+        command = flake8_command(tmp_path)
+        assert command is not None
+        assert command.parser == "ruff"
+        assert command.cmd_flags[:3] == ["check", "--isolated", "--preview"]
+        flags = command.cmd_flags
+        assert "line-length = 100" in flags
+        assert "lint.mccabe.max-complexity = 10" in flags
+        assert 'lint.select = ["C90", "E", "F", "W"]' in flags
+        assert 'lint.ignore = ["E226", "E24", "E203"]' in flags
+        assert 'lint.per-file-ignores = {"a.py" = ["E402", "F401"]}' in flags
+        assert command.structured_flags[-2:] == ["--output-format", "json"]
+
+    @pytest.mark.parametrize("settings", ['select = ["E", "W503"]', "hang-closing = true"])
+    def test_flake8_fallback(self, tmp_path: pathlib.Path, settings: str) -> None:
+        """Test flake8 keeps running itself for checks ruff does not have."""
+        (tmp_path / "pyproject.toml").write_text(f"[tool.flake8]\n{settings}\n", encoding="utf-8")
+        assert flake8_command(tmp_path) is None
+
+    def test_isort(self, tmp_path: pathlib.Path) -> None:
+        """Test the isort black profile maps onto the ruff import rules."""
+        (tmp_path / "pyproject.toml").write_text(
+            '[tool.isort]\nprofile = "black"\nknown_first_party = ["pkg"]\nforce_single_line = true\n',
+            encoding="utf-8",
+        )
+        command = isort_command(tmp_path)
+        assert command is not None
+        assert command.cmd_flags[-3:] == ["--select", "I", "--diff"]
+        assert 'lint.isort.known-first-party = ["pkg"]' in command.cmd_flags
+        assert "lint.isort.force-single-line = true" in command.cmd_flags
+
+    @pytest.mark.parametrize("settings", ["", 'profile = "google"', 'profile = "black"\nforce_grid_wrap = 2'])
+    def test_isort_fallback(self, tmp_path: pathlib.Path, settings: str) -> None:
+        """Test isort keeps running itself when it does not sort like ruff."""
+        (tmp_path / "pyproject.toml").write_text(f"[tool.isort]\n{settings}\n", encoding="utf-8")
+        assert isort_command(tmp_path) is None
+
+    def test_black(self, tmp_path: pathlib.Path) -> None:
+        """Test the black settings map onto `ruff format`."""
+        (tmp_path / "pyproject.toml").write_text(
+            '[tool.black]\nline-length = 100\ntarget-version = ["py313", "py312"]\nskip-string-normalization = true\n',
+            encoding="utf-8",
+        )
+        command = black_command(tmp_path)
+        assert command is not None
+        assert command.cmd_flags == [
+            "format",
+            "--isolated",
+            *("--config", "line-length = 100"),
+            *("--config", 'format.quote-style = "preserve"'),
+            *("--config", 'target-version = "py312"'),
+            "--check",
+            "--diff",
+        ]
+        (tmp_path / "pyproject.toml").write_text('[tool.black]\nextend-exclude = "^/gen/"\n', encoding="utf-8")
+        pyproject.cache_clear()
+        assert black_command(tmp_path) is None
+
+    def test_plugin(self, checkers_module: types.ModuleType, cache_config: MagicMock, mock_popen: MagicMock) -> None:
+        """Test a consolidated checker runs ruff and is reported under its own name."""
+        plugin = checkers_module.BlackPlugin(config=cache_config)
+        plugin.ruff = black_command(cache_config.rootpath)
+        mock_popen.outputs.append((b"", b"error: Failed to parse a.py:1:5: Expected an expression\n", 2))
+        plugin.execute()
+        args, _ = mock_popen.call_args
+        assert args[0][:4] == [sys.executable, "-m", "ruff", "format"]
+        assert plugin.runner == "ruff"
+        assert plugin.is_error
+        reporter = MagicMock()
+        plugin.pytest_terminal_summary(reporter)
+        assert reporter.write_sep.call_args.kwargs["title"] == "tests black (ruff)"
+
+    @pytest.mark.parametrize(("black_output", "failed"), [(b"", False), (b"@@ -1,3 +1,2 @@\n", True)])
+    def test_black_confirms_ruff(
+        self,
+        checkers_module: types.ModuleType,
+        cache_config: MagicMock,
+        mock_popen: MagicMock,
+        black_output: bytes,
+        failed: bool,  # noqa: FBT001
+    ) -> None:
+        """Test black has the last word on a diff of `ruff format`, e.g. a blank line black keeps after `class`."""
+        plugin = checkers_module.BlackPlugin(config=cache_config)
+        plugin.ruff = black_command(cache_config.rootpath)
+        mock_popen.outputs.append((b"@@ -1,3 +1,2 @@\n class A:\n-\n     x = 1\n", b"", 1))
+        mock_popen.outputs.append((black_output, b"All done!\n", 0))
+        plugin.execute()
+        assert mock_popen.call_count == 2
+        args, _ = mock_popen.call_args
+        assert args[0][:3] == [sys.executable, "-m", "black"]
+        assert plugin.runner == "ruff"
+        assert plugin.is_error is failed
+
+
+class TestDiscovery:
+    """TestDiscovery."""
+
+    def test_installed(self) -> None:
+        """Test an installed distribution."""
+        assert is_installed("pytest")
+        assert tool_version("pytest") == pytest.__version__
+
+    def test_not_installed(self) -> None:
+        """Test a missing distribution."""
+        assert not is_installed("pytest-checkers-missing")
+        assert tool_version("pytest-checkers-missing") == ""
+
+    def test_memoized(self) -> None:
+        """Test lookups are done once per process."""
+        distribution.cache_clear()
+        with patch("importlib.metadata.distribution") as mock_distribution:
+            is_installed("pytest")
+            is_installed("pytest")
+            mock_distribution.assert_called_once_with("pytest")
+        distribution.cache_clear()
+
+    def test_lazy_version(self) -> None:
+        """Test `__version__` is resolved on access."""
+        assert pytest_checkers.__version__
+        with pytest.raises(AttributeError):
+            _ = pytest_checkers.missing_attribute
+
+
 class TestToolPlugin:
     """TestPyrightPlugin."""
 
@@ -173,7 +2135,7 @@ class TestToolPlugin:
         """Return tool instance."""
         _, tool_class = tool_map
         mock_config = MagicMock(spec=pytest.Config)
-        return tool_class(config=mock_config)  # ty: ignore[invalid-argument-type]
+        return tool_class(config=mock_config)
 
     def test_tool_attrs(self, tool_instance: CheckersPlugin, tool_map: tuple[Tool, type[CheckersPlugin]]) -> None:
         """Test tool attributes."""
@@ -191,6 +2153,17 @@ class TestToolPlugin:
         tool_name, _ = tool_map
         assert tool_instance.cmd_flags == tool_flags[tool_name]
 
+    def test_cmd_flag_plain(
+        self,
+        tool_instance: CheckersPlugin,
+        tool_map: tuple[Tool, type[CheckersPlugin]],
+        tool_plain_flags: dict[Tool, list[str]],
+    ) -> None:
+        """Test no colour flags in plain mode."""
+        tool_name, _ = tool_map
+        tool_instance.color = False
+        assert tool_instance.cmd_flags == tool_plain_flags[tool_name]
+
     def test_is_error_custom(self, checkers_module: types.ModuleType, custom_is_error: tuple[str, str, bool]) -> None:
         """Test custom `is_error`."""
         tool_class_name, cmd_output, expected = custom_is_error
@@ -209,6 +2182,12 @@ def test_pytest_configure_checkers(
     mock_config = MagicMock()
     setattr(mock_config.option, tool_name, False)
     mock_config.option.checkers = True
+    mock_config.option.checkers_packages = False
+    mock_config.option.checkers_cpus = 0
+    mock_config.option.checkers_pyright_offline = False
+    mock_config.option.checkers_tool_cache = False
+    mock_config.option.checkers_tool_cache_dir = None
+    mock_config.option.checkers_cache_clear = False
     with patch("pytest_checkers.checkers.added_options", [tool_name]):
         checkers_module.pytest_configure(mock_config)  # type: ignore[attr-defined]
         mock_config.pluginmanager.register.assert_called_once()
@@ -222,8 +2201,26 @@ def test_pytest_configure_tool(checkers_module: CheckersPlugin, tool_map: tuple[
     mock_config = MagicMock()
     mock_config.option.checkers = False
     setattr(mock_config.option, tool_name, True)
+    mock_config.option.checkers_packages = False
+    mock_config.option.checkers_cpus = 0
+    mock_config.option.checkers_pyright_offline = False
+    mock_config.option.checkers_tool_cache = False
+    mock_config.option.checkers_tool_cache_dir = None
+    mock_config.option.checkers_cache_clear = False
     with patch("pytest_checkers.checkers.added_options", [tool_name]):
         checkers_module.pytest_configure(mock_config)  # type: ignore[attr-defined]
         mock_config.pluginmanager.register.assert_called_once()
         args, _ = mock_config.pluginmanager.register.call_args
         assert isinstance(args[0], tool_class)
+
+
+@pytest.mark.parametrize(("value", "expected"), [("0", 0), ("4", 4)])
+def test_non_negative_int(checkers_module: types.ModuleType, value: str, expected: int) -> None:
+    """Test `--checkers-jobs` parsing."""
+    assert checkers_module._non_negative_int(value) == expected  # noqa: SLF001
+
+
+def test_non_negative_int_invalid(checkers_module: types.ModuleType) -> None:
+    """Test `--checkers-jobs` rejects negative values."""
+    with pytest.raises(argparse.ArgumentTypeError, match="non-negative"):
+        checkers_module._non_negative_int("-1")  # noqa: SLF001